@@ -5,6 +5,7 @@ typedef struct {
   unsigned long fp;
   unsigned long ra;
   unsigned long sp;
+  unsigned long s[11]; // callee-saved registers s1-s11
 } jmp_buf[1];
 
 int setjmp(jmp_buf env);
@@ -4,6 +4,7 @@
     .type $start, "function"
     .align 2
 start:
+    li gp, $__global_pointer
     push a1 # argv
     push a0 # argc
     call $main
@@ -12,7 +12,18 @@ int setjmp(jmp_buf env) {
     sw a0, t0, 0; \
     lw t0, sp, 4; \
     sw a0, t0, 4; \
-    sw a0, sp, 8
+    sw a0, sp, 8; \
+    sw a0, s1, 12; \
+    sw a0, s2, 16; \
+    sw a0, s3, 20; \
+    sw a0, s4, 24; \
+    sw a0, s5, 28; \
+    sw a0, s6, 32; \
+    sw a0, s7, 36; \
+    sw a0, s8, 40; \
+    sw a0, s9, 44; \
+    sw a0, s10, 48; \
+    sw a0, s11, 52
   // clang-format on
   return 0;
 }
@@ -22,15 +33,26 @@ int setjmp(jmp_buf env) {
 void longjmp(jmp_buf env, int status) {
   // clang-format off
   #pragma ASM \
-    lw a0, fp, 8;  \
-    lw a1, fp, 12; \
-    lw sp, a0, 8;  \
-    lw t0, a0, 0;  \
-    sw sp, t0, 0;  \
-    lw t0, a0, 4;  \
-    sw sp, t0, 4;  \
-    mv fp, sp;     \
-    seqz a0, a1;   \
+    lw a0, fp, 8;   \
+    lw a1, fp, 12;  \
+    lw sp, a0, 8;   \
+    lw t0, a0, 0;   \
+    sw sp, t0, 0;   \
+    lw t0, a0, 4;   \
+    sw sp, t0, 4;   \
+    lw s1, a0, 12;  \
+    lw s2, a0, 16;  \
+    lw s3, a0, 20;  \
+    lw s4, a0, 24;  \
+    lw s5, a0, 28;  \
+    lw s6, a0, 32;  \
+    lw s7, a0, 36;  \
+    lw s8, a0, 40;  \
+    lw s9, a0, 44;  \
+    lw s10, a0, 48; \
+    lw s11, a0, 52; \
+    mv fp, sp;      \
+    seqz a0, a1;    \
     add a0, a0, a1
   // clang-format on
   return;
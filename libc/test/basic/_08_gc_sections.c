@@ -0,0 +1,28 @@
+// RUN: rrisc32-cc --function-sections --Wl=--gc-sections -o %t.exe %s
+// RUN: rrisc32-emulate %t.exe | filecheck %s
+// RUN: rrisc32-dump --sym %t.exe | filecheck %s --check-prefix=SYM
+
+#include <stdio.h>
+#include <stdlib.h>
+
+static int counter;
+
+int table[4] = {1, 2, 3, 4};
+
+static int twice(int x) { return x * table[1]; }
+
+int unused(int x) {
+  counter += x;
+  return twice(x) + (int)malloc(x);
+}
+
+int main() {
+  printf("%d %s\n", twice(21), "ok");
+  return 0;
+}
+
+// CHECK: 42 ok
+
+// SYM-NOT: {{counter|unused|malloc}}
+// SYM:     main
+// SYM-NOT: {{counter|unused|malloc}}
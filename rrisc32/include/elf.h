@@ -25,6 +25,19 @@ const Elf_Word R_RRISC32_32 = 1;
 const Elf_Word R_RRISC32_HI20 = 26;
 const Elf_Word R_RRISC32_LO12_I = 27;
 const Elf_Word R_RRISC32_LO12_S = 28;
+// offset from the global pointer, which points into the middle of .sdata
+const Elf_Word R_RRISC32_GPREL_I = 47;
+const Elf_Word R_RRISC32_GPREL_S = 48;
+
+const char *const RRISC32_GLOBAL_POINTER = "__global_pointer";
+
+// .text, .rodata, .data, .sdata or .bss for the section itself or any of its
+// named subsections like .text.foo, and "" for other sections
+std::string getBaseSecName(const std::string &name);
+
+// a subsection of .rodata holding NUL-terminated strings, which the linker
+// deduplicates across input files
+const char *const RRISC32_MERGE_STR_SEC = ".rodata.str1.1";
 
 const u8 RRISC32_PAGE_ALIGN = 12;
 const unsigned RRISC32_PAGE_SIZE = 1 << RRISC32_PAGE_ALIGN;
@@ -154,14 +167,6 @@ private:
   std::map<u32, Symbol> addr2Symbol;
 
   std::vector<segment *> segments;
-
-  // clang-format off
-  const std::vector<std::string> secNames = {
-    ".text", ".rodata", ".data", ".bss",
-    ".rela.text", ".rela.rodata", ".rela.data", ".rela.bss",
-    ".strtab", ".symtab", ".shstrtab"
-  };
-  // clang-format on
 };
 
 class Writer {
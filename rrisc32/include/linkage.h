@@ -10,6 +10,7 @@ DEFINE_EXCEPTION(LinkageError)
 struct LinkerOpts {
   std::vector<std::string> inFiles;
   std::string outFile;
+  bool gcSections = false;
 };
 
 void link(const LinkerOpts &o);
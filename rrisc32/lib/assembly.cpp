@@ -2,6 +2,7 @@
 
 #include <algorithm>
 #include <fstream>
+#include <iostream>
 
 #include "elf.h"
 #include "rrisc32.h"
@@ -580,7 +581,8 @@ std::unique_ptr<Statement> parse(const std::string &s) {
 }
 
 struct Section {
-  explicit Section(const std::string &name) : name(name) {}
+  explicit Section(const std::string &name)
+      : name(name), base(elf::getBaseSecName(name)) {}
 
   Section(const Section &) = delete;
   Section &operator=(const Section &) = delete;
@@ -588,6 +590,8 @@ struct Section {
   const Statement *findLabel(const std::string &name);
 
   std::string name;
+  // .text for .text and .text.foo, etc.
+  std::string base;
   s64 offset = 0;
   s64 size = 0;
   s64 rep = 0;
@@ -728,8 +732,11 @@ std::ostream &operator<<(std::ostream &os, const ExprVal &v) {
 class Assembler {
 public:
   Assembler(AssemblerOpts o) : opts(o) {
-    if (opts.outFile.empty())
+    if (opts.outFile.empty()) {
+      if (opts.inFile == "-")
+        THROW(AssemblyError, "no output file for stdin");
       opts.outFile = opts.inFile + ".o";
+    }
   }
 
   Assembler(const Assembler &) = delete;
@@ -781,6 +788,7 @@ private:
   ExprVal evalFunc(const Expr &expr);
 
   Section *getSection(const std::string &name);
+  void addSectionSymbol(Section *sec);
 
   Symbol *getSymbol(const std::string &name);
   Symbol *addSymbol(const std::string &name);
@@ -797,9 +805,13 @@ private:
   Section secText{".text"};
   Section secRodata{".rodata"};
   Section secData{".data"};
+  Section secSdata{".sdata"};
   Section secBss{".bss"};
 
-  Section *sections[4] = {&secText, &secRodata, &secData, &secBss};
+  // .sdata is added on first use
+  std::vector<Section *> sections = {&secText, &secRodata, &secData, &secBss};
+  // named subsections like .text.foo, in order of first use
+  std::vector<std::unique_ptr<Section>> subSecs;
   Section *curSec = nullptr;
 
   CacheMap<std::string, std::unique_ptr<Symbol>> symTab;
@@ -926,6 +938,12 @@ ExprVal Assembler::evalFunc(const Expr &expr) {
     elf::Elf_Word relType =
         name == "hi" ? elf::R_RRISC32_HI20 : elf::R_RRISC32_LO12_I;
     return cvtSymToRel(v, relType);
+  } else if (name == "gprel") {
+    CHECK_OPERANDS_SIZE(1);
+    ExprVal v = values[0];
+    if (!v.isSym())
+      return ExprVal();
+    return cvtSymToRel(v, elf::R_RRISC32_GPREL_I);
   } else {
     THROW(AssemblyError, "unimplemented Func ", escape(name));
   }
@@ -973,20 +991,22 @@ ExprVal Assembler::evalExpr(const Expr &expr) {
 
 void Assembler::run() {
   std::vector<std::string> lines;
-  {
+  auto readLines = [&lines](std::istream &is) {
+    for (std::string line; std::getline(is, line);)
+      lines.push_back(std::move(line));
+  };
+  // - is stdin, so that the compiler can pipe assembly in
+  if (opts.inFile == "-") {
+    readLines(std::cin);
+  } else {
     std::fstream ifs(opts.inFile, std::ios::in | std::ios::binary);
     if (!ifs)
       THROW(AssemblyError, "read", escape(opts.inFile));
-    for (std::string line; std::getline(ifs, line);)
-      lines.push_back(std::move(line));
+    readLines(ifs);
   }
 
-  for (Section *sec : sections) {
-    Symbol *sym = addSymbol(sec->name);
-    sym->set(sec, 0);
-    sym->sym.type = elf::STT_SECTION;
-    sym->sym.bind = elf::STB_LOCAL;
-  }
+  for (Section *sec : sections)
+    addSectionSymbol(sec);
 
   for (unsigned i = 0; i < lines.size(); ++i) {
     TRY()
@@ -1077,6 +1097,11 @@ void Assembler::expandInstr(std::unique_ptr<Statement> stmt) {
     return false;
   };
 
+  // the low 12 bits are filled in by a relocation
+  auto isRelLo = [](const Expr &e) {
+    return e.type == Expr::Func && isOneOf(e.s, {"lo", "gprel"});
+  };
+
   if (name == "li" && format == "ri") {
     if (getImm(e1) && checkImmRangeIS(imm)) {
       addInstr("addi", {e0, x0, e1});
@@ -1103,7 +1128,7 @@ void Assembler::expandInstr(std::unique_ptr<Statement> stmt) {
 
   } else if (isOneOf(name, {"lb", "lh", "lw", "lbu", "lhu"}) &&
              format == "rri") {
-    if (checkImmRangeIS(imm)) {
+    if (isRelLo(e2) || (getImm(e2) && checkImmRangeIS(imm))) {
       addInstr(std::move(stmt));
       return;
     }
@@ -1122,7 +1147,7 @@ void Assembler::expandInstr(std::unique_ptr<Statement> stmt) {
 
   } else if (isOneOf(name, {"sb", "sh", "sw", "sbu", "shu"}) &&
              format == "rri") {
-    if (getImm(e2) && checkImmRangeIS(imm)) {
+    if (isRelLo(e2) || (getImm(e2) && checkImmRangeIS(imm))) {
       addInstr(std::move(stmt));
       return;
     }
@@ -1325,8 +1350,12 @@ void Assembler::handleInstr(Statement *stmt) {
     } else if (v.isRel()) {
       instr.addOperand(0);
       elf::Elf_Word relType = v.getRelType();
-      if (relType == elf::R_RRISC32_LO12_I && isOneOf(name, {"sb", "sh", "sw"}))
-        relType = elf::R_RRISC32_LO12_S;
+      if (isOneOf(name, {"sb", "sh", "sw"})) {
+        if (relType == elf::R_RRISC32_LO12_I)
+          relType = elf::R_RRISC32_LO12_S;
+        else if (relType == elf::R_RRISC32_GPREL_I)
+          relType = elf::R_RRISC32_GPREL_S;
+      }
       addRelocation(curSec, stmt->offset, v.getSym(), relType, v.getAddend());
     } else {
       INVALID_STATEMENT();
@@ -1383,8 +1412,8 @@ void Assembler::cookSections() {
         } else if (name == ".ascii" || name == ".asciz") {
           handleDirectiveAscii(stmt.get());
         } else if (name == ".fill") {
-          if (curSec->name == ".bss")
-            return;
+          if (curSec->base == ".bss")
+            continue;
 
           unsigned n = stmt->arguments.size();
 
@@ -1403,8 +1432,8 @@ void Assembler::cookSections() {
           for (unsigned i = 0; i < repeat; ++i)
             curSec->bb.append(value, size);
         } else if (name == ".align") {
-          if (curSec->name == ".bss")
-            return;
+          if (curSec->base == ".bss")
+            continue;
 
           unsigned repeat =
               P2ALIGN(stmt->offset, evalExpr(stmt->arguments[0]).getI()) -
@@ -1427,7 +1456,7 @@ void Assembler::saveToFile() {
 
   for (Section *sec : sections) {
     sec->sec = writer.getSection(sec->name);
-    if (sec->name == ".bss")
+    if (sec->base == ".bss")
       sec->sec->set_size(sec->size);
     else
       sec->sec->set_data(sec->bb.getData());
@@ -1456,7 +1485,7 @@ void Assembler::checkCurSecName(
     const std::initializer_list<std::string> &names) {
   CHECK_CURRENT_SECTION();
   for (const std::string &name : names)
-    if (name == curSec->name)
+    if (name == curSec->base)
       return;
   THROW(AssemblyError, joinSeq("|", names) + " expected",
         toString(curSec->name));
@@ -1464,6 +1493,17 @@ void Assembler::checkCurSecName(
 
 void Assembler::handleDirectiveSec(const std::string &name) {
   Section *sec = getSection(name);
+  if (!sec && name == secSdata.name) {
+    sec = &secSdata;
+    sections.insert(std::find(sections.begin(), sections.end(), &secBss), sec);
+    addSectionSymbol(sec);
+  }
+  if (!sec && !elf::getBaseSecName(name).empty()) {
+    subSecs.emplace_back(std::make_unique<Section>(name));
+    sec = subSecs.back().get();
+    sections.push_back(sec);
+    addSectionSymbol(sec);
+  }
   if (!sec)
     THROW(AssemblyError, "unknown section", name);
   curSec = sec;
@@ -1527,14 +1567,14 @@ void Assembler::handleDirective(std::unique_ptr<Statement> stmt) {
     handleDirectiveSec(stmt->arguments[0].s);
     return;
   }
-  if (isOneOf(name, {".text", ".rodata", ".data", ".bss"})) {
+  if (isOneOf(name, {".text", ".rodata", ".data", ".sdata", ".bss"})) {
     CHECK_ARGUMENTS_SIZE(0);
     handleDirectiveSec(name);
     return;
   }
 
   if (name == ".db" || name == ".dh" || name == ".dw" || name == ".dq") {
-    checkCurSecName({".rodata", ".data"});
+    checkCurSecName({".rodata", ".data", ".sdata"});
     unsigned n = stmt->arguments.size();
     if (name == ".dh")
       n *= 2;
@@ -1548,7 +1588,7 @@ void Assembler::handleDirective(std::unique_ptr<Statement> stmt) {
   }
 
   if (name == ".ascii" || name == ".asciz") {
-    checkCurSecName({".rodata", ".data"});
+    checkCurSecName({".rodata", ".data", ".sdata"});
     unsigned n = 0;
     for (unsigned i = 0; i < stmt->arguments.size(); ++i) {
       CHECK_ARGUMENT_TYPE(i, Expr::Str);
@@ -1562,7 +1602,7 @@ void Assembler::handleDirective(std::unique_ptr<Statement> stmt) {
   }
 
   if (name == ".fill") {
-    checkCurSecName({".rodata", ".data", ".bss"});
+    checkCurSecName({".rodata", ".data", ".sdata", ".bss"});
     unsigned n = stmt->arguments.size();
     if (n < 1 || n > 3)
       THROW(AssemblyError, "1/2/3 arguments expected", *stmt);
@@ -1603,7 +1643,7 @@ void Assembler::handleDirective(std::unique_ptr<Statement> stmt) {
     if (n == 0)
       return;
 
-    if (curSec->name == ".text") {
+    if (curSec->base == ".text") {
       if (n < 3)
         return;
       s64 m = P2ALIGN(curSec->offset, n) - curSec->offset;
@@ -1660,6 +1700,13 @@ Section *Assembler::getSection(const std::string &name) {
   return nullptr;
 }
 
+void Assembler::addSectionSymbol(Section *sec) {
+  Symbol *sym = addSymbol(sec->name);
+  sym->set(sec, 0);
+  sym->sym.type = elf::STT_SECTION;
+  sym->sym.bind = elf::STB_LOCAL;
+}
+
 Symbol *Assembler::getSymbol(const std::string &name) {
   if (symTab.contains(name))
     return symTab[name].get();
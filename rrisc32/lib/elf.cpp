@@ -26,6 +26,28 @@ void getRelocation(const elfio &ei, section *sec, Elf_Xword idx,
   rel.secBelongTo = sec->get_index();
 }
 
+std::string getBaseSecName(const std::string &name) {
+  for (const std::string base : {".text", ".rodata", ".data", ".sdata", ".bss"})
+    if (name == base || name.starts_with(base + "."))
+      return base;
+  return "";
+}
+
+static Elf_Word getSecType(const std::string &base) {
+  return base == ".bss" ? SHT_NOBITS : SHT_PROGBITS;
+}
+
+static Elf_Xword getSecFlags(const std::string &name) {
+  if (name == RRISC32_MERGE_STR_SEC)
+    return SHF_ALLOC | SHF_MERGE | SHF_STRINGS;
+  std::string base = getBaseSecName(name);
+  if (base == ".text")
+    return SHF_ALLOC | SHF_EXECINSTR;
+  if (base == ".rodata")
+    return SHF_ALLOC;
+  return SHF_ALLOC | SHF_WRITE;
+}
+
 Reader::Reader(const std::string &filename) : filename(filename) {
   if (!ei.load(filename))
     THROW(ELFError, "load", escape(filename));
@@ -151,6 +173,10 @@ static std::string str_section_flag(Elf_Xword flags) {
     res += "E";
   if (flags & SHF_WRITE)
     res += "W";
+  if (flags & SHF_MERGE)
+    res += "M";
+  if (flags & SHF_STRINGS)
+    res += "S";
   return res;
 }
 
@@ -261,6 +287,10 @@ std::string str_relocation_type(Elf_Word type) {
     return "LO12_I";
   case R_RRISC32_LO12_S:
     return "LO12_S";
+  case R_RRISC32_GPREL_I:
+    return "GPREL_I";
+  case R_RRISC32_GPREL_S:
+    return "GPREL_S";
   default:
     return toHexStr(type, true);
   }
@@ -414,19 +444,19 @@ void RRisc32Reader::checkSegments() {
 void RRisc32Reader::checkSections() {
   forEachSection([this](section &sec) {
     std::string name = sec.get_name();
-    if (name.empty())
+    if (name.empty() || isOneOf(name, {".strtab", ".symtab", ".shstrtab"}))
+      return;
+    if (name.starts_with(".rela")) {
+      if (getBaseSecName(substr(name, 5)).empty())
+        UNEXPECTED_SECTION_NAME(name);
+      checkSection(name, SHT_RELA);
       return;
-    if (!isOneOf(name, secNames))
+    }
+    std::string base = getBaseSecName(name);
+    if (base.empty())
       UNEXPECTED_SECTION_NAME(name);
+    checkSection(name, getSecType(base), getSecFlags(name));
   });
-  checkSection(".text", SHT_PROGBITS, SHF_ALLOC | SHF_EXECINSTR);
-  checkSection(".rodata", SHT_PROGBITS, SHF_ALLOC);
-  checkSection(".data", SHT_PROGBITS, SHF_ALLOC | SHF_WRITE);
-  checkSection(".bss", SHT_NOBITS, SHF_ALLOC | SHF_WRITE);
-  checkSection(".rela.text", SHT_RELA);
-  checkSection(".rela.rodata", SHT_RELA);
-  checkSection(".rela.data", SHT_RELA);
-  checkSection(".rela.bss", SHT_RELA);
   checkSection(".strtab", SHT_STRTAB);
   checkSection(".symtab", SHT_SYMTAB);
   checkSection(".shstrtab", SHT_STRTAB);
@@ -461,6 +491,8 @@ void RRisc32Reader::checkRelocations() {
     case R_RRISC32_HI20:
     case R_RRISC32_LO12_I:
     case R_RRISC32_LO12_S:
+    case R_RRISC32_GPREL_I:
+    case R_RRISC32_GPREL_S:
       break;
     default:
       THROW(ELFError, "unexpected relocation type", toHexStr(rel.type));
@@ -537,17 +569,15 @@ section *RRisc32Writer::getSection(const std::string &name) {
   if (sec)
     return sec;
 
-  if (name == ".text")
-    return addSection(name, SHT_PROGBITS, SHF_ALLOC | SHF_EXECINSTR);
-  if (name == ".rodata")
-    return addSection(name, SHT_PROGBITS, SHF_ALLOC);
-  if (name == ".data")
-    return addSection(name, SHT_PROGBITS, SHF_ALLOC | SHF_WRITE);
-  if (name == ".bss")
-    return addSection(name, SHT_NOBITS, SHF_ALLOC | SHF_WRITE);
-
-  if (name == ".rela.text" || name == ".rela.rodata" || name == ".rela.data" ||
-      name == ".rela.bss") {
+  std::string base = getBaseSecName(name);
+  if (!base.empty()) {
+    sec = addSection(name, getSecType(base), getSecFlags(name));
+    if (name == RRISC32_MERGE_STR_SEC)
+      sec->set_entry_size(1);
+    return sec;
+  }
+
+  if (name.starts_with(".rela") && !getBaseSecName(substr(name, 5)).empty()) {
     sec = addSection(name, SHT_RELA, 0);
     if (ei.get_type() == ET_REL) {
       sec->set_info(getSection(substr(name, 5))->get_index());
@@ -1,7 +1,11 @@
 #include "linkage.h"
 
+#include <algorithm>
+#include <iterator>
 #include <list>
 #include <map>
+#include <set>
+#include <string_view>
 
 #include "elf.h"
 
@@ -9,11 +13,54 @@
 
 namespace linkage {
 
+// crt.o defines it at the start of .text, i.e. at RRISC32_ENTRY
+const char *const ENTRY_SYMBOL = "start";
+
 struct InputSection {
   InputSection(elf::section *sec) : sec(sec) {}
 
+  bool isMergeableStrs() const {
+    return sec->get_name() == elf::RRISC32_MERGE_STR_SEC;
+  }
+
+  // the address an offset into the section ends up at
+  u64 getAddr(u64 offset) const {
+    if (strs.empty())
+      return addr + offset;
+    auto it = findStr(offset);
+    return addr + it->second + (offset - it->first);
+  }
+
+  // the same for an offset relative to the string at @base. One past the end
+  // of that string, e.g. "abc" + 4, is the start of the next string in the
+  // section, which may be merged elsewhere, so it is kept with the former
+  u64 getAddr(u64 base, u64 offset) const {
+    if (strs.empty())
+      return addr + offset;
+    auto it = findStr(base);
+    auto next = std::next(it);
+    if (it->first <= offset && (next == strs.end() || offset <= next->first))
+      return addr + it->second + (offset - it->first);
+    return getAddr(offset);
+  }
+
+  // the string which contains an offset
+  std::vector<std::pair<u64, u64>>::const_iterator findStr(u64 offset) const {
+    auto it = std::upper_bound(
+        strs.begin(), strs.end(), offset,
+        [](u64 offset, const auto &str) { return offset < str.first; });
+    assert(it != strs.begin());
+    return --it;
+  }
+
   elf::section *sec = nullptr;
   u64 addr = 0;
+
+  bool live = true;
+
+  // for mergeable strings, the offset of each string in the section and in
+  // the merged strings, which start at addr
+  std::vector<std::pair<u64, u64>> strs;
 };
 
 struct OutputSection {
@@ -102,6 +149,16 @@ struct Reader : elf::RRisc32Reader {
     return nullptr;
   }
 
+  // live input sections of an output section, e.g. .text and .text.foo for
+  // .text
+  std::vector<InputSection *> getISecs(const std::string &base) {
+    std::vector<InputSection *> res;
+    for (auto &iSec : iSecs)
+      if (iSec->live && elf::getBaseSecName(iSec->sec->get_name()) == base)
+        res.push_back(iSec.get());
+    return res;
+  }
+
   std::vector<std::unique_ptr<InputSection>> iSecs;
   std::vector<std::unique_ptr<OutputSymbol>> oSyms;
   std::vector<std::unique_ptr<OutputRelocation>> oRels;
@@ -121,9 +178,14 @@ private:
 
   void applyRelocations();
   void linkSymbols();
+  void defineGlobalPointer();
   void concatenateISecs();
+  void collectGarbage();
+  void mergeStrings();
 
-  OutputSection *getOSec(elf::section *sec) { return getOSec(sec->get_name()); }
+  OutputSection *getOSec(elf::section *sec) {
+    return getOSec(elf::getBaseSecName(sec->get_name()));
+  }
 
   OutputSection *getOSec(const std::string &name);
 
@@ -132,9 +194,19 @@ private:
   OutputSection oSecText{".text"};
   OutputSection oSecRodata{".rodata"};
   OutputSection oSecData{".data"};
+  OutputSection oSecSdata{".sdata"};
   OutputSection oSecBss{".bss"};
 
-  OutputSection *oSecs[4] = {&oSecText, &oSecRodata, &oSecData, &oSecBss};
+  // .sdata is added if any input has it
+  std::vector<OutputSection *> oSecs = {&oSecText, &oSecRodata, &oSecData,
+                                        &oSecBss};
+
+  // contents of all sections of mergeable strings with duplicates and
+  // suffixes of other strings removed, put at the end of .rodata
+  std::string mergedStrs;
+
+  std::unique_ptr<OutputSymbol> oSymGp;
+  u64 gp = 0;
 
   u64 offset = elf::RRISC32_ENTRY;
 
@@ -193,11 +265,28 @@ void Linker::saveToFile() {
   writer.addSegment(elf::PT_LOAD, elf::PF_R | elf::PF_X, {oSecText.sec});
   writer.addSegment(elf::PT_LOAD, elf::PF_R, {oSecRodata.sec});
   writer.addSegment(elf::PT_LOAD, elf::PF_R | elf::PF_W, {oSecData.sec});
+  if (oSecSdata.sec)
+    writer.addSegment(elf::PT_LOAD, elf::PF_R | elf::PF_W, {oSecSdata.sec});
   writer.addSegment(elf::PT_LOAD, elf::PF_R | elf::PF_W, {oSecBss.sec});
 
   writer.save();
 }
 
+static u32 setImmI(u32 x, s32 imm) {
+  x &= 0xfffff;
+  x |= imm << 20;
+  return x;
+}
+
+static u32 setImmS(u32 x, s32 imm) {
+  s32 y = 0;
+  y |= x & 0x7f;
+  y |= (imm & 0b11111) << 7;
+  y |= (x >> 12 & 0x1fff) << 12;
+  y |= imm >> 5 << 25;
+  return y;
+}
+
 void Linker::applyRelocations() {
   for (auto &reader : readers) {
     for (auto &oRel : reader->oRels) {
@@ -224,22 +313,26 @@ void Linker::applyRelocations() {
         x |= imm << 12;
         break;
       }
-      case elf::R_RRISC32_LO12_I: {
+      case elf::R_RRISC32_LO12_I:
         LOG("relocate", "R_RRISC32_LO12_I");
-        s32 imm = lo12(v);
-        x &= 0xfffff;
-        x |= imm << 20;
+        x = setImmI(x, lo12(v));
         break;
-      }
-      case elf::R_RRISC32_LO12_S: {
+      case elf::R_RRISC32_LO12_S:
         LOG("relocate", "R_RRISC32_LO12_S");
-        s32 imm = lo12(v);
-        s32 y = 0;
-        y |= x & 0x7f;
-        y |= (imm & 0b11111) << 7;
-        y |= (x >> 12 & 0x1fff) << 12;
-        y |= imm >> 5 << 25;
-        x = y;
+        x = setImmS(x, lo12(v));
+        break;
+      case elf::R_RRISC32_GPREL_I:
+      case elf::R_RRISC32_GPREL_S: {
+        LOG("relocate", "R_RRISC32_GPREL");
+        if (!gSyms.contains(elf::RRISC32_GLOBAL_POINTER))
+          THROW(LinkageError, "no global pointer", oSym->sym.name);
+        s64 imm = static_cast<s64>(v) - static_cast<s64>(gp);
+        if (!checkImmRangeIS(imm))
+          THROW(LinkageError,
+                "gp-relative offset out of range, recompile with a smaller -G",
+                oSym->sym.name, imm);
+        x = rel.type == elf::R_RRISC32_GPREL_I ? setImmI(x, imm)
+                                               : setImmS(x, imm);
         break;
       }
       default:
@@ -279,56 +372,114 @@ void Linker::linkSymbols() {
   for (auto &reader : readers) {
     for (auto &oSym : reader->oSyms) {
       const elf::Symbol &sym = oSym->sym;
-      if (sym.sec == elf::SHN_UNDEF && !gSyms.contains(sym.name))
+      if (sym.sec == elf::SHN_UNDEF && !gSyms.contains(sym.name)) {
+        if (sym.name == elf::RRISC32_GLOBAL_POINTER) {
+          defineGlobalPointer();
+          continue;
+        }
         THROW(LinkageError, "undefined symbol", sym.name);
+      }
     }
   }
+  if (oSecSdata.addr && !gSyms.contains(elf::RRISC32_GLOBAL_POINTER))
+    defineGlobalPointer();
+  if (gSyms.contains(elf::RRISC32_GLOBAL_POINTER))
+    gp = gSyms[elf::RRISC32_GLOBAL_POINTER]->getValue();
+}
+
+void Linker::defineGlobalPointer() {
+  // gp points 2K past the start of .sdata so that all of the first 4K of it
+  // is reachable with a 12-bit signed offset
+  oSymGp = std::make_unique<OutputSymbol>(
+      elf::Symbol{.name = elf::RRISC32_GLOBAL_POINTER,
+                  .value = oSecSdata.addr ? oSecSdata.addr + 0x800 : 0,
+                  .size = 0,
+                  .type = elf::STT_NOTYPE,
+                  .bind = elf::STB_GLOBAL,
+                  .other = elf::STV_DEFAULT,
+                  .sec = elf::SHN_ABS});
+  gSyms[elf::RRISC32_GLOBAL_POINTER] = oSymGp.get();
 }
 
 void Linker::concatenateISecs() {
-  for (const std::string &name : {".text", ".rodata", ".data", ".bss"}) {
+  for (auto &reader : readers) {
+    if (!reader->getISecs(oSecSdata.sym.name).empty()) {
+      oSecs.insert(std::find(oSecs.begin(), oSecs.end(), &oSecBss), &oSecSdata);
+      break;
+    }
+  }
+
+  for (OutputSection *o : oSecs) {
+    const std::string &name = o->sym.name;
     OutputSection *oSec = getOSec(name);
 
     for (auto &reader : readers) {
-      InputSection *iSec = reader->getISec(name);
-      if (!iSec)
-        continue;
-      elf::section *sec = iSec->sec;
-
-      u8 n = 0;
-      if (!log2(sec->get_addr_align(), n) || n > elf::RRISC32_MAX_ALIGN)
-        THROW(LinkageError, "invalid section alignment", sec->get_addr_align());
-      u64 offset_new = P2ALIGN(offset, n);
-      if (offset_new > offset) {
-        oSec->bb.append(offset_new - offset, '\0');
-        offset = offset_new;
+      for (InputSection *iSec : reader->getISecs(name)) {
+        if (iSec->isMergeableStrs())
+          continue;
+        elf::section *sec = iSec->sec;
+
+        u8 n = 0;
+        if (!log2(sec->get_addr_align(), n) || n > elf::RRISC32_MAX_ALIGN)
+          THROW(LinkageError, "invalid section alignment",
+                sec->get_addr_align());
+        u64 offset_new = P2ALIGN(offset, n);
+        if (offset_new > offset) {
+          oSec->bb.append(offset_new - offset, '\0');
+          offset = offset_new;
+        }
+
+        iSec->addr = offset;
+
+        if (name != ".bss")
+          oSec->bb.append(sec->get_data(), sec->get_size());
+        offset += sec->get_size();
+        oSec->sym.size = offset - oSec->addr;
       }
+    }
 
-      iSec->addr = offset;
+    if (name == ".rodata" && !mergedStrs.empty()) {
+      for (auto &reader : readers)
+        for (InputSection *iSec : reader->getISecs(name))
+          if (iSec->isMergeableStrs())
+            iSec->addr = offset;
 
-      if (name != ".bss")
-        oSec->bb.append(sec->get_data(), sec->get_size());
-      offset += sec->get_size();
+      oSec->bb.append(mergedStrs.data(), mergedStrs.size());
+      offset += mergedStrs.size();
       oSec->sym.size = offset - oSec->addr;
     }
   }
 
   // map symbols and relocations
   for (auto &reader : readers) {
-    for (auto &oSym : reader->oSyms) {
-      elf::section *sec = reader->getSection(oSym->sym);
-      if (!sec)
-        continue;
-      oSym->oSec = getOSec(sec);
-      oSym->sym.value += reader->getISec(sec)->addr;
-      oSym->sym.value -= oSym->oSec->addr;
-    }
     for (auto &oRel : reader->oRels) {
       elf::section *sec = reader->getSection(oRel->rel);
       oRel->oSec = getOSec(sec);
       oRel->rel.offset += reader->getISec(sec)->addr;
       oRel->rel.offset -= oRel->oSec->addr;
       oRel->oSym = reader->getOSym(oRel.get());
+
+      // the addend may point into another string than the symbol once they
+      // are merged, so it is applied before the symbol is mapped. A symbol
+      // other than that of the section is the string it refers to
+      const elf::Symbol &sym = oRel->oSym->sym;
+      if (elf::section *symSec = reader->getSection(sym)) {
+        InputSection *iSec = reader->getISec(symSec);
+        u64 offset = sym.value + oRel->rel.addend;
+        if (iSec->isMergeableStrs())
+          oRel->rel.addend = (sym.type == elf::STT_SECTION
+                                  ? iSec->getAddr(offset)
+                                  : iSec->getAddr(sym.value, offset)) -
+                             iSec->getAddr(sym.value);
+      }
+    }
+    for (auto &oSym : reader->oSyms) {
+      elf::section *sec = reader->getSection(oSym->sym);
+      if (!sec)
+        continue;
+      oSym->oSec = getOSec(sec);
+      oSym->sym.value = reader->getISec(sec)->getAddr(oSym->sym.value);
+      oSym->sym.value -= oSym->oSec->addr;
     }
   }
 }
@@ -345,10 +496,141 @@ OutputSection *Linker::getOSec(const std::string &name) {
   THROW(LinkageError, "unexpected section name", name);
 }
 
+void Linker::collectGarbage() {
+  // where each global symbol is defined, with the same precedence as in
+  // linkSymbols
+  std::map<std::string, std::pair<Reader *, elf::section *>> defs;
+  for (auto &reader : readers) {
+    for (auto &oSym : reader->oSyms) {
+      const elf::Symbol &sym = oSym->sym;
+      elf::section *sec = reader->getSection(sym);
+      if (!sec || sym.bind == elf::STB_LOCAL)
+        continue;
+      if (sym.bind != elf::STB_WEAK || !defs.contains(sym.name))
+        defs[sym.name] = {reader.get(), sec};
+    }
+  }
+  if (!defs.contains(ENTRY_SYMBOL))
+    THROW(LinkageError, "undefined symbol", ENTRY_SYMBOL);
+
+  // the input section of each section and the relocations applied to it, so
+  // that each relocation is visited once rather than once per live section
+  std::map<elf::section *, InputSection *> iSecs;
+  std::map<elf::section *, std::vector<OutputRelocation *>> secRels;
+  for (auto &reader : readers) {
+    for (auto &iSec : reader->iSecs) {
+      iSecs[iSec->sec] = iSec.get();
+      if (!elf::getBaseSecName(iSec->sec->get_name()).empty())
+        iSec->live = false;
+    }
+    for (auto &oRel : reader->oRels)
+      secRels[reader->getSection(oRel->rel)].push_back(oRel.get());
+  }
+
+  std::vector<std::pair<Reader *, elf::section *>> worklist;
+  auto mark = [&](Reader *reader, elf::section *sec) {
+    InputSection *iSec = iSecs.at(sec);
+    if (iSec->live)
+      return;
+    iSec->live = true;
+    worklist.emplace_back(reader, sec);
+  };
+
+  mark(defs[ENTRY_SYMBOL].first, defs[ENTRY_SYMBOL].second);
+  while (!worklist.empty()) {
+    auto [reader, sec] = worklist.back();
+    worklist.pop_back();
+    for (auto *oRel : secRels[sec]) {
+      const elf::Symbol &sym = reader->getOSym(oRel)->sym;
+      if (sym.bind != elf::STB_LOCAL && defs.contains(sym.name))
+        mark(defs[sym.name].first, defs[sym.name].second);
+      else if (elf::section *symSec = reader->getSection(sym))
+        mark(reader, symSec);
+    }
+  }
+
+  // drop relocations in discarded sections, then symbols no longer referenced
+  // that are either undefined or defined in discarded sections
+  for (auto &reader : readers) {
+    std::erase_if(reader->oRels, [&](auto &oRel) {
+      return !iSecs.at(reader->getSection(oRel->rel))->live;
+    });
+
+    std::set<OutputSymbol *> used;
+    for (auto &oRel : reader->oRels)
+      used.insert(reader->getOSym(oRel.get()));
+
+    std::erase_if(reader->oSyms, [&](auto &oSym) {
+      if (used.contains(oSym.get()))
+        return false;
+      elf::section *sec = reader->getSection(oSym->sym);
+      if (sec)
+        return !iSecs.at(sec)->live;
+      return oSym->sym.sec == elf::SHN_UNDEF;
+    });
+  }
+}
+
+void Linker::mergeStrings() {
+  std::vector<std::string_view> strs;
+  for (auto &reader : readers) {
+    for (InputSection *iSec : reader->getISecs(".rodata")) {
+      if (!iSec->isMergeableStrs())
+        continue;
+      const char *data = iSec->sec->get_data();
+      u64 size = iSec->sec->get_size();
+      if (size && data[size - 1])
+        THROW(LinkageError, "unterminated string", iSec->sec->get_name());
+      for (u64 i = 0; i < size;) {
+        strs.emplace_back(data + i);
+        i += strs.back().size() + 1;
+      }
+    }
+  }
+
+  // sorted by their reversed contents, a string is directly followed by the
+  // strings it ends with
+  std::sort(strs.begin(), strs.end(), [](auto a, auto b) {
+    return std::lexicographical_compare(b.rbegin(), b.rend(), a.rbegin(),
+                                        a.rend());
+  });
+
+  std::map<std::string_view, u64> offsets;
+  std::string_view last;
+  for (std::string_view str : strs) {
+    if (offsets.contains(str))
+      continue;
+    if (!last.empty() && last.ends_with(str)) {
+      offsets[str] = offsets[last] + last.size() - str.size();
+      continue;
+    }
+    offsets[str] = mergedStrs.size();
+    mergedStrs.append(str);
+    mergedStrs.push_back('\0');
+    last = str;
+  }
+
+  for (auto &reader : readers) {
+    for (InputSection *iSec : reader->getISecs(".rodata")) {
+      if (!iSec->isMergeableStrs())
+        continue;
+      const char *data = iSec->sec->get_data();
+      for (u64 i = 0; i < iSec->sec->get_size();) {
+        std::string_view str(data + i);
+        iSec->strs.emplace_back(i, offsets[str]);
+        i += str.size() + 1;
+      }
+    }
+  }
+}
+
 void Linker::run() {
   for (const std::string &filename : opts.inFiles)
     readers.emplace_back(std::move(std::make_unique<Reader>(filename)));
 
+  if (opts.gcSections)
+    collectGarbage();
+  mergeStrings();
   concatenateISecs();
   linkSymbols();
   applyRelocations();
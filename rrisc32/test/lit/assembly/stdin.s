@@ -0,0 +1,17 @@
+# RUN: rrisc32-as -o %t %s
+# RUN: rrisc32-as -o %t.stdin - < %s
+# RUN: cmp %t %t.stdin
+# RUN: ! rrisc32-as - < %s 2> %t.err
+# RUN: filecheck %s --check-prefix=ERR < %t.err
+
+  .text
+  .global $f
+f:
+  add x1, x2, x3
+  ret
+
+  .data
+g:
+  .dw $f
+
+# ERR: no output file for stdin
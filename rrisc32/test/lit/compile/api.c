@@ -0,0 +1,24 @@
+// RUN: rrisc32-cc --compile --nostdinc -o %t.s %s
+// RUN: python -c "import sys; sys.path.insert(0, '%S/../../../tools/compile'); \
+// RUN:   from toolchain import compileSource; \
+// RUN:   src = open('%s').read(); \
+// RUN:   print(compileSource(src, filename='%s'), end=''); \
+// RUN:   assert compileSource(src) == compileSource(src)" > %t.api.s
+// RUN: diff %t.s %t.api.s
+// RUN: python -c "import sys; sys.path.insert(0, '%S/../../../tools/compile'); \
+// RUN:   import sema; from toolchain import compileSource; \
+// RUN:   src = 'struct s { int x; }; struct s *p; int g(struct s *q) { return q->x; }'; \
+// RUN:   sizes = lambda: [len(_) for _ in (sema._pointerTypes, sema._functionTypes)]; \
+// RUN:   compileSource(src); n = sizes(); compileSource(src); \
+// RUN:   assert sizes() == n, (sizes(), n); \
+// RUN:   sema.NodeVisitorCtx(); assert not sema._intConstants"
+
+int f(int n) {
+  static int calls;
+  int s = 0;
+  for (int i = 0; i < n; ++i)
+    s += i;
+  return ++calls ? s : 0;
+}
+
+const char *file(void) { return __FILE__; }
@@ -15,15 +15,15 @@ void f() {
 
   int i = ll; // -4
 
-  // CC-NEXT:     lw a0, +($ll 0)
-  // CC-NEXT:     lw a1, +($ll 4)
+  // CC-NEXT:     lw a0, gp, %gprel(+($ll 0))
+  // CC-NEXT:     lw a1, gp, %gprel(+($ll 4))
   // CC-NEXT:     sw fp, a0, -4
 
   short s; // -8
   s = ll;
 
-  // CC-NEXT:     lw a0, +($ll 0)
-  // CC-NEXT:     lw a1, +($ll 4)
+  // CC-NEXT:     lw a0, gp, %gprel(+($ll 0))
+  // CC-NEXT:     lw a1, gp, %gprel(+($ll 4))
   // CC-NEXT:     sext.h a0, a0
   // CC-NEXT:     push a0
   // CC-NEXT:     pop a2
@@ -36,7 +36,7 @@ void f() {
   // CC-NEXT:     push a0
   // CC-NEXT:     lw a0, fp, -4
   // CC-NEXT:     pop a2
-  // CC-NEXT:     add a0, a0, a
+  // CC-NEXT:     add a0, a0, a2
   // CC-NEXT:     push a0
   // CC-NEXT:     pop a2
   // CC-NEXT:     sw fp, a2, -4
@@ -73,20 +73,20 @@ void f() {
   // CC-NEXT:     srai a1, a0, 31
   // CC-NEXT:     push a1
   // CC-NEXT:     push a0
-  // CC-NEXT:     lw a0, +($ll 0)
-  // CC-NEXT:     lw a1, +($ll 4)
+  // CC-NEXT:     lw a0, gp, %gprel(+($ll 0))
+  // CC-NEXT:     lw a1, gp, %gprel(+($ll 4))
   // CC-NEXT:     pop a2
   // CC-NEXT:     pop a3
-  // CC-NEXT:     add     a0, a0, a2
-  // CC-NEXT:     sltu    a2, a0, a2
-  // CC-NEXT:     add     a1, a1, a3
-  // CC-NEXT:     add     a1, a1, a2
+  // CC-NEXT:     add a0, a0, a2
+  // CC-NEXT:     sltu a2, a0, a2
+  // CC-NEXT:     add a1, a1, a3
+  // CC-NEXT:     add a1, a1, a2
   // CC-NEXT:     push a1
   // CC-NEXT:     push a0
   // CC-NEXT:     pop a2
   // CC-NEXT:     pop a3
-  // CC-NEXT:     sw a2, +($ll 0)
-  // CC-NEXT:     sw a3, +($ll 4)
+  // CC-NEXT:     sw gp, a2, %gprel(+($ll 0))
+  // CC-NEXT:     sw gp, a3, %gprel(+($ll 4))
   // CC-NEXT:     mv a0, a2
   // CC-NEXT:     mv a1, a3
 
@@ -99,9 +99,3 @@ void f() {
 
 // CC:          .bss
 // CC-NEXT:
-// CC-NEXT:     .align 2
-// CC-NEXT: ll:
-// CC-NEXT:     .fill 8
-// CC-NEXT:     .global $ll
-// CC-NEXT:     .type $ll, "object"
-// CC-NEXT:     .size $ll, -($. $ll)
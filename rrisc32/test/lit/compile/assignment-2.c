@@ -23,7 +23,7 @@ void f()
 // CC-NEXT:     addi sp, sp, -8
 // CC-NEXT:     li a0, 8
 // CC-NEXT:     push a0
-// CC-NEXT:     li a0, $f1
+// CC-NEXT:     addi a0, gp, %gprel(+($f1 0))
 // CC-NEXT:     push a0
 // CC-NEXT:     addi a0, fp, -8
 // CC-NEXT:     push a0
@@ -31,7 +31,7 @@ void f()
 // CC-NEXT:     addi sp, sp, 12
 // CC-NEXT:     li a0, 8
 // CC-NEXT:     push a0
-// CC-NEXT:     li a0, $f1
+// CC-NEXT:     addi a0, gp, %gprel(+($f1 0))
 // CC-NEXT:     push a0
 // CC-NEXT:     addi a0, fp, -8
 // CC-NEXT:     push a0
@@ -74,9 +74,3 @@ void f()
 
 // CC:          .bss
 // CC-NEXT:
-// CC-NEXT:     .align 2
-// CC-NEXT: f1:
-// CC-NEXT:     .fill 8
-// CC-NEXT:     .global $f1
-// CC-NEXT:     .type $f1, "object"
-// CC-NEXT:     .size $f1, -($. $f1)
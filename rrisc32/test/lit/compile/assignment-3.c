@@ -20,26 +20,15 @@ void f() {
 
   // CC-NEXT:     li a0, 10
   // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, 1
-  // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, $a1
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     slli a2, a2, 2
-  // CC-NEXT:     add a0, a0, a2
   // CC-NEXT:     pop a2
-  // CC-NEXT:     sw a0, a2, 0
+  // CC-NEXT:     sw a2, +($a1 4)
   // CC-NEXT:     mv a0, a2
 
   { a1[1] += 10; }
 
   // CC-NEXT:     li a0, 10
   // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, 1
-  // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, $a1
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     slli a2, a2, 2
-  // CC-NEXT:     add a0, a0, a2
+  // CC-NEXT:     li a0, +($a1 4)
   // CC-NEXT:     sw fp, a0, -44
   // CC-NEXT:     lw a0, fp, -44
   // CC-NEXT:     lw a0, a0, 0
@@ -55,26 +44,15 @@ void f() {
 
   // CC-NEXT:     li a0, 30
   // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, 3
-  // CC-NEXT:     push a0
-  // CC-NEXT:     addi a0, fp, -40
   // CC-NEXT:     pop a2
-  // CC-NEXT:     slli a2, a2, 2
-  // CC-NEXT:     add a0, a0, a2
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     sw a0, a2, 0
+  // CC-NEXT:     sw fp, a2, -28
   // CC-NEXT:     mv a0, a2
 
   { a2[3] += 30; }
 
   // CC-NEXT:     li a0, 30
   // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, 3
-  // CC-NEXT:     push a0
-  // CC-NEXT:     addi a0, fp, -40
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     slli a2, a2, 2
-  // CC-NEXT:     add a0, a0, a2
+  // CC-NEXT:     addi a0, fp, -28
   // CC-NEXT:     sw fp, a0, -44
   // CC-NEXT:     lw a0, fp, -44
   // CC-NEXT:     lw a0, a0, 0
@@ -90,13 +68,7 @@ void f() {
 
   i = a1[1];
 
-  // CC-NEXT:     li a0, 1
-  // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, $a1
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     slli a2, a2, 2
-  // CC-NEXT:     add a0, a0, a2
-  // CC-NEXT:     lw a0, a0, 0
+  // CC-NEXT:     lw a0, +($a1 4)
   // CC-NEXT:     push a0
   // CC-NEXT:     pop a2
   // CC-NEXT:     sw fp, a2, -44
@@ -104,13 +76,7 @@ void f() {
 
   i += a1[1];
 
-  // CC-NEXT:     li a0, 1
-  // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, $a1
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     slli a2, a2, 2
-  // CC-NEXT:     add a0, a0, a2
-  // CC-NEXT:     lw a0, a0, 0
+  // CC-NEXT:     lw a0, +($a1 4)
   // CC-NEXT:     push a0
   // CC-NEXT:     lw a0, fp, -44
   // CC-NEXT:     pop a2
@@ -131,9 +97,7 @@ void f() {
 // CC-NEXT:
 // CC-NEXT:     .align 2
 // CC-NEXT: a1:
-// CC-NEXT:     .dw 1
-// CC-NEXT:     .dw 2
-// CC-NEXT:     .dw 3
+// CC-NEXT:     .dw 1, 2, 3
 // CC-NEXT:     .global $a1
 // CC-NEXT:     .type $a1, "object"
 // CC-NEXT:     .size $a1, -($. $a1)
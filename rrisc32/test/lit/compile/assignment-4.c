@@ -23,13 +23,8 @@ void f() {
 
   // CC-NEXT:     li a0, 10
   // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, 4
-  // CC-NEXT:     push a0
-  // CC-NEXT:     li a0, $f1
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     add a0, a0, a2
   // CC-NEXT:     pop a2
-  // CC-NEXT:     sw a0, a2, 0
+  // CC-NEXT:     sw gp, a2, %gprel(+($f1 4))
   // CC-NEXT:     mv a0, a2
   // CC-NEXT:     push a0
   // CC-NEXT:     pop a2
@@ -38,12 +33,7 @@ void f() {
 
   i = f2.i;
 
-  // CC-NEXT:     li a0, 4
-  // CC-NEXT:     push a0
-  // CC-NEXT:     addi a0, fp, -12
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     add a0, a0, a2
-  // CC-NEXT:     lw a0, a0, 0
+  // CC-NEXT:     lw a0, fp, -8
   // CC-NEXT:     push a0
   // CC-NEXT:     pop a2
   // CC-NEXT:     sw fp, a2, -4
@@ -51,12 +41,7 @@ void f() {
 
   i += f2.i;
 
-  // CC-NEXT:     li a0, 4
-  // CC-NEXT:     push a0
-  // CC-NEXT:     addi a0, fp, -12
-  // CC-NEXT:     pop a2
-  // CC-NEXT:     add a0, a0, a2
-  // CC-NEXT:     lw a0, a0, 0
+  // CC-NEXT:     lw a0, fp, -8
   // CC-NEXT:     push a0
   // CC-NEXT:     lw a0, fp, -4
   // CC-NEXT:     pop a2
@@ -0,0 +1,117 @@
+// RUN: rrisc32-cc --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+int lt = -1 < 1u;
+int div = -7 / 2;
+int rem = -7 % 2;
+unsigned neg = 0u - 1;
+int shift = 1 << 3 >> 1;
+int not = !0;
+int oct = 010;
+long long hex = 0xffffffff;
+int trunc = (char)0x1ff;
+int cond = 0 ? 5 : 6;
+int and = 2 && 3;
+char *ptr = (char *)0 + 3;
+int diff = (int *)8 - 1 == (int *)4;
+long long wide = 1LL << 40 >> 38;
+
+// CC:          .sdata
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: lt:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .global $lt
+// CC-NEXT:     .type $lt, "object"
+// CC-NEXT:     .size $lt, -($. $lt)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: div:
+// CC-NEXT:     .dw -3
+// CC-NEXT:     .global $div
+// CC-NEXT:     .type $div, "object"
+// CC-NEXT:     .size $div, -($. $div)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: rem:
+// CC-NEXT:     .dw -1
+// CC-NEXT:     .global $rem
+// CC-NEXT:     .type $rem, "object"
+// CC-NEXT:     .size $rem, -($. $rem)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: neg:
+// CC-NEXT:     .dw 4294967295
+// CC-NEXT:     .global $neg
+// CC-NEXT:     .type $neg, "object"
+// CC-NEXT:     .size $neg, -($. $neg)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: shift:
+// CC-NEXT:     .dw 4
+// CC-NEXT:     .global $shift
+// CC-NEXT:     .type $shift, "object"
+// CC-NEXT:     .size $shift, -($. $shift)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: not:
+// CC-NEXT:     .dw 1
+// CC-NEXT:     .global $not
+// CC-NEXT:     .type $not, "object"
+// CC-NEXT:     .size $not, -($. $not)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: oct:
+// CC-NEXT:     .dw 8
+// CC-NEXT:     .global $oct
+// CC-NEXT:     .type $oct, "object"
+// CC-NEXT:     .size $oct, -($. $oct)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: hex:
+// CC-NEXT:     .dq 4294967295
+// CC-NEXT:     .global $hex
+// CC-NEXT:     .type $hex, "object"
+// CC-NEXT:     .size $hex, -($. $hex)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: trunc:
+// CC-NEXT:     .dw -1
+// CC-NEXT:     .global $trunc
+// CC-NEXT:     .type $trunc, "object"
+// CC-NEXT:     .size $trunc, -($. $trunc)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: cond:
+// CC-NEXT:     .dw 6
+// CC-NEXT:     .global $cond
+// CC-NEXT:     .type $cond, "object"
+// CC-NEXT:     .size $cond, -($. $cond)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: and:
+// CC-NEXT:     .dw 1
+// CC-NEXT:     .global $and
+// CC-NEXT:     .type $and, "object"
+// CC-NEXT:     .size $and, -($. $and)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: ptr:
+// CC-NEXT:     .dw 3
+// CC-NEXT:     .global $ptr
+// CC-NEXT:     .type $ptr, "object"
+// CC-NEXT:     .size $ptr, -($. $ptr)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: diff:
+// CC-NEXT:     .dw 1
+// CC-NEXT:     .global $diff
+// CC-NEXT:     .type $diff, "object"
+// CC-NEXT:     .size $diff, -($. $diff)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: wide:
+// CC-NEXT:     .dq 4
+// CC-NEXT:     .global $wide
+// CC-NEXT:     .type $wide, "object"
+// CC-NEXT:     .size $wide, -($. $wide)
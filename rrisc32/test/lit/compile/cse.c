@@ -0,0 +1,155 @@
+// RUN: rrisc32-cc --optimize --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+struct T {
+  int x, y;
+};
+
+struct T arr[10];
+
+// &arr[i] is computed once
+void f(int i) {
+  arr[i].x = arr[i].y + arr[i].x;
+  arr[i].y = 0;
+}
+
+// CC:          .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -12
+// CC-NEXT:     sw fp, s1, -8
+// CC-NEXT:     sw fp, s2, -12
+// CC-NEXT:     lw s1, fp, 8
+// CC-NEXT:     li a0, $arr
+// CC-NEXT:     mv a2, s1
+// CC-NEXT:     slli a2, a2, 3
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     mv s2, a0
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     lw a0, a0, 0
+// CC-NEXT:     push a0
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     lw a0, a0, 4
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     push a0
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw a0, a2, 0
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     li a0, 0
+// CC-NEXT:     push a0
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw a0, a2, 4
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     lw s1, fp, -8
+// CC-NEXT:     lw s2, fp, -12
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
+
+int a[10];
+
+// &a[i] is computed again after *p = 3, since p points to i by then
+int g(void) {
+  int i = 1, s, t, k;
+  int *p = 0;
+  for (k = 0; k < 2; k++) {
+    if (p) {
+      s = a[i];
+      *p = 3;
+      t = a[i];
+      return s + t;
+    }
+    p = &i;
+  }
+  return 0;
+}
+
+// CC:          .global $g
+// CC-NEXT:     .type $g, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: g:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -36
+// CC-NEXT:     sw fp, s1, -24
+// CC-NEXT:     sw fp, s2, -28
+// CC-NEXT:     sw fp, s3, -32
+// CC-NEXT:     sw fp, s4, -36
+// CC-NEXT:     li a0, 1
+// CC-NEXT:     sw fp, a0, -4
+// CC-NEXT:     li s1, 0
+// CC-NEXT:     li a0, 0
+// CC-NEXT:     mv s2, a0
+// CC-NEXT: .LL_1.for.start:
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     li a2, 2
+// CC-NEXT:     slt a0, a0, a2
+// CC-NEXT:     beqz a0, $.LL_3.for.end
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     beqz a0, $.LL_4.if.false
+// CC-NEXT:     lw a0, fp, -4
+// CC-NEXT:     push a0
+// CC-NEXT:     li a0, $a
+// CC-NEXT:     pop a2
+// CC-NEXT:     slli a2, a2, 2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw a0, a0, 0
+// CC-NEXT:     mv s3, a0
+// CC-NEXT:     li a0, 3
+// CC-NEXT:     push a0
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw s1, a2, 0
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     lw a0, fp, -4
+// CC-NEXT:     push a0
+// CC-NEXT:     li a0, $a
+// CC-NEXT:     pop a2
+// CC-NEXT:     slli a2, a2, 2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw a0, a0, 0
+// CC-NEXT:     mv s4, a0
+// CC-NEXT:     mv a0, s3
+// CC-NEXT:     mv a2, s4
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw s1, fp, -24
+// CC-NEXT:     lw s2, fp, -28
+// CC-NEXT:     lw s3, fp, -32
+// CC-NEXT:     lw s4, fp, -36
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT: .LL_4.if.false:
+// CC-NEXT: .LL_5.if.end:
+// CC-NEXT:     addi a0, fp, -4
+// CC-NEXT:     mv s1, a0
+// CC-NEXT: .LL_2.for.next:
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     li a2, 1
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     mv s2, a0
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     li a2, 1
+// CC-NEXT:     sub a0, a0, a2
+// CC-NEXT:     j $.LL_1.for.start
+// CC-NEXT: .LL_3.for.end:
+// CC-NEXT:     li a0, 0
+// CC-NEXT:     lw s1, fp, -24
+// CC-NEXT:     lw s2, fp, -28
+// CC-NEXT:     lw s3, fp, -32
+// CC-NEXT:     lw s4, fp, -36
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $g, -($. $g)
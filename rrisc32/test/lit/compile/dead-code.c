@@ -0,0 +1,119 @@
+// RUN: rrisc32-cc --optimize --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+int puts(const char *s);
+
+static int used(int x) { return x + 1; }
+
+// only referenced by an unreferenced static function
+static int unused2(int x) { return x * 2; }
+static int unused1(int x) { return unused2(x); }
+
+static int counter;
+static int unusedCounter;
+
+int f(int x) {
+  if (0)
+    puts("never");
+  while (0)
+    x--;
+  if (x)
+    return used(x) + counter;
+  return 0;
+  puts("after return");
+}
+
+const char *g(void) { return __func__; }
+
+// CC:          .text
+// CC-NEXT:
+// CC-NEXT:     .local $used
+// CC-NEXT:     .type $used, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: used:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -4
+// CC-NEXT:     sw fp, s1, -4
+// CC-NEXT:     lw s1, fp, 8
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     li a2, 1
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw s1, fp, -4
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $used, -($. $used)
+// CC-NEXT:
+// CC-NEXT:     .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -4
+// CC-NEXT:     sw fp, s1, -4
+// CC-NEXT:     lw s1, fp, 8
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     beqz a0, $.LL_5.if.false
+// CC-NEXT:     lw a0, gp, %gprel(+($counter 0))
+// CC-NEXT:     push a0
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     push a0
+// CC-NEXT:     call $used
+// CC-NEXT:     addi sp, sp, 4
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw s1, fp, -4
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT: .LL_5.if.false:
+// CC-NEXT: .LL_6.if.end:
+// CC-NEXT:     li a0, 0
+// CC-NEXT:     lw s1, fp, -4
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
+// CC-NEXT:
+// CC-NEXT:     .global $g
+// CC-NEXT:     .type $g, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: g:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi a0, gp, %gprel(+($g.__func__.5 0))
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $g, -($. $g)
+// CC-NEXT:
+// CC-NEXT:     .rodata
+// CC-NEXT:
+// CC-NEXT:     .data
+// CC-NEXT:
+// CC-NEXT:     .sdata
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: counter:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .local $counter
+// CC-NEXT:     .type $counter, "object"
+// CC-NEXT:     .size $counter, -($. $counter)
+// CC-NEXT:
+// CC-NEXT: g.__func__.5:
+// CC-NEXT:     .asciz "g"
+// CC-NEXT:     .local $g.__func__.5
+// CC-NEXT:     .type $g.__func__.5, "object"
+// CC-NEXT:     .size $g.__func__.5, -($. $g.__func__.5)
+// CC-NEXT:
+// CC-NEXT:     .bss
+// CC-NEXT:
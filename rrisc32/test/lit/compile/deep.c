@@ -0,0 +1,13 @@
+// RUN: python -c "print('int f(int a) { return ' + ' + '.join(['a'] * 5000) + '; }')" > %t.c
+// RUN: python -c "print('int g(int a) {' + ' { a++;' * 2000 + ' }' * 2000 + ' return a; }')" >> %t.c
+// RUN: rrisc32-cc --compile -o %t.s %t.c
+// RUN: grep -c "add a0, a0, a2" %t.s | filecheck %s --check-prefix=CC
+// RUN: python -c "import sys, threading; sys.path.insert(0, '%S/../../../tools/compile'); \
+// RUN:   from toolchain import compileSource; \
+// RUN:   settings = lambda: (sys.getrecursionlimit(), threading.stack_size()); \
+// RUN:   old = settings(); compileSource(open('%t.c').read()); \
+// RUN:   assert settings() == old, (settings(), old)"
+
+// Expressions and blocks nested thousands of levels deep
+
+// CC: 6999
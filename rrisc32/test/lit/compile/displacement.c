@@ -0,0 +1,59 @@
+// RUN: rrisc32-cc --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+struct Foo {
+  char c;
+  short h;
+  int i;
+  long long ll;
+};
+
+void f(struct Foo *p, int *a) {
+  p->i = p->c + p->h;
+  a[2] = a[-1];
+  p->ll = (p + 1)->ll;
+}
+
+// CC:          .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     lh a0, a0, 2
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     lb a0, a0, 0
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw a0, a2, 4
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     lw a0, fp, 12
+// CC-NEXT:     lw a0, a0, -4
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, fp, 12
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw a0, a2, 8
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     lw a1, a0, 28
+// CC-NEXT:     lw a0, a0, 24
+// CC-NEXT:     push a1
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     pop a2
+// CC-NEXT:     pop a3
+// CC-NEXT:     sw a0, a2, 8
+// CC-NEXT:     sw a0, a3, 12
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     mv a1, a3
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
@@ -0,0 +1,42 @@
+// RUN: rrisc32-cc --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+char simple[] = "\a\b\f\n\r\t\v\?\'\"\\";
+char octal[] = "\1\101\0123";
+char hex[] = "\x7e\x7F";
+char c1 = '\'';
+char c2 = '\377';
+
+// CC:          .data
+// CC-NEXT:
+// CC-NEXT: simple:
+// CC-NEXT:     .asciz "\x07\x08\x0c\n\x0d\t\x0b?'\"\\"
+// CC-NEXT:     .global $simple
+// CC-NEXT:     .type $simple, "object"
+// CC-NEXT:     .size $simple, -($. $simple)
+// CC-NEXT:
+// CC-NEXT:     .sdata
+// CC-NEXT:
+// CC-NEXT: octal:
+// CC-NEXT:     .asciz "\x01A\n3"
+// CC-NEXT:     .global $octal
+// CC-NEXT:     .type $octal, "object"
+// CC-NEXT:     .size $octal, -($. $octal)
+// CC-NEXT:
+// CC-NEXT: hex:
+// CC-NEXT:     .asciz "~\x7f"
+// CC-NEXT:     .global $hex
+// CC-NEXT:     .type $hex, "object"
+// CC-NEXT:     .size $hex, -($. $hex)
+// CC-NEXT:
+// CC-NEXT: c1:
+// CC-NEXT:     .db 39
+// CC-NEXT:     .global $c1
+// CC-NEXT:     .type $c1, "object"
+// CC-NEXT:     .size $c1, -($. $c1)
+// CC-NEXT:
+// CC-NEXT: c2:
+// CC-NEXT:     .db -1
+// CC-NEXT:     .global $c2
+// CC-NEXT:     .type $c2, "object"
+// CC-NEXT:     .size $c2, -($. $c2)
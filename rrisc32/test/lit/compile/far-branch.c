@@ -0,0 +1,8 @@
+// RUN: python -c "print('int f(int a) { if (a) {' + ' a = a * 3 + 1;' * 400 + ' } return a; }')" > %t.c
+// RUN: ! rrisc32-cc --assemble --nostdinc -o %t.o %t.c 2> %t.err
+// RUN: filecheck %s --check-prefix=ERR < %t.err
+
+// Conditional branches are not turned into far ones by the integrated
+// assembler, which reports a target beyond their reach
+
+// ERR: AssemblyError: ('branch target out of range', 'beq a0, x0, $.LL_1.if.false', {{[0-9]+}}, 'at most 4 KiB away')
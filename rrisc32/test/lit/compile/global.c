@@ -27,34 +27,30 @@ Goo g1 = {'a'};
 
 Goo *pg1 = &g1;
 
+short reps[24] = {7, 7, 7, 7, 7, 7, 7, 7, 7, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14};
+char s5[8] = "hi";
+
+int zeros[64] = {0};
+Goo g2 = {0, 0, "", 0};
+
+int peq = (char *)0 == (char *)0;
+int pne = (char *)4 != (void *)0;
+
 // CC:          .rodata
-// CC-NEXT: .LS_1:
+// CC-NEXT:
+// CC-NEXT:     .section ".rodata.str1.1"
+// CC-NEXT: .LS.94f6d9cdd1ea8248:
 // CC-NEXT:     .asciz ""
-// CC-NEXT: .LS_2:
+// CC-NEXT: .LS.03d855410dd468d7:
 // CC-NEXT:     .asciz "hello"
-// CC-NEXT: .LS_3:
+// CC-NEXT: .LS.5b68c2de7394f92a:
 // CC-NEXT:     .asciz "c"
 
 // CC:          .data
 // CC-NEXT:
 // CC-NEXT:     .align 2
-// CC-NEXT: i2:
-// CC-NEXT:     .dw 100
-// CC-NEXT:     .global $i2
-// CC-NEXT:     .type $i2, "object"
-// CC-NEXT:     .size $i2, -($. $i2)
-// CC-NEXT:
-// CC-NEXT:     .align 2
-// CC-NEXT: arr1:
-// CC-NEXT:     .global $arr1
-// CC-NEXT:     .type $arr1, "object"
-// CC-NEXT:     .size $arr1, -($. $arr1)
-// CC-NEXT:
-// CC-NEXT:     .align 2
 // CC-NEXT: arr2:
-// CC-NEXT:     .dw 1
-// CC-NEXT:     .dw 2
-// CC-NEXT:     .dw 3
+// CC-NEXT:     .dw 1, 2, 3
 // CC-NEXT:     .global $arr2
 // CC-NEXT:     .type $arr2, "object"
 // CC-NEXT:     .size $arr2, -($. $arr2)
@@ -68,15 +64,60 @@ Goo *pg1 = &g1;
 // CC-NEXT:     .size $arr3, -($. $arr3)
 // CC-NEXT:
 // CC-NEXT:     .align 2
+// CC-NEXT: f1:
+// CC-NEXT:     .db 97
+// CC-NEXT:     .fill 3
+// CC-NEXT:     .dw 10
+// CC-NEXT:     .asciz "b"
+// CC-NEXT:     .fill 2
+// CC-NEXT:     .dw $.LS.5b68c2de7394f92a
+// CC-NEXT:     .global $f1
+// CC-NEXT:     .type $f1, "object"
+// CC-NEXT:     .size $f1, -($. $f1)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: g1:
+// CC-NEXT:     .db 97
+// CC-NEXT:     .fill 15
+// CC-NEXT:     .global $g1
+// CC-NEXT:     .type $g1, "object"
+// CC-NEXT:     .size $g1, -($. $g1)
+// CC-NEXT:
+// CC-NEXT:     .align 1
+// CC-NEXT: reps:
+// CC-NEXT:     .fill 9, 2, 7
+// CC-NEXT:     .dh 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14
+// CC-NEXT:     .fill 2
+// CC-NEXT:     .global $reps
+// CC-NEXT:     .type $reps, "object"
+// CC-NEXT:     .size $reps, -($. $reps)
+// CC-NEXT:
+// CC-NEXT:     .sdata
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: i1:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .global $i1
+// CC-NEXT:     .type $i1, "object"
+// CC-NEXT:     .size $i1, -($. $i1)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: i2:
+// CC-NEXT:     .dw 100
+// CC-NEXT:     .global $i2
+// CC-NEXT:     .type $i2, "object"
+// CC-NEXT:     .size $i2, -($. $i2)
+// CC-NEXT:
+// CC-NEXT:     .align 2
 // CC-NEXT: s1:
-// CC-NEXT:     .dw $.LS_1
+// CC-NEXT:     .dw $.LS.94f6d9cdd1ea8248
 // CC-NEXT:     .global $s1
 // CC-NEXT:     .type $s1, "object"
 // CC-NEXT:     .size $s1, -($. $s1)
 // CC-NEXT:
 // CC-NEXT:     .align 2
 // CC-NEXT: s2:
-// CC-NEXT:     .dw $.LS_2
+// CC-NEXT:     .dw $.LS.03d855410dd468d7
 // CC-NEXT:     .global $s2
 // CC-NEXT:     .type $s2, "object"
 // CC-NEXT:     .size $s2, -($. $s2)
@@ -88,47 +129,57 @@ Goo *pg1 = &g1;
 // CC-NEXT:     .size $s3, -($. $s3)
 // CC-NEXT:
 // CC-NEXT: s4:
-// CC-NEXT:     .db 104
-// CC-NEXT:     .db 101
-// CC-NEXT:     .db 108
-// CC-NEXT:     .db 108
-// CC-NEXT:     .db 111
+// CC-NEXT:     .db 104, 101, 108, 108, 111
 // CC-NEXT:     .global $s4
 // CC-NEXT:     .type $s4, "object"
 // CC-NEXT:     .size $s4, -($. $s4)
 // CC-NEXT:
 // CC-NEXT:     .align 2
-// CC-NEXT: f1:
-// CC-NEXT:     .db 97
-// CC-NEXT:     .fill 3
-// CC-NEXT:     .dw 10
-// CC-NEXT:     .asciz "b"
-// CC-NEXT:     .fill 2
-// CC-NEXT:     .dw $.LS_3
-// CC-NEXT:     .global $f1
-// CC-NEXT:     .type $f1, "object"
-// CC-NEXT:     .size $f1, -($. $f1)
-// CC-NEXT:
-// CC-NEXT:     .align 2
-// CC-NEXT: g1:
-// CC-NEXT:     .db 97
-// CC-NEXT:     .fill 15
-// CC-NEXT:     .global $g1
-// CC-NEXT:     .type $g1, "object"
-// CC-NEXT:     .size $g1, -($. $g1)
-// CC-NEXT:
-// CC-NEXT:     .align 2
 // CC-NEXT: pg1:
 // CC-NEXT:     .dw $g1
 // CC-NEXT:     .global $pg1
 // CC-NEXT:     .type $pg1, "object"
 // CC-NEXT:     .size $pg1, -($. $pg1)
+// CC-NEXT:
+// CC-NEXT: s5:
+// CC-NEXT:     .asciz "hi"
+// CC-NEXT:     .fill 5
+// CC-NEXT:     .global $s5
+// CC-NEXT:     .type $s5, "object"
+// CC-NEXT:     .size $s5, -($. $s5)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: peq:
+// CC-NEXT:     .dw 1
+// CC-NEXT:     .global $peq
+// CC-NEXT:     .type $peq, "object"
+// CC-NEXT:     .size $peq, -($. $peq)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: pne:
+// CC-NEXT:     .dw 1
+// CC-NEXT:     .global $pne
+// CC-NEXT:     .type $pne, "object"
+// CC-NEXT:     .size $pne, -($. $pne)
 
 // CC:          .bss
 // CC-NEXT:
 // CC-NEXT:     .align 2
-// CC-NEXT: i1:
-// CC-NEXT:     .fill 4
-// CC-NEXT:     .global $i1
-// CC-NEXT:     .type $i1, "object"
-// CC-NEXT:     .size $i1, -($. $i1)
+// CC-NEXT: arr1:
+// CC-NEXT:     .global $arr1
+// CC-NEXT:     .type $arr1, "object"
+// CC-NEXT:     .size $arr1, -($. $arr1)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: zeros:
+// CC-NEXT:     .fill 256
+// CC-NEXT:     .global $zeros
+// CC-NEXT:     .type $zeros, "object"
+// CC-NEXT:     .size $zeros, -($. $zeros)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: g2:
+// CC-NEXT:     .fill 16
+// CC-NEXT:     .global $g2
+// CC-NEXT:     .type $g2, "object"
+// CC-NEXT:     .size $g2, -($. $g2)
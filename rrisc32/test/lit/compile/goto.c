@@ -12,6 +12,15 @@ start:
 end:;
 }
 
+// the epilogue of the labelled return is not emitted again at the end
+int h(int i) {
+  if (i)
+    goto out;
+  i = 2;
+out:
+  return i;
+}
+
 // CC:          .global $g
 // CC-NEXT:     .type $g, "function"
 // CC-NEXT:     .align 2
@@ -24,7 +33,6 @@ end:;
 // CC-NEXT:     lw a0, fp, 8
 // CC-NEXT:     beqz a0, $.LL_1.if.false
 // CC-NEXT:     j $.LF.g.end
-// CC-NEXT:     j $.LL_2.if.end
 // CC-NEXT: .LL_1.if.false:
 // CC-NEXT: .LL_2.if.end:
 // CC-NEXT:     j $.LF.g.start
@@ -34,3 +42,28 @@ end:;
 // CC-NEXT:     pop ra
 // CC-NEXT:     ret
 // CC-NEXT:     .size $g, -($. $g)
+
+// CC:          .global $h
+// CC-NEXT:     .type $h, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: h:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     beqz a0, $.LL_3.if.false
+// CC-NEXT:     j $.LF.h.out
+// CC-NEXT: .LL_3.if.false:
+// CC-NEXT: .LL_4.if.end:
+// CC-NEXT:     li a0, 2
+// CC-NEXT:     push a0
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw fp, a2, 8
+// CC-NEXT:     mv a0, a2
+// CC-NEXT: .LF.h.out:
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $h, -($. $h)
@@ -0,0 +1,32 @@
+// RUN: rrisc32-cc --optimize --incremental --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+// unreachable static functions are kept, as whether they are referenced is
+// not known when they are compiled
+static int g(void) { return 1; }
+
+static int h(void) { return 2; }
+
+int f(void) { return h(); }
+
+const char *name(void) { return __func__; }
+
+const char *s(void) { return "s"; }
+
+// CC:          .local $g
+// CC:          .local $h
+// CC:          .global $f
+// CC:          call $h
+// CC:          .global $name
+// CC:          addi a0, gp, %gprel(+($name.__func__.4 0))
+// CC:          .global $s
+// CC:          li a0, $.LS.f2c99cdbe6ff4ad0
+
+// CC:          .section ".rodata.str1.1"
+// CC-NEXT: .LS.f2c99cdbe6ff4ad0:
+// CC-NEXT:     .asciz "s"
+
+// CC:          .sdata
+// CC-NEXT:
+// CC-NEXT: name.__func__.4:
+// CC-NEXT:     .asciz "name"
@@ -26,39 +26,23 @@ void f(int i) {
 // CC-NEXT:     push fp
 // CC-NEXT:     mv fp, sp
 // CC-NEXT:     addi sp, sp, -16
-// CC-NEXT:     li a0, 12
-// CC-NEXT:     push a0
-// CC-NEXT:     li a0, 0
-// CC-NEXT:     push a0
-// CC-NEXT:     addi a0, fp, -12
-// CC-NEXT:     push a0
-// CC-NEXT:     call $__builtin_memset
-// CC-NEXT:     addi sp, sp, 12
-// CC-NEXT:     li a0, 1
+// CC-NEXT:     li a1, $.LI.f.arr.1
+// CC-NEXT:     lw a0, a1, 0
 // CC-NEXT:     sw fp, a0, -12
-// CC-NEXT:     li a0, 2
+// CC-NEXT:     lw a0, a1, 4
 // CC-NEXT:     sw fp, a0, -8
-// CC-NEXT:     li a0, 3
+// CC-NEXT:     lw a0, a1, 8
 // CC-NEXT:     sw fp, a0, -4
-// CC-NEXT:     li a0, $.LS_1
+// CC-NEXT:     li a0, $.LS.03d855410dd468d7
 // CC-NEXT:     sw fp, a0, -16
-// CC-NEXT:     li a0, 16
-// CC-NEXT:     push a0
-// CC-NEXT:     li a0, 0
-// CC-NEXT:     push a0
-// CC-NEXT:     addi a0, fp, -16
-// CC-NEXT:     push a0
-// CC-NEXT:     call $__builtin_memset
-// CC-NEXT:     addi sp, sp, 12
-// CC-NEXT:     li a0, 97
-// CC-NEXT:     sb fp, a0, -16
-// CC-NEXT:     li a0, 10
+// CC-NEXT:     li a1, $.LI.f.f.2
+// CC-NEXT:     lw a0, a1, 0
+// CC-NEXT:     sw fp, a0, -16
+// CC-NEXT:     lw a0, a1, 4
 // CC-NEXT:     sw fp, a0, -12
-// CC-NEXT:     li a0, 98
-// CC-NEXT:     sb fp, a0, -8
-// CC-NEXT:     li a0, 0
-// CC-NEXT:     sb fp, a0, -7
-// CC-NEXT:     li a0, $.LS_2
+// CC-NEXT:     lw a0, a1, 8
+// CC-NEXT:     sw fp, a0, -8
+// CC-NEXT:     lw a0, a1, 12
 // CC-NEXT:     sw fp, a0, -4
 // CC-NEXT:     mv sp, fp
 // CC-NEXT:     pop fp
@@ -67,7 +51,22 @@ void f(int i) {
 // CC-NEXT:     .size $f, -($. $f)
 
 // CC:          .rodata
-// CC-NEXT: .LS_1:
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: .LI.f.arr.1:
+// CC-NEXT:     .dw 1, 2, 3
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: .LI.f.f.2:
+// CC-NEXT:     .db 97
+// CC-NEXT:     .fill 3
+// CC-NEXT:     .dw 10
+// CC-NEXT:     .asciz "b"
+// CC-NEXT:     .fill 2
+// CC-NEXT:     .dw $.LS.5b68c2de7394f92a
+// CC-NEXT:
+// CC-NEXT:     .section ".rodata.str1.1"
+// CC-NEXT: .LS.03d855410dd468d7:
 // CC-NEXT:     .asciz "hello"
-// CC-NEXT: .LS_2:
+// CC-NEXT: .LS.5b68c2de7394f92a:
 // CC-NEXT:     .asciz "c"
@@ -0,0 +1,78 @@
+// RUN: rrisc32-cc --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+void f(int i) {
+    char buf[64] = "hello, world";
+    int arr[16] = {1, 2, 3, 4, 5, 6, 7, 8, 9, 10};
+    int zeros[8] = {0};
+    int v[4] = {i, 0, 1};
+}
+
+// CC:          .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -176
+// CC-NEXT:     li a1, $.LI.f.buf.1
+// CC-NEXT:     lw a0, a1, 0
+// CC-NEXT:     sw fp, a0, -64
+// CC-NEXT:     lw a0, a1, 4
+// CC-NEXT:     sw fp, a0, -60
+// CC-NEXT:     lw a0, a1, 8
+// CC-NEXT:     sw fp, a0, -56
+// CC-NEXT:     lw a0, a1, 12
+// CC-NEXT:     sw fp, a0, -52
+// CC-NEXT:     addi a0, fp, -48
+// CC-NEXT:     addi a1, a0, 48
+// CC-NEXT: 1:
+// CC-NEXT:     sw a0, zero, 0
+// CC-NEXT:     addi a0, a0, 4
+// CC-NEXT:     bltu a0, a1, $1b
+// CC-NEXT:     li a1, $.LI.f.arr.2
+// CC-NEXT:     addi a0, fp, -128
+// CC-NEXT:     addi a2, a1, 40
+// CC-NEXT: 1:
+// CC-NEXT:     lw a3, a1, 0
+// CC-NEXT:     addi a1, a1, 4
+// CC-NEXT:     sw a0, a3, 0
+// CC-NEXT:     addi a0, a0, 4
+// CC-NEXT:     bltu a1, a2, $1b
+// CC-NEXT:     addi a0, fp, -88
+// CC-NEXT:     addi a1, a0, 24
+// CC-NEXT: 1:
+// CC-NEXT:     sw a0, zero, 0
+// CC-NEXT:     addi a0, a0, 4
+// CC-NEXT:     bltu a0, a1, $1b
+// CC-NEXT:     addi a0, fp, -160
+// CC-NEXT:     addi a1, a0, 32
+// CC-NEXT: 1:
+// CC-NEXT:     sw a0, zero, 0
+// CC-NEXT:     addi a0, a0, 4
+// CC-NEXT:     bltu a0, a1, $1b
+// CC-NEXT:     sw fp, zero, -176
+// CC-NEXT:     sw fp, zero, -172
+// CC-NEXT:     sw fp, zero, -168
+// CC-NEXT:     sw fp, zero, -164
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     sw fp, a0, -176
+// CC-NEXT:     li a0, 1
+// CC-NEXT:     sw fp, a0, -168
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
+
+// CC:          .rodata
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: .LI.f.buf.1:
+// CC-NEXT:     .asciz "hello, world"
+// CC-NEXT:     .fill 3
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: .LI.f.arr.2:
+// CC-NEXT:     .dw 1, 2, 3, 4, 5, 6, 7, 8, 9, 10
@@ -0,0 +1,60 @@
+// RUN: rrisc32-cc --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+// initializers with addresses of locals are stored piece by piece, not copied
+// from a template
+
+struct S {
+  int *p;
+  int *q;
+  int n;
+};
+
+int g(int **, struct S *);
+
+int f() {
+  int a, b, c;
+  int *p[4] = {&a, &b, &c, &a};
+  struct S s = {&a, &b, 3};
+  return g(p, &s);
+}
+
+// CC:          .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -40
+// CC-NEXT:     sw fp, zero, -28
+// CC-NEXT:     sw fp, zero, -24
+// CC-NEXT:     sw fp, zero, -20
+// CC-NEXT:     sw fp, zero, -16
+// CC-NEXT:     addi a0, fp, -4
+// CC-NEXT:     sw fp, a0, -28
+// CC-NEXT:     addi a0, fp, -8
+// CC-NEXT:     sw fp, a0, -24
+// CC-NEXT:     addi a0, fp, -12
+// CC-NEXT:     sw fp, a0, -20
+// CC-NEXT:     addi a0, fp, -4
+// CC-NEXT:     sw fp, a0, -16
+// CC-NEXT:     sw fp, zero, -40
+// CC-NEXT:     sw fp, zero, -36
+// CC-NEXT:     sw fp, zero, -32
+// CC-NEXT:     addi a0, fp, -4
+// CC-NEXT:     sw fp, a0, -40
+// CC-NEXT:     addi a0, fp, -8
+// CC-NEXT:     sw fp, a0, -36
+// CC-NEXT:     li a0, 3
+// CC-NEXT:     sw fp, a0, -32
+// CC-NEXT:     addi a0, fp, -40
+// CC-NEXT:     push a0
+// CC-NEXT:     addi a0, fp, -28
+// CC-NEXT:     push a0
+// CC-NEXT:     call $g
+// CC-NEXT:     addi sp, sp, 8
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
@@ -0,0 +1,40 @@
+// RUN: rrisc32-cc --assemble -o %t.o %s
+// RUN: rrisc32-cc --assemble --no-integrated-as -o %t.as.o %s
+// RUN: rrisc32-dump --sec --sym --rel --hex .sdata %t.o > %t.dump
+// RUN: rrisc32-dump --sec --sym --rel --hex .sdata %t.as.o | diff %t.dump -
+// RUN: cat %t.dump | filecheck %s --check-prefix=CC
+
+int puts(const char *s);
+
+int n = 3;
+static short hs[] = {1, -2};
+char *msg = "hi";
+
+static int add(int a, int b) { return a + b; }
+
+int main() {
+  for (int i = 0; i < n; ++i)
+    puts(msg);
+  return add(hs[0], hs[1]);
+}
+
+// CC:      08      0c      00      0c      LOCAL   SECTION DEF     05      .sdata
+// CC-NEXT: 08      0d      00      04      GLOBAL  OBJECT  DEF     05      n
+// CC-NEXT: 08      0e      04      04      LOCAL   OBJECT  DEF     05      hs
+// CC-NEXT: 08      0f      08      04      GLOBAL  OBJECT  DEF     05      msg
+// CC-NEXT: 08      10      00      00      GLOBAL  NOTYPE  DEF     UND     puts
+
+// CC:      [ Relocations ]
+// CC-NEXT: SecBeTo Idx     Offset  Type    Addend  Sym     SecSym  SecRel
+// CC-NEXT: 0a      00      68      GPREL_I 0       0d      08      02
+// CC-NEXT: 0a      01      88      GPREL_I 0       0f      08      02
+// CC-NEXT: 0a      02      94      HI20    0       10      08      02
+// CC-NEXT: 0a      03      98      LO12_I  0       10      08      02
+// CC-NEXT: 0a      04      d8      GPREL_I 2       0e      08      02
+// CC-NEXT: 0a      05      e4      GPREL_I 0       0e      08      02
+// CC-NEXT: 0a      06      f0      HI20    0       05      08      02
+// CC-NEXT: 0a      07      f4      LO12_I  0       05      08      02
+// CC-NEXT: 0b      00      08      32      0       0b      08      05
+
+// CC:      [ Hex/.sdata ]
+// CC-NEXT: 0000000000000000  00000003 fffe0001 00000000
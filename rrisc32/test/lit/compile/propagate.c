@@ -0,0 +1,72 @@
+// RUN: rrisc32-cc --optimize --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+int g(int);
+
+// n is replaced with 10, y with x, and the stores to z are dropped
+int f(int *a, int x) {
+  int n = 10;
+  int y = x;
+  int z = g(n);
+  int s = 0;
+  for (int i = 0; i < n; ++i)
+    s += a[i];
+  z = s;
+  return s + y;
+}
+
+// CC:          .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -36
+// CC-NEXT:     sw fp, s1, -24
+// CC-NEXT:     sw fp, s2, -28
+// CC-NEXT:     sw fp, s3, -32
+// CC-NEXT:     sw fp, s4, -36
+// CC-NEXT:     lw s3, fp, 8
+// CC-NEXT:     lw s4, fp, 12
+// CC-NEXT:     li a0, 10
+// CC-NEXT:     push a0
+// CC-NEXT:     call $g
+// CC-NEXT:     addi sp, sp, 4
+// CC-NEXT:     li s2, 0
+// CC-NEXT:     li s1, 0
+// CC-NEXT: .LL_1.for.start:
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     li a2, 10
+// CC-NEXT:     slt a0, a0, a2
+// CC-NEXT:     beqz a0, $.LL_3.for.end
+// CC-NEXT:     mv a0, s3
+// CC-NEXT:     mv a2, s1
+// CC-NEXT:     slli a2, a2, 2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw a0, a0, 0
+// CC-NEXT:     push a0
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     mv s2, a0
+// CC-NEXT: .LL_2.for.next:
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     li a2, 1
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     mv s1, a0
+// CC-NEXT:     j $.LL_1.for.start
+// CC-NEXT: .LL_3.for.end:
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     mv a2, s4
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw s1, fp, -24
+// CC-NEXT:     lw s2, fp, -28
+// CC-NEXT:     lw s3, fp, -32
+// CC-NEXT:     lw s4, fp, -36
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
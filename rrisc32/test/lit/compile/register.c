@@ -0,0 +1,93 @@
+// RUN: rrisc32-cc --optimize --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+int sum(int *a, int n) {
+  int s = 0;
+  for (int i = 0; i < n; i++)
+    s += a[i];
+  return s;
+}
+
+int g(int);
+
+// x escapes, so it stays in the stack frame
+int f(int x) {
+  int y = g((int)&x);
+  return x + y;
+}
+
+// CC:          .global $sum
+// CC-NEXT:     .type $sum, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: sum:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -24
+// CC-NEXT:     sw fp, s1, -12
+// CC-NEXT:     sw fp, s2, -16
+// CC-NEXT:     sw fp, s3, -20
+// CC-NEXT:     sw fp, s4, -24
+// CC-NEXT:     lw s3, fp, 8
+// CC-NEXT:     lw s4, fp, 12
+// CC-NEXT:     li s2, 0
+// CC-NEXT:     li s1, 0
+// CC-NEXT: .LL_1.for.start:
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     mv a2, s4
+// CC-NEXT:     slt a0, a0, a2
+// CC-NEXT:     beqz a0, $.LL_3.for.end
+// CC-NEXT:     mv a0, s3
+// CC-NEXT:     mv a2, s1
+// CC-NEXT:     slli a2, a2, 2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw a0, a0, 0
+// CC-NEXT:     push a0
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     mv s2, a0
+// CC-NEXT: .LL_2.for.next:
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     li a2, 1
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     mv s1, a0
+// CC-NEXT:     mv a0, s1
+// CC-NEXT:     li a2, 1
+// CC-NEXT:     sub a0, a0, a2
+// CC-NEXT:     j $.LL_1.for.start
+// CC-NEXT: .LL_3.for.end:
+// CC-NEXT:     mv a0, s2
+// CC-NEXT:     lw s1, fp, -12
+// CC-NEXT:     lw s2, fp, -16
+// CC-NEXT:     lw s3, fp, -20
+// CC-NEXT:     lw s4, fp, -24
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $sum, -($. $sum)
+// CC-NEXT:
+// CC-NEXT:     .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     addi sp, sp, -8
+// CC-NEXT:     sw fp, s1, -8
+// CC-NEXT:     addi a0, fp, 8
+// CC-NEXT:     push a0
+// CC-NEXT:     call $g
+// CC-NEXT:     addi sp, sp, 4
+// CC-NEXT:     mv s1, a0
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     mv a2, s1
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw s1, fp, -8
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
@@ -0,0 +1,10 @@
+// RUN: cp %s %t.c
+// RUN: rrisc32-cc --assemble --nostdinc --save-temps -o %t.o %t.c
+// RUN: rrisc32-cc --compile --nostdinc -o %t.s %t.c
+// RUN: diff %t.s %t.c.s
+// RUN: rrisc32-cc --assemble --nostdinc -o %t.direct.o %t.c
+// RUN: cmp %t.o %t.direct.o
+
+// The assembly is kept with the integrated assembler too
+
+int f(int a) { return a * 2; }
@@ -60,6 +60,15 @@ void g(int a, int b) {
 // CC:          .data
 // CC-NEXT:
 // CC-NEXT:     .align 2
+// CC-NEXT: arr1:
+// CC-NEXT:     .dw 1, 2, 3
+// CC-NEXT:     .global $arr1
+// CC-NEXT:     .type $arr1, "object"
+// CC-NEXT:     .size $arr1, -($. $arr1)
+// CC-NEXT:
+// CC-NEXT:     .sdata
+// CC-NEXT:
+// CC-NEXT:     .align 2
 // CC-NEXT: i1:
 // CC-NEXT:     .dw 4
 // CC-NEXT:     .global $i1
@@ -74,6 +83,13 @@ void g(int a, int b) {
 // CC-NEXT:     .size $i2, -($. $i2)
 // CC-NEXT:
 // CC-NEXT:     .align 2
+// CC-NEXT: f1:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .global $f1
+// CC-NEXT:     .type $f1, "object"
+// CC-NEXT:     .size $f1, -($. $f1)
+// CC-NEXT:
+// CC-NEXT:     .align 2
 // CC-NEXT: i3:
 // CC-NEXT:     .dw 4
 // CC-NEXT:     .global $i3
@@ -88,15 +104,6 @@ void g(int a, int b) {
 // CC-NEXT:     .size $i4, -($. $i4)
 // CC-NEXT:
 // CC-NEXT:     .align 2
-// CC-NEXT: arr1:
-// CC-NEXT:     .dw 1
-// CC-NEXT:     .dw 2
-// CC-NEXT:     .dw 3
-// CC-NEXT:     .global $arr1
-// CC-NEXT:     .type $arr1, "object"
-// CC-NEXT:     .size $arr1, -($. $arr1)
-// CC-NEXT:
-// CC-NEXT:     .align 2
 // CC-NEXT: i5:
 // CC-NEXT:     .dw 12
 // CC-NEXT:     .global $i5
@@ -105,9 +112,3 @@ void g(int a, int b) {
 
 // CC:          .bss
 // CC-NEXT:
-// CC-NEXT:     .align 2
-// CC-NEXT: f1:
-// CC-NEXT:     .fill 4
-// CC-NEXT:     .global $f1
-// CC-NEXT:     .type $f1, "object"
-// CC-NEXT:     .size $f1, -($. $f1)
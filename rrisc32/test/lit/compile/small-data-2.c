@@ -0,0 +1,43 @@
+// RUN: rrisc32-cc --compile -G 0 -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+int counter;
+
+void f() { ++counter; }
+
+// CC:          .text
+// CC-NEXT:
+// CC-NEXT:     .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     li a0, 1
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, +($counter 0)
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     push a0
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw a2, +($counter 0)
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
+// CC-NEXT:
+// CC-NEXT:     .rodata
+// CC-NEXT:
+// CC-NEXT:     .data
+// CC-NEXT:
+// CC-NEXT:     .bss
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: counter:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .global $counter
+// CC-NEXT:     .type $counter, "object"
+// CC-NEXT:     .size $counter, -($. $counter)
@@ -0,0 +1,57 @@
+// RUN: rrisc32-cc --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+int g;
+
+int f() { return g + *(&g + 1000); }
+
+int *h() { return &g + 1000; }
+
+// CC:          .text
+// CC-NEXT:
+// CC-NEXT:     .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     lw a0, +($g 4000)
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, gp, %gprel(+($g 0))
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
+// CC-NEXT:
+// CC-NEXT:     .global $h
+// CC-NEXT:     .type $h, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: h:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     li a0, +($g 4000)
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $h, -($. $h)
+// CC-NEXT:
+// CC-NEXT:     .rodata
+// CC-NEXT:
+// CC-NEXT:     .data
+// CC-NEXT:
+// CC-NEXT:     .sdata
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: g:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .global $g
+// CC-NEXT:     .type $g, "object"
+// CC-NEXT:     .size $g, -($. $g)
+// CC-NEXT:
+// CC-NEXT:     .bss
@@ -0,0 +1,90 @@
+// RUN: rrisc32-cc --compile -o %t.s %s
+// RUN: cat %t.s | filecheck %s --check-prefix=CC
+
+int counter;
+long long total;
+int table[16];
+
+void f(int i) {
+  ++counter;
+  total = total + table[i];
+}
+
+// CC:          .text
+// CC-NEXT:
+// CC-NEXT:     .global $f
+// CC-NEXT:     .type $f, "function"
+// CC-NEXT:     .align 2
+// CC-NEXT: f:
+// CC-NEXT:     push ra
+// CC-NEXT:     push fp
+// CC-NEXT:     mv fp, sp
+// CC-NEXT:     li a0, 1
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, gp, %gprel(+($counter 0))
+// CC-NEXT:     pop a2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     push a0
+// CC-NEXT:     pop a2
+// CC-NEXT:     sw gp, a2, %gprel(+($counter 0))
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     lw a0, fp, 8
+// CC-NEXT:     push a0
+// CC-NEXT:     li a0, $table
+// CC-NEXT:     pop a2
+// CC-NEXT:     slli a2, a2, 2
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     lw a0, a0, 0
+// CC-NEXT:     srai a1, a0, 31
+// CC-NEXT:     push a1
+// CC-NEXT:     push a0
+// CC-NEXT:     lw a0, gp, %gprel(+($total 0))
+// CC-NEXT:     lw a1, gp, %gprel(+($total 4))
+// CC-NEXT:     pop a2
+// CC-NEXT:     pop a3
+// CC-NEXT:     add a0, a0, a2
+// CC-NEXT:     sltu a2, a0, a2
+// CC-NEXT:     add a1, a1, a3
+// CC-NEXT:     add a1, a1, a2
+// CC-NEXT:     push a1
+// CC-NEXT:     push a0
+// CC-NEXT:     pop a2
+// CC-NEXT:     pop a3
+// CC-NEXT:     sw gp, a2, %gprel(+($total 0))
+// CC-NEXT:     sw gp, a3, %gprel(+($total 4))
+// CC-NEXT:     mv a0, a2
+// CC-NEXT:     mv a1, a3
+// CC-NEXT:     mv sp, fp
+// CC-NEXT:     pop fp
+// CC-NEXT:     pop ra
+// CC-NEXT:     ret
+// CC-NEXT:     .size $f, -($. $f)
+// CC-NEXT:
+// CC-NEXT:     .rodata
+// CC-NEXT:
+// CC-NEXT:     .data
+// CC-NEXT:
+// CC-NEXT:     .sdata
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: counter:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .global $counter
+// CC-NEXT:     .type $counter, "object"
+// CC-NEXT:     .size $counter, -($. $counter)
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: total:
+// CC-NEXT:     .fill 8
+// CC-NEXT:     .global $total
+// CC-NEXT:     .type $total, "object"
+// CC-NEXT:     .size $total, -($. $total)
+// CC-NEXT:
+// CC-NEXT:     .bss
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: table:
+// CC-NEXT:     .fill 64
+// CC-NEXT:     .global $table
+// CC-NEXT:     .type $table, "object"
+// CC-NEXT:     .size $table, -($. $table)
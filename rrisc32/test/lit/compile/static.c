@@ -20,12 +20,12 @@ int f() {
 // CC-NEXT:     push ra
 // CC-NEXT:     push fp
 // CC-NEXT:     mv fp, sp
-// CC-NEXT:     lw a0, +($f.i.4 0)
+// CC-NEXT:     lw a0, gp, %gprel(+($f.i.4 0))
 // CC-NEXT:     mv sp, fp
 // CC-NEXT:     pop fp
 // CC-NEXT:     pop ra
 // CC-NEXT:     ret
-// CC-NEXT:     lw a0, +($f.i.2 0)
+// CC-NEXT:     lw a0, gp, %gprel(+($f.i.2 0))
 // CC-NEXT:     mv sp, fp
 // CC-NEXT:     pop fp
 // CC-NEXT:     pop ra
@@ -34,11 +34,14 @@ int f() {
 
 // CC:          .data
 // CC-NEXT:
-// CC-NEXT: f.__func__.1:
-// CC-NEXT:     .asciz "f"
-// CC-NEXT:     .local $f.__func__.1
-// CC-NEXT:     .type $f.__func__.1, "object"
-// CC-NEXT:     .size $f.__func__.1, -($. $f.__func__.1)
+// CC-NEXT:     .sdata
+// CC-NEXT:
+// CC-NEXT:     .align 2
+// CC-NEXT: f.i.2:
+// CC-NEXT:     .fill 4
+// CC-NEXT:     .local $f.i.2
+// CC-NEXT:     .type $f.i.2, "object"
+// CC-NEXT:     .size $f.i.2, -($. $f.i.2)
 // CC-NEXT:
 // CC-NEXT:     .align 2
 // CC-NEXT: f.j.3:
@@ -56,10 +59,3 @@ int f() {
 // CC-NEXT:
 // CC-NEXT:     .bss
 // CC-NEXT:
-// CC-NEXT:     .align 2
-// CC-NEXT: f.i.2:
-// CC-NEXT:     .fill 4
-// CC-NEXT:     .local $f.i.2
-// CC-NEXT:     .type $f.i.2, "object"
-// CC-NEXT:     .size $f.i.2, -($. $f.i.2)
-// CC-NEXT:
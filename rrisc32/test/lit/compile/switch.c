@@ -43,7 +43,6 @@ void h(int i, int j) {
 // CC-NEXT: .LL_5.switch.case:
 // CC-NEXT:     call $e
 // CC-NEXT:     j $.LL_1.switch.end
-// CC-NEXT:     j $.LL_4.if.end
 // CC-NEXT: .LL_3.if.false:
 // CC-NEXT: .LL_4.if.end:
 // CC-NEXT: .LL_6.switch.default:
@@ -0,0 +1,48 @@
+# RUN: rrisc32-as -o %t.o %s
+# RUN: rrisc32-link --gc-sections -o %t.exe %t.o
+
+# RUN: rrisc32-dump --sym %t.exe | filecheck %s --check-prefix=SYM
+# RUN: rrisc32-dump --dis .text %t.exe | filecheck %s --check-prefix=TEXT
+# RUN: rrisc32-dump --hex .data %t.exe | filecheck %s --check-prefix=DATA
+
+  .section ".text.start"
+start:
+  call $f
+  ret
+
+  .section ".text.g"
+g:
+  lw x1, $y
+  ret
+
+  .section ".text.f"
+f:
+  lw x1, $x
+  ret
+
+  .section ".data.y"
+y:
+  .dw 2
+
+  .section ".data.x"
+x:
+  .dw 1
+
+# SYM-NOT: {{\s(g|y)$}}
+# SYM:     {{\sf$}}
+# SYM-NOT: {{\s(g|y)$}}
+# SYM:     {{\sstart$}}
+# SYM-NOT: {{\s(g|y)$}}
+# SYM:     {{\sx$}}
+# SYM-NOT: {{\s(g|y)$}}
+
+# TEXT:      [ Disassembly/.text ]
+# TEXT-NEXT: 00001000  lui x1, 1
+# TEXT-NEXT: 00001004  jalr x1, x1, 12
+# TEXT-NEXT: 00001008  jalr x0, x1, 0
+# TEXT-NEXT: 0000100c  lui x1, 2
+# TEXT-NEXT: 00001010  lw x1, x1, 0
+# TEXT-NEXT: 00001014  jalr x0, x1, 0
+
+# DATA:      [ Hex/.data ]
+# DATA-NEXT: 0000000000002000  00000001
@@ -0,0 +1,21 @@
+# RUN: rrisc32-as -o %t.o %s
+# RUN: rrisc32-dump --sec %t.o | filecheck %s --check-prefix=SEC
+
+  .text
+bar:
+  ret
+
+  .rodata
+bar_r:
+  .dw 7
+
+  .data
+  .dw $.LS.c, $.LS.d
+
+  .section ".rodata.str1.1"
+.LS.c:
+  .asciz "world"
+.LS.d:
+  .asciz "abc"
+
+# SEC: 01      01      AMS     PROGBIT .rodata.str1.1
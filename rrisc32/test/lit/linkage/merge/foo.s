@@ -0,0 +1,21 @@
+# RUN: rrisc32-as -o %t.o %s
+# RUN: rrisc32-dump --sec %t.o | filecheck %s --check-prefix=SEC
+
+  .text
+start:
+  li x1, $.LS.a
+  li x2, $.LS.b
+  ret
+
+  .data
+  .dw $.LS.a, $.LS.b, +($.LS.a 6)
+  # one past the end of "hello world", where "world" starts in this object
+  .dw +($.LS.a 12)
+
+  .section ".rodata.str1.1"
+.LS.a:
+  .asciz "hello world"
+.LS.b:
+  .asciz "world"
+
+# SEC: 01      01      AMS     PROGBIT .rodata.str1.1
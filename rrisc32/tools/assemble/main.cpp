@@ -9,7 +9,9 @@ int main(int argc, char *argv[]) {
   CLI::App app;
   app.add_option("-o", o.outFile, "Output file (default <input_file>.o)")
       ->type_name("FILE");
-  app.add_option("<input_file>", o.inFile)->required()->type_name("");
+  app.add_option("<input_file>", o.inFile, "Input file, or - for stdin")
+      ->required()
+      ->type_name("");
   ADD_DEBUG_OPT(app);
   CLI11_PARSE(app, argc, argv);
 
@@ -0,0 +1,1357 @@
+import bisect
+import re
+import struct
+from typing import Any, BinaryIO, Optional
+
+
+# an in-process counterpart of rrisc32-as (lib/assembly.cpp), which encodes the
+# statements of a translation unit and writes the RRISC32 ELF relocatable
+class AssemblyError(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+REG_NAMES = "zero ra sp gp tp t0 t1 t2 fp s1 a0 a1 a2 a3 a4 a5 a6 a7 s2 s3 s4 s5 s6 s7 s8 s9 s10 s11 t3 t4 t5 t6"
+
+REGS = {name: i for i, name in enumerate(REG_NAMES.split())}
+REGS |= {f"x{i}": i for i in range(32)}
+REGS["s0"] = REGS["fp"]
+
+# name -> (type, opcode, funct3, funct7)
+INSTRS = {
+    "add": ("R", 0b0110011, 0x0, 0x00),
+    "sub": ("R", 0b0110011, 0x0, 0x20),
+    "xor": ("R", 0b0110011, 0x4, 0x00),
+    "or": ("R", 0b0110011, 0x6, 0x00),
+    "and": ("R", 0b0110011, 0x7, 0x00),
+    "sll": ("R", 0b0110011, 0x1, 0x00),
+    "srl": ("R", 0b0110011, 0x5, 0x00),
+    "sra": ("R", 0b0110011, 0x5, 0x20),
+    "slt": ("R", 0b0110011, 0x2, 0x00),
+    "sltu": ("R", 0b0110011, 0x3, 0x00),
+    "addi": ("I", 0b0010011, 0x0, 0x00),
+    "xori": ("I", 0b0010011, 0x4, 0x00),
+    "ori": ("I", 0b0010011, 0x6, 0x00),
+    "andi": ("I", 0b0010011, 0x7, 0x00),
+    "slli": ("I", 0b0010011, 0x1, 0x00),
+    "srli": ("I", 0b0010011, 0x5, 0x00),
+    "srai": ("I", 0b0010011, 0x5, 0x00),
+    "slti": ("I", 0b0010011, 0x2, 0x00),
+    "sltiu": ("I", 0b0010011, 0x3, 0x00),
+    "lb": ("I", 0b0000011, 0x0, 0x00),
+    "lh": ("I", 0b0000011, 0x1, 0x00),
+    "lw": ("I", 0b0000011, 0x2, 0x00),
+    "lbu": ("I", 0b0000011, 0x4, 0x00),
+    "lhu": ("I", 0b0000011, 0x5, 0x00),
+    "sb": ("S", 0b0100011, 0x0, 0x00),
+    "sh": ("S", 0b0100011, 0x1, 0x00),
+    "sw": ("S", 0b0100011, 0x2, 0x00),
+    "beq": ("B", 0b1100011, 0x0, 0x00),
+    "bne": ("B", 0b1100011, 0x1, 0x00),
+    "blt": ("B", 0b1100011, 0x4, 0x00),
+    "bge": ("B", 0b1100011, 0x5, 0x00),
+    "bltu": ("B", 0b1100011, 0x6, 0x00),
+    "bgeu": ("B", 0b1100011, 0x7, 0x00),
+    "jal": ("J", 0b1101111, 0x0, 0x00),
+    "jalr": ("I", 0b1100111, 0x0, 0x00),
+    "lui": ("U", 0b0110111, 0x0, 0x00),
+    "auipc": ("U", 0b0010111, 0x0, 0x00),
+    "ecall": ("I", 0b1110011, 0x0, 0x00),
+    "ebreak": ("I", 0b1110011, 0x0, 0x00),
+    "mul": ("R", 0b0110011, 0x0, 0x01),
+    "mulh": ("R", 0b0110011, 0x1, 0x01),
+    "mulhsu": ("R", 0b0110011, 0x2, 0x01),
+    "mulhu": ("R", 0b0110011, 0x3, 0x01),
+    "div": ("R", 0b0110011, 0x4, 0x01),
+    "divu": ("R", 0b0110011, 0x5, 0x01),
+    "rem": ("R", 0b0110011, 0x6, 0x01),
+    "remu": ("R", 0b0110011, 0x7, 0x01),
+}
+
+EM_RRISC32 = 243  # EM_RISCV
+ELFOSABI_RRISC32 = 0
+
+ET_REL = 1
+
+SHT_PROGBITS = 1
+SHT_SYMTAB = 2
+SHT_STRTAB = 3
+SHT_RELA = 4
+SHT_NOBITS = 8
+
+SHF_WRITE = 0x1
+SHF_ALLOC = 0x2
+SHF_EXECINSTR = 0x4
+SHF_MERGE = 0x10
+SHF_STRINGS = 0x20
+
+SHN_UNDEF = 0
+SHN_ABS = 0xFFF1
+
+STB_LOCAL = 0
+STB_GLOBAL = 1
+STB_WEAK = 2
+
+STT_NOTYPE = 0
+STT_OBJECT = 1
+STT_FUNC = 2
+STT_SECTION = 3
+
+R_RRISC32_32 = 1
+R_RRISC32_HI20 = 26
+R_RRISC32_LO12_I = 27
+R_RRISC32_LO12_S = 28
+R_RRISC32_GPREL_I = 47
+R_RRISC32_GPREL_S = 48
+
+RRISC32_MAX_ALIGN = 12
+
+# a subsection of .rodata holding NUL-terminated strings, which the linker
+# deduplicates across input files
+RRISC32_MERGE_STR_SEC = ".rodata.str1.1"
+
+BASE_SECTIONS = [".text", ".rodata", ".data", ".sdata", ".bss"]
+
+
+def getBaseSecName(name: str) -> str:
+    for base in BASE_SECTIONS:
+        if name == base or name.startswith(base + "."):
+            return base
+    return ""
+
+
+def getSecType(base: str) -> int:
+    return SHT_NOBITS if base == ".bss" else SHT_PROGBITS
+
+
+def getSecFlags(name: str) -> int:
+    if name == RRISC32_MERGE_STR_SEC:
+        return SHF_ALLOC | SHF_MERGE | SHF_STRINGS
+    match getBaseSecName(name):
+        case ".text":
+            return SHF_ALLOC | SHF_EXECINSTR
+        case ".rodata":
+            return SHF_ALLOC
+        case _:
+            return SHF_ALLOC | SHF_WRITE
+
+
+def s32(i: int) -> int:
+    i &= 0xFFFFFFFF
+    return i - (1 << 32) if i & 0x80000000 else i
+
+
+def hi20(i: int) -> int:
+    return s32(s32(i) + 0x800) >> 12
+
+
+def lo12(i: int) -> int:
+    return s32(s32(i) - (hi20(i) << 12))
+
+
+def checkImmRange(i: int, n: int) -> bool:
+    return -(1 << (n - 1)) <= i < (1 << (n - 1))
+
+
+def p2align(i: int, n: int) -> int:
+    m = (1 << n) - 1
+    return (i + m) & ~m
+
+
+OPERATORS = "+-*/%<>|&^~"
+
+
+class Reg:
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __str__(self) -> str:
+        return self._name
+
+
+_regs: dict[str, Reg] = {}
+
+
+# registers are immutable, so one object per name is shared
+def getReg(name: str) -> Reg:
+    reg = _regs.get(name)
+    if not reg:
+        reg = _regs[name] = Reg(name)
+    return reg
+
+
+class Sym:
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __str__(self) -> str:
+        return "$" + self._name
+
+
+class Func:
+    __slots__ = ("_name", "_operands")
+
+    def __init__(self, name: str, operands: list["int | Sym | Func"]) -> None:
+        self._name = name
+        self._operands = operands
+
+    def __str__(self) -> str:
+        prefix = "" if self._name[0] in OPERATORS else "%"
+        return f"{prefix}{self._name}({' '.join(map(str, self._operands))})"
+
+
+# an int written in hexadecimal
+class Hex(int):
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return hex(self)
+
+
+# an operand is an int, a str, a register, a symbol or a function of operands
+Expr = int | str | Reg | Sym | Func
+
+
+def escapeStr(s: str) -> str:
+    arr = ['"']
+    for c in s:
+        match c:
+            case "\n":
+                arr.append("\\n")
+            case "\t":
+                arr.append("\\t")
+            case "\0":
+                arr.append("\\0")
+            case '"' | "\\":
+                arr.append("\\" + c)
+            case _ if " " <= c <= "~":
+                arr.append(c)
+            case _:
+                arr.append(f"\\x{ord(c):02x}")
+    arr.append('"')
+    return "".join(arr)
+
+
+def exprStr(e: Expr) -> str:
+    return escapeStr(e) if isinstance(e, str) else str(e)
+
+
+class Statement:
+    __slots__ = ("_name", "_args")
+
+    def __init__(self, name: str, args: list[Expr] = None) -> None:
+        self._name = name
+        self._args = args if args is not None else []
+
+    def __str__(self) -> str:
+        if not self._args:
+            return self._name
+        return self._name + " " + ", ".join(map(exprStr, self._args))
+
+
+class Directive(Statement):
+    __slots__ = ()
+
+
+class Instr(Statement):
+    __slots__ = ()
+
+
+class Label(Statement):
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return self._name + ":"
+
+
+# the operands given as str are register names
+def makeInstr(name: str, *args: Expr) -> Instr:
+    return Instr(name, [getReg(_) if isinstance(_, str) else _ for _ in args])
+
+
+# a statement as a line of assembly, without the line break
+def render(stmt: Optional[Statement]) -> str:
+    match stmt:
+        case None:
+            return ""
+        case Label():
+            return str(stmt)
+        case _:
+            return "    " + str(stmt)
+
+
+_STATEMENT = re.compile(r"[ \t]*(?:([A-Za-z0-9_.:]+)|(?:#.*)?$)")
+
+_TOKEN = re.compile(
+    r"""[ \t]*(?:
+    (?P<int>-?0x[0-9a-f]*|-?[0-9]+)
+    |(?P<str>"(?:[^"\\\n]|\\[nt0"\\]|\\x[0-9a-f]{2})*")
+    |(?P<reg>[0-9a-z]+)
+    |(?P<sym>\$[A-Za-z0-9_.]*)
+    |(?P<func>[-+*/%<>|&^~][-+*/%<>|&^~a-z_]*)
+    |(?P<lpar>\()
+    |(?P<rpar>\))
+    |(?P<comma>,)
+    |(?P<end>(?:\#.*)?$))""",
+    re.X,
+)
+
+_ESCAPE = re.compile(r"\\(x[0-9a-f]{2}|.)")
+_ESCAPES = {"n": "\n", "t": "\t", "0": "\0", '"': '"', "\\": "\\"}
+
+
+def parseInt(s: str) -> int:
+    if s.startswith("-"):
+        return s32(-parseInt(s[1:]))
+    if s.startswith("0x"):
+        return s32(int(s[2:] or "0", 16))
+    return s32(int(s))
+
+
+def unescape(s: str) -> str:
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m[1]) or chr(int(m[1][1:], 16)), s)
+
+
+def cookToken(kind: str, s: str) -> Any:
+    match kind:
+        case "int":
+            return parseInt(s)
+        case "str":
+            return unescape(s[1:-1])
+        case "reg":
+            return getReg(s)
+        case "sym":
+            s = s[1:]
+            if s == "" or (s[0].isdigit() and (len(s) != 2 or s[1] not in "bf")):
+                raise AssemblyError("invalid Sym", s)
+            return Sym(s)
+        case "func":
+            if len(s) > 1 and s[0] == "%" and s[1] not in OPERATORS:
+                s = s[1:]
+            return s
+    return s
+
+
+def tokenize(line: str) -> list[tuple[str, Any]]:
+    m = _STATEMENT.match(line)
+    if not m:
+        raise AssemblyError("unexpected character", line.lstrip()[:1])
+    if not m[1]:
+        return []
+
+    tokens = [("stmt", m[1])]
+    i = m.end()
+    while m := _TOKEN.match(line, i):
+        tokens.append((m.lastgroup, cookToken(m.lastgroup, m[m.lastgroup])))
+        if m.lastgroup == "end":
+            return tokens
+        i = m.end()
+    raise AssemblyError("unexpected character", line[i:].lstrip()[:1])
+
+
+class Parser:
+    def __init__(self, tokens: list[tuple[str, Any]]) -> None:
+        self._tokens = tokens
+        self._i = 0
+
+    def parse(self) -> Statement:
+        s = self.expect("stmt")
+        if s.endswith(":"):
+            s = s[:-1]
+            if s in ["", "."] or (len(s) > 1 and s[0].isdigit()):
+                raise AssemblyError("invalid Label", s)
+            if not re.fullmatch(r"[A-Za-z0-9_.]+", s):
+                raise AssemblyError("invalid Label", s)
+            cls = Label
+        elif s.startswith("."):
+            if len(s) < 2 or not re.fullmatch(r"[a-z.]+", s):
+                raise AssemblyError("invalid Directive", s)
+            cls = Directive
+        else:
+            if not re.fullmatch(r"[a-z.]*", s):
+                raise AssemblyError("invalid Instr", s)
+            cls = Instr
+        return cls(s, self.parseArguments())
+
+    def parseArguments(self) -> list[Expr]:
+        args = []
+        comma = False
+        while True:
+            kind, _ = self._tokens[self._i]
+            if kind == "func":
+                args.append(self.parseFunc())
+            elif kind in ["int", "str", "reg", "sym"]:
+                args.append(self.expect(kind))
+            else:
+                if comma:
+                    raise AssemblyError("unexpected token", kind)
+                self.expect("end")
+                return args
+            comma = self.eat("comma") is not None
+
+    def parseFunc(self) -> Func:
+        name = self.expect("func")
+        self.expect("lpar")
+        operands = []
+        while True:
+            kind, _ = self._tokens[self._i]
+            if kind == "func":
+                operands.append(self.parseFunc())
+            elif kind in ["int", "sym"]:
+                operands.append(self.expect(kind))
+            else:
+                break
+        self.expect("rpar")
+        return Func(name, operands)
+
+    def eat(self, kind: str) -> Any:
+        tk = self._tokens[self._i]
+        if tk[0] != kind:
+            return None
+        self._i += 1
+        return tk[1]
+
+    def expect(self, kind: str) -> Any:
+        tk = self._tokens[self._i]
+        if tk[0] != kind:
+            raise AssemblyError(f"{kind} expected", self._i, tk[0])
+        self._i += 1
+        return tk[1]
+
+
+def parse(line: str) -> Optional[Statement]:
+    tokens = tokenize(line)
+    if not tokens:
+        return None
+    return Parser(tokens).parse()
+
+
+class Section:
+    def __init__(self, name: str) -> None:
+        self._name = name
+        # .text for .text and .text.foo, etc.
+        self._base = getBaseSecName(name)
+        self._offset = 0
+        self._size = 0
+        self._rep = 0
+        self._align = 2
+        # (offset, statement) to be encoded once all labels are known
+        self._stmts: list[tuple[int, Statement]] = []
+        # offsets and names of numeric labels like 1:
+        self._labelOffsets: list[int] = []
+        self._labelNames: list[str] = []
+        self._data = bytearray()
+        self._index = 0
+
+    def findLabel(self, name: str) -> Optional[int]:
+        i = bisect.bisect_left(self._labelOffsets, self._offset)
+        if name.endswith("b"):
+            for j in range(i - 1, -1, -1):
+                if self._labelNames[j] == name[0]:
+                    return self._labelOffsets[j]
+        else:
+            for j in range(i, len(self._labelNames)):
+                if self._labelNames[j] == name[0]:
+                    return self._labelOffsets[j]
+        return None
+
+
+class Symbol:
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._size = 0
+        self._type = STT_NOTYPE
+        self._bind = STB_LOCAL if name.startswith(".L") else STB_GLOBAL
+        self._shndx = SHN_UNDEF
+        self._sec: Optional[Section] = None
+        self._offset = 0
+        self._index = 0
+
+    def isUndef(self) -> bool:
+        return not self._sec and self._shndx == SHN_UNDEF
+
+    def set(self, sec: Optional[Section], offset: int):
+        self._sec = sec
+        self._offset = offset
+        if not sec:
+            self._shndx = SHN_ABS
+
+
+# the value of an expression which is an offset into a section, or an undefined
+# symbol plus an offset
+class SymVal:
+    __slots__ = ("_sec", "_offset", "_sym")
+
+    def __init__(self, sec: Optional[Section], offset: int, sym: Optional[Symbol] = None) -> None:
+        self._sec = sec
+        self._offset = offset
+        self._sym = sym
+
+
+# the value of an expression which is filled in by a relocation
+class RelVal:
+    __slots__ = ("_type", "_sym", "_addend")
+
+    def __init__(self, relType: int, sym: Symbol, addend: int) -> None:
+        self._type = relType
+        self._sym = sym
+        self._addend = addend
+
+
+class Relocation:
+    __slots__ = ("_sec", "_offset", "_sym", "_type", "_addend")
+
+    def __init__(self, sec: Section, offset: int, sym: Symbol, relType: int, addend: int) -> None:
+        self._sec = sec
+        self._offset = offset
+        self._sym = sym
+        self._type = relType
+        self._addend = addend
+
+
+def encode(name: str, operands: list[str | int]) -> int:
+    if name not in INSTRS:
+        raise AssemblyError("unknown instruction", name)
+    ty, opcode, funct3, funct7 = INSTRS[name]
+
+    def reg(i: int) -> int:
+        if operands[i] not in REGS:
+            raise AssemblyError("unknown register", operands[i])
+        return REGS[operands[i]]
+
+    format = "".join("r" if isinstance(_, str) else "i" for _ in operands)
+    rd = rs1 = rs2 = imm = 0
+    match ty:
+        case "R":
+            if format != "rrr":
+                raise AssemblyError("unknown instruction", name, format)
+            rd, rs1, rs2 = reg(0), reg(1), reg(2)
+        case "I" if name in ["ecall", "ebreak"]:
+            if format != "":
+                raise AssemblyError("unknown instruction", name, format)
+            imm = 0 if name == "ecall" else 1
+        case "I":
+            if format != "rri":
+                raise AssemblyError("unknown instruction", name, format)
+            rd, rs1, imm = reg(0), reg(1), s32(operands[2])
+            if name in ["slli", "srli", "srai"]:
+                imm &= 0b11111
+                if name == "srai":
+                    imm |= 0x20 << 5
+        case "S" | "B":
+            if format != "rri":
+                raise AssemblyError("unknown instruction", name, format)
+            rs1, rs2, imm = reg(0), reg(1), s32(operands[2])
+        case "U" | "J":
+            if format != "ri":
+                raise AssemblyError("unknown instruction", name, format)
+            rd, imm = reg(0), s32(operands[1])
+
+    b = opcode
+    match ty:
+        case "R":
+            b |= funct3 << 12 | funct7 << 25 | rd << 7 | rs1 << 15 | rs2 << 20
+        case "I":
+            b |= funct3 << 12 | imm << 20 | rd << 7 | rs1 << 15
+        case "S" | "B":
+            if ty == "B":
+                imm >>= 1
+                imm = (imm >> 10 & 1) | ((imm & 0x3FF) << 1) | (imm >> 11 << 11)
+            b |= funct3 << 12 | (imm & 0b11111) << 7 | imm >> 5 << 25 | rs1 << 15 | rs2 << 20
+        case "U" | "J":
+            if ty == "J":
+                imm >>= 1
+                imm = (
+                    (imm >> 11 & 0xFF)
+                    | ((imm >> 10 & 1) << 8)
+                    | ((imm & 0x3FF) << 9)
+                    | (imm >> 19 << 19)
+                )
+            b |= rd << 7 | imm << 12
+    return b & 0xFFFFFFFF
+
+
+X0 = getReg("x0")
+X1 = getReg("x1")
+SP = getReg("sp")
+T6 = getReg("t6")
+
+
+class Assembler:
+    def __init__(self) -> None:
+        self._secText = Section(".text")
+        self._secRodata = Section(".rodata")
+        self._secData = Section(".data")
+        self._secSdata = Section(".sdata")
+        self._secBss = Section(".bss")
+
+        # .sdata is added on first use
+        self._sections = [self._secText, self._secRodata, self._secData, self._secBss]
+        self._curSec: Optional[Section] = None
+
+        # in the order of first use, which is kept in the symbol table
+        self._symTab: dict[str, Symbol] = {}
+
+        self._delayedStmts: list[Statement] = []
+        self._relocations: list[Relocation] = []
+
+        for sec in self._sections:
+            self.addSectionSymbol(sec)
+
+    def addLine(self, line: str):
+        try:
+            stmt = parse(line)
+            if stmt:
+                self.add(stmt)
+        except AssemblyError as e:
+            raise AssemblyError(*e.args, repr(line)) from None
+
+    def add(self, stmt: Statement):
+        match stmt:
+            case Directive():
+                self.handleDirective(stmt)
+            case Instr():
+                self.checkCurSecName([".text"])
+                sec = self._curSec
+                n, sec._rep = max(sec._rep, 1), 0
+                for _ in range(n):
+                    self.expandInstr(stmt._name, stmt._args)
+            case Label():
+                self.handleLabel(stmt)
+
+    def save(self, o: BinaryIO):
+        for sec in self._sections:
+            sec._size = sec._offset
+            self.addSymbol(sec._name)._size = sec._size
+
+        self.handleDelayedStmts()
+        self.cookSections()
+        self.saveELF(o)
+
+    def checkCurSecName(self, names: list[str]):
+        if not self._curSec:
+            raise AssemblyError("no current section")
+        if self._curSec._base not in names:
+            raise AssemblyError("|".join(names) + " expected", self._curSec._name)
+
+    def addSectionSymbol(self, sec: Section):
+        sym = self.addSymbol(sec._name)
+        sym.set(sec, 0)
+        sym._type = STT_SECTION
+        sym._bind = STB_LOCAL
+
+    def addSymbol(self, name: str) -> Symbol:
+        assert name != "."
+        sym = self._symTab.get(name)
+        if not sym:
+            sym = self._symTab[name] = Symbol(name)
+        return sym
+
+    def addRelocation(self, offset: int, sym: Symbol, relType: int, addend: int):
+        self._relocations.append(Relocation(self._curSec, offset, sym, relType, addend))
+
+    def cvtSymToRel(self, v: SymVal, relType: int) -> RelVal:
+        sym = v._sym
+        if not v._sec:
+            return RelVal(relType, sym, v._offset)
+        if not sym:
+            sym = self.addSymbol(v._sec._name)
+        assert v._sec is sym._sec
+        return RelVal(relType, sym, v._offset - sym._offset)
+
+    def evalExpr(self, e: Expr) -> int | SymVal | RelVal | None:
+        match e:
+            case int():
+                # as if it were parsed
+                return s32(e)
+            case Sym():
+                name = e._name
+                sec = self._curSec
+                if name == ".":
+                    return SymVal(sec, sec._offset) if sec else None
+                if name[0].isdigit():
+                    if not sec:
+                        return None
+                    offset = sec.findLabel(name)
+                    return None if offset is None else SymVal(sec, offset)
+
+                sym = self.addSymbol(name)
+                if sym._sec:
+                    return SymVal(sym._sec, sym._offset, sym)
+                if sym._shndx == SHN_ABS:
+                    return sym._offset
+                return SymVal(None, 0, sym)
+            case Func():
+                return self.evalFunc(e)
+            case _:
+                raise AssemblyError("can not eval", exprStr(e))
+
+    def evalFunc(self, e: Func) -> int | SymVal | RelVal | None:
+        values = []
+        for operand in e._operands:
+            v = self.evalExpr(operand)
+            if not isinstance(v, int | SymVal):
+                return None
+            values.append(v)
+
+        def checkOperandsSize(n: int):
+            if len(values) != n:
+                raise AssemblyError(f"{n} operands expected")
+
+        match e._name:
+            case "-" if len(values) == 1:
+                return -values[0] if isinstance(values[0], int) else None
+            case "-":
+                checkOperandsSize(2)
+                match values:
+                    case [SymVal() as v0, SymVal() as v1]:
+                        return v0._offset - v1._offset if v0._sec is v1._sec else None
+                    case [SymVal() as v0, int() as i1]:
+                        return SymVal(v0._sec, v0._offset - i1, v0._sym)
+                    case [int() as i0, int() as i1]:
+                        return i0 - i1
+                return None
+            case "+":
+                checkOperandsSize(2)
+                match values:
+                    case [int() as i0, int() as i1]:
+                        return i0 + i1
+                    case [int() as i0, SymVal() as v1]:
+                        return SymVal(v1._sec, i0 + v1._offset, v1._sym)
+                    case [SymVal() as v0, int() as i1]:
+                        return SymVal(v0._sec, v0._offset + i1, v0._sym)
+                return None
+            case "*" | "/":
+                checkOperandsSize(2)
+                i0, i1 = values
+                if not isinstance(i0, int) or not isinstance(i1, int):
+                    return None
+                if e._name == "*":
+                    return i0 * i1
+                if i1 == 0:
+                    return None
+                q = abs(i0) // abs(i1)
+                return q if (i0 < 0) == (i1 < 0) else -q
+            case "hi" | "lo":
+                checkOperandsSize(1)
+                v = values[0]
+                if isinstance(v, int):
+                    return hi20(v) if e._name == "hi" else lo12(v)
+                return self.cvtSymToRel(v, R_RRISC32_HI20 if e._name == "hi" else R_RRISC32_LO12_I)
+            case "gprel":
+                checkOperandsSize(1)
+                v = values[0]
+                if not isinstance(v, SymVal):
+                    return None
+                return self.cvtSymToRel(v, R_RRISC32_GPREL_I)
+        raise AssemblyError("unimplemented Func", e._name)
+
+    def getImm(self, e: Expr) -> Optional[int]:
+        v = self.evalExpr(e)
+        return v if isinstance(v, int) else None
+
+    def addInstr(self, name: str, args: list[Expr]):
+        sec = self._curSec
+        sec._stmts.append((sec._offset, Instr(name, args)))
+        sec._offset += 4
+
+    def expandInstr(self, name: str, args: list[Expr]):
+        format = "".join("r" if isinstance(_, Reg) else "i" for _ in args)
+        e0, e1, e2 = (args + [None] * 3)[:3]
+
+        def isSameReg(r1: Reg, r2: Reg) -> bool:
+            for r in [r1, r2]:
+                if r._name not in REGS:
+                    raise AssemblyError("unknown register", r._name)
+            return REGS[r1._name] == REGS[r2._name]
+
+        def inRangeIS(e: Expr) -> bool:
+            imm = self.getImm(e)
+            return imm is not None and checkImmRange(imm, 12)
+
+        # the low 12 bits are filled in by a relocation
+        def isRelLo(e: Expr) -> bool:
+            return isinstance(e, Func) and e._name in ["lo", "gprel"]
+
+        loads = ["lb", "lh", "lw", "lbu", "lhu"]
+        stores = ["sb", "sh", "sw", "sbu", "shu"]
+        if name == "li" and format == "ri":
+            if inRangeIS(e1):
+                self.addInstr("addi", [e0, X0, e1])
+                return
+            self.addInstr("lui", [e0, Func("hi", [e1])])
+            self.addInstr("addi", [e0, e0, Func("lo", [e1])])
+
+        elif (
+            name in ["addi", "xori", "ori", "andi", "slli", "srli", "srai", "slti", "sltiu"]
+            and format == "rri"
+            and (imm := self.getImm(e2)) is not None
+        ):
+            if isSameReg(e0, e1) and imm == 0 and name in ["addi", "xori", "ori"]:
+                return
+            if checkImmRange(imm, 12):
+                self.addInstr(name, args)
+                return
+            self.expandInstr("li", [T6, e2])
+            self.addInstr(name.replace("i", ""), [e0, e1, T6])
+
+        elif name in loads and format == "rri":
+            if isRelLo(e2) or inRangeIS(e2):
+                self.addInstr(name, args)
+                return
+            self.addInstr("lui", [T6, Func("hi", [e2])])
+            self.addInstr("add", [T6, T6, e1])
+            self.addInstr(name, [e0, T6, Func("lo", [e2])])
+
+        elif name in loads and format == "ri":
+            if inRangeIS(e1):
+                self.addInstr(name, [e0, X0, e1])
+                return
+            self.addInstr("lui", [e0, Func("hi", [e1])])
+            self.addInstr(name, [e0, e0, Func("lo", [e1])])
+
+        elif name in stores and format == "rri":
+            if isRelLo(e2) or inRangeIS(e2):
+                self.addInstr(name, args)
+                return
+            self.addInstr("lui", [T6, Func("hi", [e2])])
+            self.addInstr("add", [T6, T6, e0])
+            self.addInstr(name, [T6, e1, Func("lo", [e2])])
+
+        elif name in stores and format == "ri":
+            if inRangeIS(e1):
+                self.addInstr(name, [X0, e0, e1])
+                return
+            self.addInstr("lui", [T6, Func("hi", [e1])])
+            self.addInstr(name, [T6, e0, Func("lo", [e1])])
+
+        elif name == "nop" and format == "":
+            self.addInstr("addi", [X0, X0, 0])
+
+        elif name == "mv" and format == "rr":
+            if not isSameReg(e0, e1):
+                self.addInstr("addi", [e0, e1, 0])
+
+        elif name == "push" and format == "r":
+            self.addInstr("addi", [SP, SP, -4])
+            self.addInstr("sw", [SP, e0, 0])
+
+        elif name == "pop":
+            if format == "r":
+                self.addInstr("lw", [e0, SP, 0])
+            if format in ["r", ""]:
+                self.addInstr("addi", [SP, SP, 4])
+
+        elif name == "not" and format == "rr":
+            self.addInstr("xori", [e0, e1, -1])
+
+        elif name == "neg" and format == "rr":
+            self.addInstr("sub", [e0, X0, e1])
+
+        elif name in ["sext.b", "sext.h"] and format == "rr":
+            n = 24 if name == "sext.b" else 16
+            self.addInstr("slli", [e0, e1, n])
+            self.addInstr("srai", [e0, e0, n])
+
+        elif name == "zext.b" and format == "rr":
+            self.addInstr("andi", [e0, e1, 255])
+
+        elif name == "zext.h" and format == "rr":
+            self.addInstr("slli", [e0, e1, 16])
+            self.addInstr("srli", [e0, e0, 16])
+
+        elif name == "seqz" and format == "rr":
+            self.addInstr("sltiu", [e0, e1, 1])
+
+        elif name == "snez" and format == "rr":
+            self.addInstr("sltu", [e0, X0, e1])
+
+        elif name == "sltz" and format == "rr":
+            self.addInstr("slt", [e0, e1, X0])
+
+        elif name == "sgtz" and format == "rr":
+            self.addInstr("slt", [e0, X0, e1])
+
+        elif name in ["beqz", "bnez", "bgez", "bltz"] and format == "ri":
+            self.expandInstr(name[:-1], [e0, X0, e1])
+
+        elif name in ["blez", "bgtz"] and format == "ri":
+            self.expandInstr("bge" if name == "blez" else "blt", [X0, e0, e1])
+
+        elif name in ["bgt", "ble", "bgtu", "bleu"] and format == "rri":
+            s = name[0] + ("g" if name[1] == "l" else "l") + name[2:]
+            self.expandInstr(s, [e1, e0, e2])
+
+        elif name == "j" and format == "i":
+            self.addInstr("jal", [X0, e0])
+
+        elif name == "jal" and format == "i":
+            self.addInstr("jal", [X1, e0])
+
+        elif name == "jr" and format == "r":
+            self.addInstr("jalr", [X0, e0, 0])
+
+        elif name == "jalr" and format == "r":
+            self.addInstr("jalr", [X1, e0, 0])
+
+        elif name == "ret" and format == "":
+            self.addInstr("jalr", [X0, X1, 0])
+
+        elif name == "call" and format == "i":
+            self.addInstr("lui", [X1, Func("hi", [e0])])
+            self.addInstr("jalr", [X1, X1, Func("lo", [e0])])
+
+        elif name == "tail" and format == "i":
+            self.addInstr("lui", [getReg("x6"), Func("hi", [e0])])
+            self.addInstr("jalr", [X0, getReg("x6"), Func("lo", [e0])])
+
+        else:
+            # conditional branches are not turned into far ones, as offsets are
+            # assigned in a single pass. handleInstr reports a target out of
+            # their range
+            self.addInstr(name, args)
+
+    def handleLabel(self, stmt: Label):
+        sec = self._curSec
+        if not sec:
+            raise AssemblyError("no current section")
+
+        name = stmt._name
+        if len(name) == 1 and name.isdigit():
+            sec._labelOffsets.append(sec._offset)
+            sec._labelNames.append(name)
+            return
+
+        sym = self._symTab.get(name)
+        if sym and not sym.isUndef():
+            raise AssemblyError("duplicated symbol", name)
+        self.addSymbol(name).set(sec, sec._offset)
+
+    def handleDirective(self, stmt: Directive):
+        name, args = stmt._name, stmt._args
+
+        def checkArgumentsSize(n: int):
+            if len(args) != n:
+                raise AssemblyError(f"{n} arguments expected", str(stmt))
+
+        def checkArgumentType(i: int, ty: type):
+            if not isinstance(args[i], ty):
+                raise AssemblyError(f"{ty.__name__} expected", i, str(stmt))
+
+        def invalid():
+            return AssemblyError("invalid statement", str(stmt))
+
+        sec = self._curSec
+        match name:
+            case ".global" | ".local" | ".weak":
+                checkArgumentsSize(1)
+                checkArgumentType(0, Sym)
+                self._delayedStmts.append(stmt)
+
+            case ".type":
+                checkArgumentsSize(2)
+                checkArgumentType(0, Sym)
+                checkArgumentType(1, str)
+                if args[1] not in ["function", "object"]:
+                    raise AssemblyError("symbol type is not function/object", args[1])
+                self._delayedStmts.append(stmt)
+
+            case ".size":
+                checkArgumentsSize(2)
+                checkArgumentType(0, Sym)
+                if sec:
+                    sec._stmts.append((sec._offset, stmt))
+                else:
+                    self._delayedStmts.append(stmt)
+
+            case ".equ":
+                checkArgumentsSize(2)
+                checkArgumentType(0, Sym)
+                if args[0]._name == ".":
+                    raise AssemblyError("can not define .")
+                if not self.handleDirectiveEqu(stmt):
+                    if sec:
+                        sec._stmts.append((sec._offset, stmt))
+                    else:
+                        self._delayedStmts.append(stmt)
+
+            case ".section":
+                checkArgumentsSize(1)
+                checkArgumentType(0, str)
+                self.handleDirectiveSec(args[0])
+
+            case ".text" | ".rodata" | ".data" | ".sdata" | ".bss":
+                checkArgumentsSize(0)
+                self.handleDirectiveSec(name)
+
+            case ".db" | ".dh" | ".dw" | ".dq":
+                self.checkCurSecName([".rodata", ".data", ".sdata"])
+                sec._stmts.append((sec._offset, stmt))
+                sec._offset += len(args) * {"b": 1, "h": 2, "w": 4, "q": 8}[name[2]]
+
+            case ".ascii" | ".asciz":
+                self.checkCurSecName([".rodata", ".data", ".sdata"])
+                n = 0
+                for i, arg in enumerate(args):
+                    checkArgumentType(i, str)
+                    n += len(arg) + (name == ".asciz")
+                sec._stmts.append((sec._offset, stmt))
+                sec._offset += n
+
+            case ".fill":
+                self.checkCurSecName([".rodata", ".data", ".sdata", ".bss"])
+                if not 1 <= len(args) <= 3:
+                    raise AssemblyError("1/2/3 arguments expected", str(stmt))
+                repeat = self.evalExpr(args[0])
+                if not isinstance(repeat, int) or repeat < 0:
+                    raise invalid()
+                if not repeat:
+                    return
+                size = 1
+                if len(args) >= 2:
+                    size = self.evalExpr(args[1])
+                    if not isinstance(size, int):
+                        raise invalid()
+                    if not size:
+                        return
+                    if size not in [1, 2, 4, 8]:
+                        raise invalid()
+                sec._stmts.append((sec._offset, stmt))
+                sec._offset += repeat * size
+
+            case ".align":
+                if not sec:
+                    raise AssemblyError("no current section")
+                checkArgumentsSize(1)
+                n = self.evalExpr(args[0])
+                if not isinstance(n, int) or not 0 <= n <= RRISC32_MAX_ALIGN:
+                    raise invalid()
+                if n == 0:
+                    return
+                if sec._base == ".text":
+                    if n < 3:
+                        return
+                    for _ in range((p2align(sec._offset, n) - sec._offset) // 4):
+                        self.expandInstr("nop", [])
+                else:
+                    sec._stmts.append((sec._offset, stmt))
+                    sec._offset = p2align(sec._offset, n)
+                sec._align = max(sec._align, n)
+
+            case ".rep":
+                self.checkCurSecName([".text"])
+                checkArgumentsSize(1)
+                n = self.evalExpr(args[0])
+                if not isinstance(n, int) or n < 0:
+                    raise invalid()
+                if n > 1:
+                    sec._rep = n
+
+            case _:
+                raise AssemblyError("unknown directive", name)
+
+    def handleDirectiveSec(self, name: str):
+        sec = next((_ for _ in self._sections if _._name == name), None)
+        if not sec and name == self._secSdata._name:
+            sec = self._secSdata
+            self._sections.insert(self._sections.index(self._secBss), sec)
+            self.addSectionSymbol(sec)
+        if not sec and getBaseSecName(name):
+            sec = Section(name)
+            self._sections.append(sec)
+            self.addSectionSymbol(sec)
+        if not sec:
+            raise AssemblyError("unknown section", name)
+        self._curSec = sec
+
+    # whether the value is known
+    def handleDirectiveEqu(self, stmt: Directive) -> bool:
+        v = self.evalExpr(stmt._args[1])
+        match v:
+            case int():
+                self.addSymbol(stmt._args[0]._name).set(None, v)
+            case SymVal():
+                self.addSymbol(stmt._args[0]._name).set(v._sec, v._offset)
+            case _:
+                return False
+        return True
+
+    def handleDirectiveSize(self, stmt: Directive):
+        v = self.evalExpr(stmt._args[1])
+        if not isinstance(v, int) or v < 0:
+            raise AssemblyError("invalid statement", str(stmt))
+        self.addSymbol(stmt._args[0]._name)._size = v
+
+    def handleDelayedStmts(self):
+        self._curSec = None
+        for stmt in self._delayedStmts:
+            name = stmt._args[0]._name
+            match stmt._name:
+                case ".global":
+                    self.addSymbol(name)._bind = STB_GLOBAL
+                case ".local":
+                    self.addSymbol(name)._bind = STB_LOCAL
+                case ".weak":
+                    self.addSymbol(name)._bind = STB_WEAK
+                case ".type":
+                    ty = STT_FUNC if stmt._args[1] == "function" else STT_OBJECT
+                    self.addSymbol(name)._type = ty
+                case ".size":
+                    self.handleDirectiveSize(stmt)
+                case ".equ":
+                    if not self.handleDirectiveEqu(stmt):
+                        raise AssemblyError("invalid statement", str(stmt))
+
+    def handleInstr(self, offset: int, stmt: Instr):
+        name = stmt._name
+        operands = []
+        for e in stmt._args:
+            if isinstance(e, Reg):
+                operands.append(e._name)
+                continue
+
+            v = self.evalExpr(e)
+            match v:
+                case int():
+                    operands.append(v)
+                case SymVal():
+                    if name not in ["beq", "bne", "blt", "bge", "bltu", "bgeu", "jal"]:
+                        raise AssemblyError("invalid statement", str(stmt))
+                    if v._sec is not self._curSec:
+                        raise AssemblyError(
+                            "invalid statement", str(stmt), "branch to another section"
+                        )
+                    imm = v._offset - offset
+                    if imm & 1:
+                        raise AssemblyError("invalid statement", str(stmt), "not even", imm)
+                    if not checkImmRange(imm, 21 if name == "jal" else 13):
+                        raise AssemblyError(
+                            "branch target out of range",
+                            str(stmt),
+                            imm,
+                            "at most %s away" % ("1 MiB" if name == "jal" else "4 KiB"),
+                        )
+                    operands.append(imm)
+                case RelVal():
+                    operands.append(0)
+                    relType = v._type
+                    if name in ["sb", "sh", "sw"]:
+                        if relType == R_RRISC32_LO12_I:
+                            relType = R_RRISC32_LO12_S
+                        elif relType == R_RRISC32_GPREL_I:
+                            relType = R_RRISC32_GPREL_S
+                    self.addRelocation(offset, v._sym, relType, v._addend)
+                case _:
+                    raise AssemblyError("invalid statement", str(stmt))
+
+        self._curSec._data += struct.pack("<I", encode(name, operands))
+
+    def handleDirectiveD(self, stmt: Directive):
+        sec = self._curSec
+        size = {"b": 1, "h": 2, "w": 4, "q": 8}[stmt._name[2]]
+        for e in stmt._args:
+            v = self.evalExpr(e)
+            if isinstance(v, SymVal):
+                if size < 4:
+                    raise AssemblyError("invalid statement", str(stmt), "size is too small", size)
+                rel = self.cvtSymToRel(v, R_RRISC32_32)
+                self.addRelocation(len(sec._data), rel._sym, rel._type, rel._addend)
+                v = 0
+            if not isinstance(v, int):
+                raise AssemblyError("invalid statement", str(stmt))
+            sec._data += (v & ((1 << size * 8) - 1)).to_bytes(size, "little")
+
+    def cookSections(self):
+        for sec in self._sections:
+            self._curSec = sec
+            for offset, stmt in sec._stmts:
+                sec._offset = offset
+                if isinstance(stmt, Instr):
+                    self.handleInstr(offset, stmt)
+                    continue
+
+                args = stmt._args
+                match stmt._name:
+                    case ".db" | ".dh" | ".dw" | ".dq":
+                        self.handleDirectiveD(stmt)
+                    case ".ascii" | ".asciz":
+                        for s in args:
+                            sec._data += s.encode("latin-1")
+                            if stmt._name == ".asciz":
+                                sec._data.append(0)
+                    case ".fill":
+                        if sec._base == ".bss":
+                            continue
+                        repeat = self.evalExpr(args[0])
+                        size = self.evalExpr(args[1]) if len(args) >= 2 else 1
+                        value = self.evalExpr(args[2]) if len(args) == 3 else 0
+                        if not isinstance(value, int):
+                            raise AssemblyError("invalid statement", str(stmt))
+                        x = (value & ((1 << size * 8) - 1)).to_bytes(size, "little")
+                        sec._data += x * repeat
+                    case ".align":
+                        if sec._base == ".bss":
+                            continue
+                        sec._data += bytes(p2align(offset, self.evalExpr(args[0])) - offset)
+                    case ".equ":
+                        if not self.handleDirectiveEqu(stmt):
+                            raise AssemblyError("invalid statement", str(stmt))
+                    case ".size":
+                        self.handleDirectiveSize(stmt)
+
+    # the sections are laid out as rrisc32-as does: the section header string
+    # table, the sections in order of first use, the symbol table, the string
+    # table and the relocation sections
+    def saveELF(self, o: BinaryIO):
+        elf = ELFWriter()
+        for sec in self._sections:
+            s = elf.addSection(sec._name, getSecType(sec._base), getSecFlags(sec._name))
+            if sec._base == ".bss":
+                s._size = sec._size
+            else:
+                s._data = sec._data
+            s._align = 1 << sec._align
+            if sec._name == RRISC32_MERGE_STR_SEC:
+                s._entsize = 1
+            sec._index = s._index
+
+        symtab = elf.addSection(".symtab", SHT_SYMTAB, 0)
+        strtab = elf.addSection(".strtab", SHT_STRTAB, 0)
+        symtab._link = strtab._index
+        symtab._entsize = SYM_SIZE
+
+        strs: dict[str, int] = {}
+        strtab._data = bytearray(1)
+        symtab._data = bytearray(SYM_SIZE)
+        for i, sym in enumerate(self._symTab.values(), 1):
+            if sym._name not in strs:
+                strs[sym._name] = len(strtab._data)
+                strtab._data += sym._name.encode("latin-1") + b"\0"
+            sym._index = i
+            if sym._bind == STB_LOCAL:
+                # one greater than the symbol table index of the last local symbol
+                symtab._info = i + 1
+            symtab._data += struct.pack(
+                "<IIIBBH",
+                strs[sym._name],
+                sym._offset & 0xFFFFFFFF,
+                sym._size,
+                sym._bind << 4 | sym._type,
+                0,
+                sym._sec._index if sym._sec else sym._shndx,
+            )
+
+        relas: dict[Section, ELFSection] = {}
+        for rel in self._relocations:
+            rela = relas.get(rel._sec)
+            if not rela:
+                rela = relas[rel._sec] = elf.addSection(".rela" + rel._sec._name, SHT_RELA, 0)
+                rela._link = symtab._index
+                rela._info = rel._sec._index
+                rela._entsize = RELA_SIZE
+            info = rel._sym._index << 8 | rel._type
+            rela._data += struct.pack("<IIi", rel._offset, info, s32(rel._addend))
+
+        elf.save(o)
+
+
+EHDR_SIZE = 52
+PHDR_SIZE = 32
+SHDR_SIZE = 40
+SYM_SIZE = 16
+RELA_SIZE = 12
+
+
+class ELFSection:
+    def __init__(self, index: int, name: str, ty: int, flags: int) -> None:
+        self._index = index
+        self._name = name
+        self._type = ty
+        self._flags = flags
+        self._data = bytearray()
+        # of an SHT_NOBITS section
+        self._size = 0
+        self._link = 0
+        self._info = 0
+        self._align = 0
+        self._entsize = 0
+        self._offset = 0
+
+    def size(self) -> int:
+        return self._size if self._type == SHT_NOBITS else len(self._data)
+
+
+class ELFWriter:
+    def __init__(self) -> None:
+        self._sections = [ELFSection(0, "", 0, 0)]
+        self._shstrtab = self.addSection(".shstrtab", SHT_STRTAB, 0)
+        self._shstrtab._align = 1
+
+    def addSection(self, name: str, ty: int, flags: int) -> ELFSection:
+        sec = ELFSection(len(self._sections), name, ty, flags)
+        self._sections.append(sec)
+        return sec
+
+    def save(self, o: BinaryIO):
+        names = [0]
+        self._shstrtab._data = bytearray(1)
+        for sec in self._sections[1:]:
+            names.append(len(self._shstrtab._data))
+            self._shstrtab._data += sec._name.encode() + b"\0"
+
+        offset = EHDR_SIZE
+        for sec in self._sections[1:]:
+            sec._offset = p2align(offset, max(sec._align.bit_length() - 1, 0))
+            if sec._type != SHT_NOBITS:
+                offset = sec._offset + len(sec._data)
+        shoff = p2align(offset, 2)
+
+        ident = b"\x7fELF" + bytes([1, 1, 1, ELFOSABI_RRISC32]) + bytes(8)
+        o.write(ident)
+        o.write(
+            struct.pack(
+                "<HHIIIIIHHHHHH",
+                ET_REL,
+                EM_RRISC32,
+                1,
+                0,
+                0,
+                shoff,
+                0,
+                EHDR_SIZE,
+                PHDR_SIZE,
+                0,
+                SHDR_SIZE,
+                len(self._sections),
+                self._shstrtab._index,
+            )
+        )
+
+        offset = EHDR_SIZE
+        for sec in self._sections[1:]:
+            if sec._type != SHT_NOBITS:
+                o.write(bytes(sec._offset - offset))
+                o.write(sec._data)
+                offset = sec._offset + len(sec._data)
+        o.write(bytes(shoff - offset))
+
+        for sec, name in zip(self._sections, names):
+            o.write(
+                struct.pack(
+                    "<IIIIIIIIII",
+                    name,
+                    sec._type,
+                    sec._flags,
+                    0,
+                    sec._offset,
+                    sec.size(),
+                    sec._link,
+                    sec._info,
+                    sec._align,
+                    sec._entsize,
+                )
+            )
@@ -1,15 +1,68 @@
 import io
-import textwrap
+import itertools
+import shutil
+import tempfile
+import functools
+
+from typing import BinaryIO, Iterator
 
 from sema import *
+from assembly import (
+    Assembler,
+    AssemblyError,
+    Directive,
+    Expr,
+    Func,
+    Hex,
+    Instr,
+    Label,
+    Statement,
+    Sym,
+    makeInstr,
+    parse,
+    render,
+)
+
+# at most this many values are put in a .db/.dh/.dw/.dq, and a value repeated
+# at least this many times is put in a .fill
+DATA_PER_LINE = 16
+DATA_FILL_MIN = 8
+
+# string literals without embedded NULs are put in this section, where the
+# linker merges identical ones and those which end another one
+MERGE_STR_SECTION = ".rodata.str1.1"
+
+# a section is written out to a temporary file once this many lines of it are
+# buffered, so that memory use does not grow with the size of the output
+SPILL_LINES = 10000
+
+# a local aggregate whose constant initializer covers more than this many bytes
+# is copied from a template in .rodata instead of being stored piece by piece
+LOCAL_INIT_STORES = 8
+
+# more than this many bytes of a local aggregate are copied or zeroed in a loop
+LOCAL_INIT_UNROLL = 16
 
 
 class TemporaryValue(RValue):
+    __slots__ = ()
+
     def __init__(self, ty: Type) -> None:
         super().__init__(ty)
 
 
 class StackFrameOffset(Constant):
+    __slots__ = ("_i",)
+
+    def __init__(self, i: int, ty: PointerType) -> None:
+        super().__init__(ty)
+        self._i = i
+
+
+# a0 + i, the constant part of an address which is kept as a displacement
+class TemporaryOffset(RValue):
+    __slots__ = ("_i",)
+
     def __init__(self, i: int, ty: PointerType) -> None:
         super().__init__(ty)
         self._i = i
@@ -17,6 +70,8 @@ class StackFrameOffset(Constant):
 
 # https://en.cppreference.com/w/c/language/operator_member_access
 class MemoryAccess(LValue):
+    __slots__ = ("_addr",)
+
     def __init__(self, addr: Value) -> None:
         ty = addr.getType()
         assert isinstance(ty, PointerType)
@@ -27,64 +82,162 @@ class MemoryAccess(LValue):
         self._addr = addr
 
 
+def inRegister(v: Value) -> bool:
+    return isinstance(v, LocalVariable | Argument) and v._reg is not None
+
+
+# stores to it can be dropped
+def isDead(v: Value) -> bool:
+    return isinstance(v, LocalVariable | Argument) and v._dead
+
+
+# evaluating it has no side effects
+def isPure(v: Value) -> bool:
+    return isinstance(v, Constant | Variable)
+
+
+# $name, or $name plus an offset
+def symExpr(name: str, offset: int = 0) -> Expr:
+    return Func("+", [Sym(name), offset]) if offset else Sym(name)
+
+
+# the size of what follows the label name, -($. $name)
+def sizeExpr(name: str) -> Expr:
+    return Func("-", [Sym("."), Sym(name)])
+
+
+# the characters of a string literal, without the terminating NUL
+def strContent(sLit: StrLiteral) -> str:
+    return sLit._s.removesuffix("\0")
+
+
+# the statements of a piece of assembly, which are only turned into text when
+# saved. None stands for an empty line
 class Fragment:
     def __init__(self, name: str) -> None:
-        self._lines = []
+        self._stmts: list[Optional[Statement]] = []
         self._name = name
 
-    def add(self, s: str | list[str], *, indent="    "):
-        if type(s) is list:
-            for _ in s:
-                self.add(_, indent=indent)
-        else:
-            self._lines.append(indent + s)
+    def add(self, stmt: Statement):
+        self._stmts.append(stmt)
+
+    def addDirective(self, name: str, *args: Expr):
+        self._stmts.append(Directive(name, list(args)))
 
     def addEmptyLine(self):
-        self._lines.append("")
-
-    def addRaw(self, s: str, *, indent="    "):
-        s = textwrap.dedent(s)
-        for line in s.splitlines():
-            line = line.strip()
-            if line == "":
-                continue
-            if line.endswith(":"):
-                self._lines.append(line)
-            else:
-                self.add(line, indent=indent)
+        self._stmts.append(None)
+
+    def addRaw(self, s: str):
+        self._stmts.extend(parseRaw(s))
+
+    def addLabel(self, s: str):
+        self._stmts.append(Label(s))
+
+    def save(self, o: io.StringIO):
+        for stmt in self._stmts:
+            print(render(stmt), file=o)
+        print("", file=o)
+
+
+# the statements of a piece of assembly written in the source
+@functools.lru_cache(maxsize=256)
+def parseRaw(s: str) -> tuple[Statement, ...]:
+    return tuple(stmt for line in s.splitlines() if (stmt := parse(line)))
+
+
+# the initial value of a global or static variable. Consecutive constants of
+# the same size share a directive, and runs of a repeated one become a .fill
+class DataBuilder:
+    def __init__(self, sec: "Section | Fragment") -> None:
+        self._sec = sec
+        self._size = 0
+        self._values: list[Expr] = []
+        self._zeros = 0
 
     def addConstant(self, v: Constant):
         match v:
             case IntConstant():
-                c = "bhwq"[log2(v.getType().size())]
-                self.add(f".d{c} {v._i}")
+                size, x = v.getType().size(), v._i
             case PtrConstant():
-                self.add(f".dw {v._i}")
+                size, x = 4, v._i
             case SymConstant():
-                if v._offset == 0:
-                    self.add(f".dw ${v._name}")
-                else:
-                    self.add(f".dw +(${v._name} {v._offset})")
+                size = 4
+                x = symExpr(v._name, v._offset)
             case _:
                 unreachable()
 
-    def addLabel(self, s: str):
-        self.add(s + ":", indent="")
+        if size != self._size:
+            self._flushValues()
+            self._size = size
+        self._values.append(x)
+
+    def addZeros(self, n: int):
+        self._flushValues()
+        self._zeros += n
+
+    def addStr(self, sLit: StrLiteral):
+        self.flush()
+        self._sec.addDirective(".asciz", strContent(sLit))
+
+    def flush(self):
+        self._flushValues()
+        self._flushZeros()
+
+    # flush all but the trailing zeros and return their number
+    def trim(self) -> int:
+        self._flushValues()
+        n, self._zeros = self._zeros, 0
+        return n
+
+    def _flushZeros(self):
+        if self._zeros > 0:
+            self._sec.addDirective(".fill", self._zeros)
+        self._zeros = 0
+
+    def _flushValues(self):
+        values, size = self._values, self._size
+        self._values = []
+
+        line = []
+        i = 0
+        while i < len(values):
+            j = i + 1
+            while j < len(values) and values[j] == values[i]:
+                j += 1
+            if j - i < DATA_FILL_MIN or not isinstance(values[i], int):
+                line.extend(values[i:j])
+            else:
+                self._addValues(line, size)
+                line = []
+                if values[i] == 0:
+                    self._zeros += (j - i) * size
+                else:
+                    self._flushZeros()
+                    self._sec.addDirective(".fill", j - i, size, values[i])
+            i = j
+        self._addValues(line, size)
 
-    def save(self, o: io.StringIO):
-        for line in self._lines:
-            print(line, file=o)
-        print("", file=o)
+    def _addValues(self, values: list[Expr], size: int):
+        if not values:
+            return
+        self._flushZeros()
+        c = "bhwq"[log2(size)]
+        for i in range(0, len(values), DATA_PER_LINE):
+            self._sec.addDirective(f".d{c}", *values[i : i + DATA_PER_LINE])
 
 
 class Section:
     def __init__(self, name: str) -> None:
-        assert name in [".text", ".rodata", ".data", ".bss"]
+        assert name in [".text", ".rodata", ".data", ".sdata", ".bss", MERGE_STR_SECTION]
         self._name = name
         self._fragments: list[Fragment] = []
+        self._spilled: Optional[io.TextIOBase] = None
 
         self.addFragment()
-        self.curFragment.add(name)
+        if name == MERGE_STR_SECTION:
+            self.addDirective(".section", name)
+        else:
+            self.addDirective(name)
 
     def addFragment(self) -> Fragment:
         self._fragments.append(Fragment(f"{self._name[1]}{len(self._fragments)}"))
@@ -99,25 +252,64 @@ class Section:
     def curFragment(self):
         return self._fragments[-1]
 
-    def add(self, s: str | list[str], *, indent="    "):
-        self.curFragment.add(s, indent=indent)
+    def add(self, stmt: Statement):
+        self.curFragment.add(stmt)
+
+    def addDirective(self, name: str, *args: Expr):
+        self.curFragment.addDirective(name, *args)
 
     def addEmptyLine(self):
         self.curFragment.addEmptyLine()
 
-    def addRaw(self, s: str, *, indent="    "):
-        self.curFragment.addRaw(s, indent=indent)
-
-    def addConstant(self, v: Constant):
-        self.curFragment.addConstant(v)
+    def addRaw(self, s: str):
+        self.curFragment.addRaw(s)
 
     def addLabel(self, s: str):
         self.curFragment.addLabel(s)
 
+    # a named subsection like .text.foo, which can be discarded by the linker
+    # if nothing refers to it
+    def addSubsection(self, name: str):
+        self.addDirective(".section", f'{self._name}.{name.lstrip(".")}')
+
+    # append the statements of a fragment built separately
+    def append(self, fragment: Fragment):
+        self.curFragment._stmts.extend(fragment._stmts)
+
+    # write out the statements buffered so far if there are enough of them. The
+    # current fragment is kept, so the output is the same as without spilling
+    def spill(self):
+        if sum(len(_._stmts) for _ in self._fragments) < SPILL_LINES:
+            return
+        if not self._spilled:
+            self._spilled = tempfile.TemporaryFile("w+")
+
+        *done, cur = self._fragments
+        for fragment in done:
+            fragment.save(self._spilled)
+        self._spilled.writelines(render(stmt) + "\n" for stmt in cur._stmts)
+        cur._stmts = []
+        self._fragments = [cur]
+
     def save(self, o: io.StringIO):
+        if self._spilled:
+            self._spilled.seek(0)
+            shutil.copyfileobj(self._spilled, o)
+            self._spilled.close()
         for fragment in self._fragments:
             fragment.save(o)
 
+    # the statements of save. Those written out are parsed back
+    def statements(self) -> Iterator[Statement]:
+        if self._spilled:
+            self._spilled.seek(0)
+            for line in self._spilled:
+                if stmt := parse(line):
+                    yield stmt
+            self._spilled.close()
+        for fragment in self._fragments:
+            yield from filter(None, fragment._stmts)
+
 
 class Asm:
     def __init__(self, cg: "Codegen") -> None:
@@ -125,17 +317,88 @@ class Asm:
 
         self._secText = Section(".text")
         self._secRodata = Section(".rodata")
+        self._secStr = Section(MERGE_STR_SECTION)
         self._secData = Section(".data")
+        self._secSdata = Section(".sdata")
         self._secBss = Section(".bss")
 
+        # sizes of globals in .sdata, by label
+        self._smallData: dict[str, int] = {}
+        # labels of string literals in MERGE_STR_SECTION
+        self._mergeStrs: set[str] = set()
+
         self._builtins = {"memset": 0, "memcpy": 0}
 
+    # with --function-sections each function and global object is put in a
+    # section of its own
+    def beginObject(self, sec: Section, label: str):
+        if self._cg._ctx.functionSections:
+            sec.addSubsection(label)
+
     def addStr(self, sLit: StrLiteral) -> str:
+        if "\0" not in sLit._s[:-1]:
+            self._mergeStrs.add(sLit._label)
+            self._secStr.addLabel(sLit._label)
+            self._secStr.addDirective(".asciz", strContent(sLit))
+            return
+
+        self.beginObject(self._secRodata, sLit._label)
         self._secRodata.addLabel(sLit._label)
-        self._secRodata.add(f".asciz {sLit._sOrig}")
+        self._secRodata.addDirective(".asciz", strContent(sLit))
 
-    def emit(self, s: str | list[str]):
-        self._secText.add(s)
+    # str operands are register names. A jump which directly follows another
+    # jump or a return is never executed and is dropped
+    def emit(self, name: str, *args: Expr):
+        if name == "j" and self.isTerminated():
+            return
+        self._secText.add(makeInstr(name, *args))
+
+    # whether the last statement of .text is a jump or a return, so that
+    # control does not fall through to what is emitted next
+    def isTerminated(self) -> bool:
+        stmts = self._secText.curFragment._stmts
+        stmt = next((_ for _ in reversed(stmts) if _ is not None), None)
+        return isinstance(stmt, Instr) and stmt._name in ("j", "ret")
+
+    # zero n bytes, a multiple of 4, at fp+offset
+    def emitZeroFill(self, offset: int, n: int):
+        if n <= LOCAL_INIT_UNROLL:
+            for i in range(0, n, 4):
+                self.emit("sw", "fp", "zero", offset + i)
+            return
+
+        self.emit("addi", "a0", "fp", offset)
+        self.emit("addi", "a1", "a0", n)
+        self._secText.addRaw(
+            """
+        1:
+            sw a0, zero, 0
+            addi a0, a0, 4
+            bltu a0, a1, $1b
+            """
+        )
+
+    # copy n bytes, a multiple of 4, from the word aligned label to fp+offset
+    def emitTemplateCopy(self, offset: int, label: str, n: int):
+        self.emit("li", "a1", Sym(label))
+        if n <= LOCAL_INIT_UNROLL:
+            for i in range(0, n, 4):
+                self.emit("lw", "a0", "a1", i)
+                self.emit("sw", "fp", "a0", offset + i)
+            return
+
+        self.emit("addi", "a0", "fp", offset)
+        self.emit("addi", "a2", "a1", n)
+        self._secText.addRaw(
+            """
+        1:
+            lw a3, a1, 0
+            addi a1, a1, 4
+            sw a0, a3, 0
+            addi a0, a0, 4
+            bltu a1, a2, $1b
+            """
+        )
 
     def emitLabel(self, s: str):
         self._secText.addLabel(s)
@@ -143,6 +406,26 @@ class Asm:
     def emitEmptyLine(self):
         self._secText.addEmptyLine()
 
+    # whether name+offset is addressed relative to gp. Only addresses within
+    # the object are known to be in range of gp
+    def isSmallData(self, name: str, offset: int) -> bool:
+        size = self._smallData.get(name)
+        return size is not None and 0 <= offset < size
+
+    def emitSymLoad(self, op: str, r: str, name: str, offset: int):
+        addr = Func("+", [Sym(name), offset])
+        if self.isSmallData(name, offset):
+            self.emit(op, r, "gp", Func("gprel", [addr]))
+        else:
+            self.emit(op, r, addr)
+
+    def emitSymStore(self, op: str, r: str, name: str, offset: int):
+        addr = Func("+", [Sym(name), offset])
+        if self.isSmallData(name, offset):
+            self.emit(op, "gp", r, Func("gprel", [addr]))
+        else:
+            self.emit(op, r, addr)
+
     def checkImm(self, i: int, n: int):
         mins = (1 << (n - 1)) - (1 << n)
         maxs = (1 << (n - 1)) - 1
@@ -154,17 +437,51 @@ class Asm:
     def checkImmS(self, i: int):
         return self.checkImm(i, 12)
 
+    def checkDisplacement(self, i: int):
+        return self.checkImmI(i) and self.checkImmI(i + 4)
+
+    # fold a constant byte offset into an address, or return None
+    def offsetAddress(self, v: Value, i: int, ty: PointerType) -> Optional[Value]:
+        match v:
+            case StackFrameOffset():
+                if i == 0 or self.checkDisplacement(v._i + i):
+                    return StackFrameOffset(v._i + i, ty)
+            case SymConstant():
+                return SymConstant(v._name, ty, v._offset + i)
+            case PtrConstant():
+                return PtrConstant(getBuiltinType("int").wrap(v._i + i), ty)
+            case TemporaryOffset():
+                if self.checkDisplacement(v._i + i):
+                    return TemporaryOffset(v._i + i, ty)
+            case TemporaryValue():
+                if self.checkDisplacement(i):
+                    return TemporaryOffset(i, ty)
+        return None
+
+    # base register and displacement of an address held in a register
+    def _baseOffset(self, addr: Value) -> tuple[str, int]:
+        match addr:
+            case TemporaryOffset():
+                return "a0", addr._i
+            case TemporaryValue():
+                return "a0", 0
+            case LocalVariable() | Argument() if inRegister(addr):
+                return addr._reg, 0
+            case _:
+                unreachable()
+
     def addressOf(self, v: LValue):
         match v:
             case GlobalVariable() | StaticVariable() | ExternVariable():
-                return SymConstant(v._label, PointerType(v._type))
+                return SymConstant(v._label, getPointerType(v._type))
 
             case LocalVariable() | Argument():
-                return StackFrameOffset(v._offset, PointerType(v._type))
+                assert not inRegister(v)
+                return StackFrameOffset(v._offset, getPointerType(v._type))
 
             case StrLiteral():
                 assert v._label
-                return SymConstant(v._label, PointerType(v.getType()))
+                return SymConstant(v._label, getPointerType(v.getType()))
 
             case MemoryAccess():
                 return v._addr
@@ -188,31 +505,36 @@ class Asm:
                 sz = v._type.size()
                 i = v._i
                 if sz == 8:
-                    self.emit(
-                        [
-                            f"li {r2}, {hex((i >> 32) & 0xffffffff)}",
-                            f"li {r1}, {hex(i & 0xffffffff)}",
-                        ]
-                    )
+                    self.emit("li", r2, Hex((i >> 32) & 0xFFFFFFFF))
+                    self.emit("li", r1, Hex(i & 0xFFFFFFFF))
                 else:
-                    self.emit(f"li {r1}, {i}")
+                    self.emit("li", r1, i)
 
             case SymConstant():
-                if v._offset:
-                    self.emit(f"li {r1}, +(${v._name} {v._offset})")
+                if self.isSmallData(v._name, v._offset):
+                    self.emitSymLoad("addi", r1, v._name, v._offset)
+                elif v._offset:
+                    self.emit("li", r1, symExpr(v._name, v._offset))
                 else:
-                    self.emit(f"li {r1}, ${v._name}")
+                    self.emit("li", r1, Sym(v._name))
 
             case StackFrameOffset():
-                self.emit(f"addi a0, fp, {v._i}")
+                self.emit("addi", r1, "fp", v._i)
+
+            case TemporaryOffset():
+                if v._i != 0 or r1 != "a0":
+                    self.emit("addi", r1, "a0", v._i)
 
             case TemporaryValue():
                 sz = v._type.size()
                 if sz == 8:
                     if r2 != "a1":
-                        self.emit(f"mv {r2}, a1")
+                        self.emit("mv", r2, "a1")
                 if r1 != "a0":
-                    self.emit(f"mv {r1}, a0")
+                    self.emit("mv", r1, "a0")
+
+            case LocalVariable() | Argument() if inRegister(v):
+                self.emit("mv", r1, v._reg)
 
             case (
                 GlobalVariable()
@@ -235,7 +557,7 @@ class Asm:
                         | ExternVariable()
                         | LocalVariable()
                         | Argument()
-                    ):
+                    ) if not inRegister(addr):
                         assert r2 != "a0"
 
                         self.load(addr)
@@ -246,20 +568,18 @@ class Asm:
                         _offset = addr._offset
                         match sz:
                             case 8:
-                                self.emit(f"lw {r1}, +(${_name} {_offset})")
-                                self.emit(f"lw {r2}, +(${_name} {_offset + 4})")
+                                self.emitSymLoad("lw", r1, _name, _offset)
+                                self.emitSymLoad("lw", r2, _name, _offset + 4)
                             case 4:
-                                self.emit(f"lw {r1}, +(${_name} {_offset})")
+                                self.emitSymLoad("lw", r1, _name, _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(
-                                    f'{"lhu" if ty._unsigned else "lh"} {r1}, +(${_name} {_offset})'
-                                )
+                                op = "lhu" if ty._unsigned else "lh"
+                                self.emitSymLoad(op, r1, _name, _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(
-                                    f'{"lbu" if ty._unsigned else "lb"} {r1}, +(${_name} {_offset})'
-                                )
+                                op = "lbu" if ty._unsigned else "lb"
+                                self.emitSymLoad(op, r1, _name, _offset)
                             case _:
                                 unreachable()
 
@@ -267,15 +587,16 @@ class Asm:
                         _offset = addr._i
                         match sz:
                             case 8:
-                                self.emit([f"lw {r1}, fp, {_offset}", f"lw {r2}, fp, {_offset+4}"])
+                                self.emit("lw", r1, "fp", _offset)
+                                self.emit("lw", r2, "fp", _offset + 4)
                             case 4:
-                                self.emit(f"lw {r1}, fp, {_offset}")
+                                self.emit("lw", r1, "fp", _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(f'{"lhu" if ty._unsigned else "lh"} {r1}, fp, {_offset}')
+                                self.emit("lhu" if ty._unsigned else "lh", r1, "fp", _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(f'{"lbu" if ty._unsigned else "lb"} {r1}, fp, {_offset}')
+                                self.emit("lbu" if ty._unsigned else "lb", r1, "fp", _offset)
                             case _:
                                 unreachable()
 
@@ -283,31 +604,36 @@ class Asm:
                         _offset = addr._i
                         match sz:
                             case 8:
-                                self.emit([f"lw {r1}, {_offset}", f"lw {r2}, {_offset + 4}"])
+                                self.emit("lw", r1, _offset)
+                                self.emit("lw", r2, _offset + 4)
                             case 4:
-                                self.emit(f"lw {r1}, {_offset}")
+                                self.emit("lw", r1, _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(f'{"lhu" if ty._unsigned else "lh"} {r1}, {_offset}')
+                                self.emit("lhu" if ty._unsigned else "lh", r1, _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(f'{"lbu" if ty._unsigned else "lb"} {r1}, {_offset}')
+                                self.emit("lbu" if ty._unsigned else "lb", r1, _offset)
                             case _:
                                 unreachable()
 
-                    case TemporaryValue():
+                    case TemporaryValue() | TemporaryOffset() | LocalVariable() | Argument():
+                        base, _offset = self._baseOffset(addr)
                         match sz:
                             case 8:
-                                assert r2 != "a0"
-                                self.emit([f"lw {r2}, a0, 4", f"lw {r1}, a0, 0"])
+                                assert r2 != base
+                                self.emit("lw", r2, base, _offset + 4)
+                                self.emit("lw", r1, base, _offset)
                             case 4:
-                                self.emit(f"lw {r1}, a0, 0")
+                                self.emit("lw", r1, base, _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(f'{"lhu" if ty._unsigned else "lh"} {r1}, a0, 0')
+                                op = "lhu" if ty._unsigned else "lh"
+                                self.emit(op, r1, base, _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(f'{"lbu" if ty._unsigned else "lb"} {r1}, a0, 0')
+                                op = "lbu" if ty._unsigned else "lb"
+                                self.emit(op, r1, base, _offset)
                             case _:
                                 unreachable()
 
@@ -316,6 +642,9 @@ class Asm:
 
     def store(self, v: Value, r1: str = "a0", r2: str = "a1"):
         match v:
+            case LocalVariable() | Argument() if inRegister(v):
+                self.emit("mv", v._reg, r1)
+
             case (
                 GlobalVariable()
                 | StaticVariable()
@@ -337,10 +666,11 @@ class Asm:
                         | ExternVariable()
                         | LocalVariable()
                         | Argument()
-                    ):
+                    ) if not inRegister(addr):
                         if r1 == "a0":
                             assert r2 == "a1"
-                            self.emit(["mv a2, a0", "mv a3, a1"])
+                            self.emit("mv", "a2", "a0")
+                            self.emit("mv", "a3", "a1")
                             r1, r2 = "a2", "a3"
 
                         self.load(addr)
@@ -351,16 +681,16 @@ class Asm:
                         _offset = addr._offset
                         match sz:
                             case 8:
-                                self.emit(f"sw {r1}, +(${_name} {_offset})")
-                                self.emit(f"sw {r2}, +(${_name} {_offset + 4})")
+                                self.emitSymStore("sw", r1, _name, _offset)
+                                self.emitSymStore("sw", r2, _name, _offset + 4)
                             case 4:
-                                self.emit(f"sw {r1}, +(${_name} {_offset})")
+                                self.emitSymStore("sw", r1, _name, _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sh {r1}, +(${_name} {_offset})")
+                                self.emitSymStore("sh", r1, _name, _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sb {r1}, +(${_name} {_offset})")
+                                self.emitSymStore("sb", r1, _name, _offset)
                             case _:
                                 unreachable()
 
@@ -368,15 +698,16 @@ class Asm:
                         _offset = addr._i
                         match sz:
                             case 8:
-                                self.emit([f"sw fp, {r1}, {_offset}", f"sw fp, {r2}, {_offset+4}"])
+                                self.emit("sw", "fp", r1, _offset)
+                                self.emit("sw", "fp", r2, _offset + 4)
                             case 4:
-                                self.emit(f"sw fp, {r1}, {_offset}")
+                                self.emit("sw", "fp", r1, _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sh fp, {r1}, {_offset}")
+                                self.emit("sh", "fp", r1, _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sb fp, {r1}, {_offset}")
+                                self.emit("sb", "fp", r1, _offset)
                             case _:
                                 unreachable()
 
@@ -384,31 +715,33 @@ class Asm:
                         _offset = addr._i
                         match sz:
                             case 8:
-                                self.emit(f"sw {r1}, {_offset}")
-                                self.emit(f"sw {r2}, {_offset + 4}")
+                                self.emit("sw", r1, _offset)
+                                self.emit("sw", r2, _offset + 4)
                             case 4:
-                                self.emit(f"sw {r1}, {_offset}")
+                                self.emit("sw", r1, _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sh {r1}, {_offset}")
+                                self.emit("sh", r1, _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sb {r1}, {_offset}")
+                                self.emit("sb", r1, _offset)
                             case _:
                                 unreachable()
 
-                    case TemporaryValue():
+                    case TemporaryValue() | TemporaryOffset() | LocalVariable() | Argument():
+                        base, _offset = self._baseOffset(addr)
                         match sz:
                             case 8:
-                                self.emit([f"sw a0, {r1}, 0", f"sw a0, {r2}, 4"])
+                                self.emit("sw", base, r1, _offset)
+                                self.emit("sw", base, r2, _offset + 4)
                             case 4:
-                                self.emit(f"sw a0, {r1}, 0")
+                                self.emit("sw", base, r1, _offset)
                             case 2:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sh a0, {r1}, 0")
+                                self.emit("sh", base, r1, _offset)
                             case 1:
                                 assert isinstance(ty, IntType)
-                                self.emit(f"sb a0, {r1}, 0")
+                                self.emit("sb", base, r1, _offset)
                             case _:
                                 unreachable()
 
@@ -419,13 +752,13 @@ class Asm:
         v = self.getNodeValue(v)
         self.load(v)
         if v.getType().size() == 8:
-            self.emit("push a1")
-        self.emit("push a0")
+            self.emit("push", "a1")
+        self.emit("push", "a0")
 
     def pop(self, ty: Type, r1: str = "a0", r2: str = "a1"):
-        self.emit(f"pop {r1}")
+        self.emit("pop", r1)
         if ty.size() == 8:
-            self.emit(f"pop {r2}")
+            self.emit("pop", r2)
 
     def emitCond(self, node: c_ast.Node, label: str, eq: bool = True):
         r = self._cg.getNodeRecord(node)
@@ -434,28 +767,42 @@ class Asm:
             case IntConstant():
                 c = v._i == 0
                 if c == eq:
-                    self.emit(f"j ${label}")
+                    self.emit("j", Sym(label))
             case _:
                 self.load(node)
 
                 ty = v.getType()
                 if ty.size() == 8:
-                    self.emit("or a0, a0, a1")
+                    self.emit("or", "a0", "a0", "a1")
 
                 if eq:
-                    self.emit(f"beqz a0, ${label}")
+                    self.emit("beqz", "a0", Sym(label))
                 else:
-                    self.emit(f"bnez a0, ${label}")
+                    self.emit("bnez", "a0", Sym(label))
 
     def emitPrelogue(self, szLocal: Optional[int] = None):
-        self.emit(["push ra", "push fp", "mv fp, sp"])
+        self.emit("push", "ra")
+        self.emit("push", "fp")
+        self.emit("mv", "fp", "sp")
+        self._savedRegs: list[tuple[str, int]] = []
         if szLocal is None:
-            szLocal = self._cg._func._maxOffset
+            func = self._cg._func
+            szLocal = func._maxOffset
+            # callee-saved registers are saved below the local variables
+            for reg in func._savedRegs:
+                szLocal += 4
+                self._savedRegs.append((reg, -szLocal))
         if szLocal > 0:
-            self.emit(f"addi sp, sp, {-szLocal}")
+            self.emit("addi", "sp", "sp", -szLocal)
+        for reg, offset in self._savedRegs:
+            self.emit("sw", "fp", reg, offset)
 
     def emitEpilogue(self):
-        self.emit(["mv sp, fp", "pop fp", "pop ra"])
+        for reg, offset in self._savedRegs:
+            self.emit("lw", reg, "fp", offset)
+        self.emit("mv", "sp", "fp")
+        self.emit("pop", "fp")
+        self.emit("pop", "ra")
 
     def emitRet(self):
         self.emitEpilogue()
@@ -476,18 +823,18 @@ class Asm:
 
         match name:
             case str():
-                self.emit(f"call ${name}")
+                self.emit("call", Sym(name))
             case SymConstant() as sym:
-                self.emit(f"call ${sym._name}")
+                self.emit("call", Sym(sym._name))
             case c_ast.Node() as node:
                 self.load(node)  # load function address
-                self.emit(f"jalr a0")
+                self.emit("jalr", "a0")
             case _:
                 unreachable()
 
         # restore sp
         if n > 0:
-            self.emit(f"addi sp, sp, {n}")
+            self.emit("addi", "sp", "sp", n)
 
     """
     void *__builtin_memset(void *s, int c, size_t n) {
@@ -503,15 +850,16 @@ class Asm:
         sec = self._secText
 
         sec.addEmptyLine()
-        sec.add(f".local ${name}")
-        sec.add(f'.type ${name}, "function"')
-        sec.add(".align 2")
+        self.beginObject(sec, name)
+        sec.addDirective(".local", Sym(name))
+        sec.addDirective(".type", Sym(name), "function")
+        sec.addDirective(".align", 2)
         sec.addLabel(f"{name}")
 
         self.emitPrelogue(0)
 
         # load arguments
-        self.load(Argument("s", PointerType(getBuiltinType("void")), 8), "a0")
+        self.load(Argument("s", getPointerType(getBuiltinType("void")), 8), "a0")
         self.load(Argument("c", getBuiltinType("int"), 12), "a1")
         self.load(Argument("n", getBuiltinType("size_t"), 16), "a2")
 
@@ -529,7 +877,7 @@ class Asm:
             """
         )
         self.emitRet()
-        sec.add(f".size ${name}, -($. ${name})")
+        sec.addDirective(".size", Sym(name), sizeExpr(name))
 
     """
     char *memcpy(char *dest, char *src, unsigned int n) {
@@ -546,16 +894,17 @@ class Asm:
         sec = self._secText
 
         sec.addEmptyLine()
-        sec.add(f".local ${name}")
-        sec.add(f'.type ${name}, "function"')
-        sec.add(".align 2")
+        self.beginObject(sec, name)
+        sec.addDirective(".local", Sym(name))
+        sec.addDirective(".type", Sym(name), "function")
+        sec.addDirective(".align", 2)
         sec.addLabel(f"{name}")
 
         self.emitPrelogue(0)
 
         # load arguments
-        self.load(Argument("dest", PointerType(getBuiltinType("void")), 8), "a0")
-        self.load(Argument("src", PointerType(getBuiltinType("void")), 12), "a1")
+        self.load(Argument("dest", getPointerType(getBuiltinType("void")), 8), "a0")
+        self.load(Argument("src", getPointerType(getBuiltinType("void")), 12), "a1")
         self.load(Argument("n", getBuiltinType("size_t"), 16), "a2")
 
         sec.addRaw(
@@ -575,7 +924,7 @@ class Asm:
             """
         )
         self.emitRet()
-        sec.add(f".size ${name}, -($. ${name})")
+        sec.addDirective(".size", Sym(name), sizeExpr(name))
 
     def _emitBuiltins(self):
         for name, n in self._builtins.items():
@@ -583,13 +932,37 @@ class Asm:
                 _f = getattr(self, f"_emitBuiltin{name.capitalize()}")
                 _f()
 
+    def spill(self):
+        for sec in [
+            self._secText,
+            self._secRodata,
+            self._secStr,
+            self._secData,
+            self._secSdata,
+            self._secBss,
+        ]:
+            sec.spill()
+
+    def getSections(self) -> list[Section]:
+        sections = [self._secText, self._secRodata]
+        if self._mergeStrs:
+            sections.append(self._secStr)
+        sections.append(self._secData)
+        if self._smallData:
+            sections.append(self._secSdata)
+        sections.append(self._secBss)
+        return sections
+
     def save(self, o: io.StringIO):
         self._emitBuiltins()
+        for sec in self.getSections():
+            sec.save(o)
 
-        self._secText.save(o)
-        self._secRodata.save(o)
-        self._secData.save(o)
-        self._secBss.save(o)
+    def assemble(self, assembler: Assembler):
+        self._emitBuiltins()
+        for sec in self.getSections():
+            for stmt in sec.statements():
+                assembler.add(stmt)
 
 
 class Codegen(NodeVisitor):
@@ -597,13 +970,41 @@ class Codegen(NodeVisitor):
         super().__init__(ctx)
 
         self._asm = Asm(self)
-
-        for sLit in ctx._strPool.values():
-            self._asm.addStr(sLit)
+        self._reachable = ctx.getReachable()
+
+        self._nStrs = 0
+        self.addStrs()
+
+    # emit the strings pooled since the last call
+    def addStrs(self):
+        for sLit in itertools.islice(self._ctx._strPool.values(), self._nStrs, None):
+            if self.isEmitted(sLit):
+                self._asm.addStr(sLit)
+        self._nStrs = len(self._ctx._strPool)
+
+    # an unreferenced __func__ is not emitted, and with --optimize neither is
+    # anything unreachable from non-static functions and global variables.
+    # Compiling incrementally, only references within the current function
+    # are known
+    def isEmitted(self, v: Value) -> bool:
+        isFuncName = isinstance(v, StaticVariable) and v._name == "__func__"
+        if self._ctx.incremental:
+            return not isFuncName or v in self._ctx._refs.get(self._func, ())
+        if v in self._reachable:
+            return True
+        if self._ctx.optimize:
+            return False
+        return not isFuncName
 
     def save(self, o: io.StringIO):
         self._asm.save(o)
 
+    # write an object file rather than assembly
+    def saveObject(self, o: BinaryIO):
+        assembler = Assembler()
+        self._asm.assemble(assembler)
+        assembler.save(o)
+
     def getNodeValue(self, node: c_ast.Node) -> Value:
         if isinstance(node, Node):
             return node._value
@@ -633,6 +1034,25 @@ class Codegen(NodeVisitor):
     def getNodeType(self, node: c_ast.Node) -> Type:
         return super().getNodeValue(node).getType()
 
+    # the initializer of a global or static variable sets all of it to zero
+    def isZeroInit(self, init: c_ast.Node) -> bool:
+        if isinstance(init, c_ast.InitList):
+            return all(self.isZeroInit(_) for _ in init.exprs)
+        if isinstance(self.getNodeType(init), ArrayType):
+            return not self.getNodeStrLiteral(init)._s.strip("\0")
+        v = self.getNodeValue(init)
+        return isinstance(v, IntConstant | PtrConstant) and v._i == 0
+
+    def isConstInit(self, init: c_ast.Node) -> bool:
+        if isinstance(init, c_ast.InitList):
+            return all(self.isConstInit(_) for _ in init.exprs)
+        if isinstance(self.getNodeType(init), ArrayType):
+            return True
+        # not StackFrameOffset, whose value is only known at run time
+        return isinstance(
+            self.getNodeValue(init), IntConstant | PtrConstant | SymConstant | StrLiteral
+        )
+
     def visit_Decl(self, node: c_ast.Decl):
         r = self.getNodeRecord(node)
         if r._visited:
@@ -645,40 +1065,39 @@ class Codegen(NodeVisitor):
         if "extern" in node.quals:
             return
 
-        def _gen(init: c_ast.Node, offset: int, _local: bool):
-            ty = self.getNodeType(init)
+        def _gen(init: c_ast.Node, ty: Type, offset: int, _local: bool):
             assert offset == align(offset, ty.alignment())
 
-            sec = self._asm._secData
             match ty:
                 case ArrayType():
                     match init:
                         case c_ast.InitList():
                             for i, expr in enumerate(init.exprs):
-                                _gen(expr, offset, _local)
+                                _gen(expr, ty._base, offset, _local)
                                 offset += ty._base.size()
                             if not _local:
-                                left = ty.size() - offset
-                                if left > 0:
-                                    sec.add(f".fill {left}")
+                                data.addZeros((ty._dim - len(init.exprs)) * ty._base.size())
                         case _:
                             sLit = self.getNodeStrLiteral(init)
 
                             if not _local:
-                                sec.add(f".asciz {sLit._sOrig}")
-                                left = ty.size() - len(sLit._s)
-                                if left > 0:
-                                    sec.add(f".fill {left}")
+                                data.addStr(sLit)
+                                data.addZeros(ty.size() - len(sLit._s))
                             else:
                                 for i, c in enumerate(sLit._s):
-                                    _gen(Node(IntConstant(ord(c), ty._base)), offset + i, _local)
+                                    _gen(
+                                        Node(getIntConstant(ord(c), ty._base)),
+                                        ty._base,
+                                        offset + i,
+                                        _local,
+                                    )
 
                 case StructType():
                     if not isinstance(init, c_ast.InitList):
                         tyR = self.getNodeType(init)
                         self._asm.emitBuiltinCall(
                             "memcpy",
-                            StackFrameOffset(offset, PointerType(ty)),
+                            StackFrameOffset(offset, getPointerType(ty)),
                             c_ast.UnaryOp("&", init),
                             getIntConstant(tyR.size(), "size_t"),
                         )
@@ -687,62 +1106,111 @@ class Codegen(NodeVisitor):
                     n = len(init.exprs)
                     for i in range(n):
                         field = ty._fields[i]
-                        _gen(init.exprs[i], offset + field._offset, _local)
+                        _gen(init.exprs[i], field._type, offset + field._offset, _local)
                         if not _local:
                             left = (
                                 (ty._fields[i + 1]._offset if i < n - 1 else ty.size())
                                 - field._offset
                                 - field._type.size()
                             )
-                            if left > 0:
-                                sec.add(f".fill {left}")
+                            data.addZeros(left)
 
                 case _:
                     if not _local:
-                        sec.addConstant(self.getNodeValue(init))
-                    else:
+                        data.addConstant(self.getNodeValue(init))
+                    elif not (zeroed and self.isZeroInit(init)):
                         self._asm.load(init)
-                        self._asm.store(MemoryAccess(StackFrameOffset(offset, PointerType(ty))))
+                        self._asm.store(MemoryAccess(StackFrameOffset(offset, getPointerType(ty))))
+
+        # the local variable has been zeroed before the initializer is stored
+        zeroed = False
 
         v, ty = self.getNodeValueType(node)
         match v:
             case Function() | ExternVariable():
                 pass
+            case GlobalVariable() | StaticVariable() if not self.isEmitted(v):
+                pass
             case GlobalVariable() | StaticVariable():
-                sec = self._asm._secData if node.init else self._asm._secBss
+                zero = not node.init or self.isZeroInit(node.init)
+                if 0 < ty.size() <= self._ctx.smallDataLimit:
+                    self._asm._smallData[v._label] = ty.size()
+                    sec = self._asm._secSdata
+                else:
+                    sec = self._asm._secBss if zero else self._asm._secData
                 sec.addEmptyLine()
+                self._asm.beginObject(sec, v._label)
                 _ = log2(ty.alignment())
                 if _ > 0:
-                    sec.add(f".align {_}")
+                    sec.addDirective(".align", _)
 
                 label = v._label
                 sec.addLabel(label)
 
-                if not node.init:
-                    sec.add(f".fill {ty.size()}")
+                data = DataBuilder(sec)
+                if not zero:
+                    _gen(node.init, ty, 0, False)
                 else:
-                    _gen(node.init, 0, False)
+                    data.addZeros(ty.size())
+                data.flush()
 
-                if isinstance(v, StaticVariable):
-                    sec.add(f".local ${label}")
+                if isinstance(v, StaticVariable) or v._static:
+                    sec.addDirective(".local", Sym(label))
                 else:
-                    sec.add(f".global ${label}")
+                    sec.addDirective(".global", Sym(label))
 
-                sec.add(f'.type ${label}, "object"')
-                sec.add(f".size ${label}, -($. ${label})")
+                sec.addDirective(".type", Sym(label), "object")
+                sec.addDirective(".size", Sym(label), sizeExpr(label))
+                self._asm.spill()
 
-            case LocalVariable():
+            case LocalVariable() if v._dead:
+                # only evaluate the initializer for its side effects
+                if node.init and not isPure(self.getNodeRecord(node.init)._value):
+                    self._asm.load(node.init)
+
+            case LocalVariable() if inRegister(v):
                 if node.init:
-                    match ty:
-                        case ArrayType() | StructType():
-                            if isinstance(node.init, c_ast.InitList):
-                                self._asm.emitBuiltinCall(
-                                    "memset",
-                                    self._asm.addressOf(v),  # s
-                                    getIntConstant(0),  # c
-                                    getIntConstant(ty.size(), "size_t"),  # n
-                                )
-                    _gen(node.init, v._offset, True)
+                    self._asm.load(node.init, v._reg)
+
+            case LocalVariable():
+                if not node.init:
+                    return
+
+                if isinstance(ty, StructType) and not isinstance(node.init, c_ast.InitList):
+                    _gen(node.init, ty, v._offset, True)
+                    return
+
+                size = align(ty.size(), 4)
+                if isinstance(ty, ArrayType | StructType) and self.isConstInit(node.init):
+                    template = Fragment("")
+                    data = DataBuilder(template)
+                    _gen(node.init, ty, 0, False)
+                    covered = ty.size() - data.trim()
+                    n = align(covered, 4)
+                    if n > LOCAL_INIT_STORES:
+                        data.addZeros(n - covered)
+                        data.flush()
+
+                        sec = self._asm._secRodata
+                        label = self._ctx.getInitLabel(self._func, v._name)
+                        sec.addEmptyLine()
+                        self._asm.beginObject(sec, label)
+                        sec.addDirective(".align", max(log2(ty.alignment()), 2))
+                        sec.addLabel(label)
+                        sec.append(template)
+
+                        self._asm.emitTemplateCopy(v._offset, label, n)
+                        self._asm.emitZeroFill(v._offset + n, size - n)
+                        return
+                    if covered == 0:
+                        self._asm.emitZeroFill(v._offset, size)
+                        return
+
+                if isinstance(ty, ArrayType | StructType):
+                    self._asm.emitZeroFill(v._offset, size)
+                    zeroed = True
+                _gen(node.init, ty, v._offset, True)
+
             case _:
                 unreachable()
 
@@ -750,27 +1218,31 @@ class Codegen(NodeVisitor):
         self.setNodeTranslated(node, self.getNodeTranslated(node))
 
     def visit_FuncDef(self, node: c_ast.FuncDef):
+        if not self.isEmitted(self.getNodeValue(node)):
+            return
         self._func = self.getNodeValue(node)
 
         name = self._func._name
 
         sec = self._asm._secText
         sec.addEmptyLine()
+        self._asm.beginObject(sec, name)
 
         decl: c_ast.Decl = node.decl
         if "static" in decl.storage:
-            sec.add(f".local ${name}")
+            sec.addDirective(".local", Sym(name))
         else:
-            sec.add(f".global ${name}")
+            sec.addDirective(".global", Sym(name))
 
-        sec.add(f'.type ${name}, "function"')
+        sec.addDirective(".type", Sym(name), "function")
 
-        sec.add(".align 2")
+        sec.addDirective(".align", 2)
         sec.addLabel(name)
 
         self.visit(node.body)
 
-        sec.add(f".size ${name}, -($. ${name})")
+        sec.addDirective(".size", Sym(name), sizeExpr(name))
+        self._asm.spill()
 
         self._func = None
 
@@ -779,12 +1251,20 @@ class Codegen(NodeVisitor):
         if isFuncBody:
             self._asm.emitPrelogue()
 
+            # load arguments allocated to registers
+            for v in self._func._vars:
+                if isinstance(v, Argument) and inRegister(v):
+                    addr = StackFrameOffset(v._offset, getPointerType(v._type))
+                    self._asm.load(MemoryAccess(addr), v._reg)
+
         for _ in node.block_items:
             self.visit(_)
 
+        # the epilogue of a return which ends the body, possibly labelled, is
+        # shared with falling off its end
         if isFuncBody:
             assert len(node.block_items) > 0
-            if not isinstance(node.block_items[-1], c_ast.Return):
+            if not self._asm.isTerminated():
                 if self._func._name == 'main':
                     self._asm.load(getIntConstant(0))
                 self._asm.emitRet()
@@ -832,26 +1312,30 @@ class Codegen(NodeVisitor):
                 match sz1:
                     case 8:
                         if sz2 < 8:
-                            self._asm.emit("srai a1, a0, 31")
+                            self._asm.emit("srai", "a1", "a0", 31)
                     case 4:
                         pass
                     case 2:
                         if t1._unsigned:
-                            self._asm.emit("zext.h a0, a0")
+                            self._asm.emit("zext.h", "a0", "a0")
                         else:
-                            self._asm.emit("sext.h a0, a0")
+                            self._asm.emit("sext.h", "a0", "a0")
                     case 1:
                         if t1._unsigned:
-                            self._asm.emit("zext.b a0, a0")
+                            self._asm.emit("zext.b", "a0", "a0")
                         else:
-                            self._asm.emit("sext.b a0, a0")
+                            self._asm.emit("sext.b", "a0", "a0")
                     case _:
                         unreachable()
 
                 self.setNodeValue(node, TemporaryValue(t1))
 
             case PointerType(), PointerType():
-                _reinterpret()
+                match v2:
+                    case StackFrameOffset() | SymConstant() | PtrConstant() | TemporaryOffset():
+                        self.setNodeValue(node, self._asm.offsetAddress(v2, 0, t1))
+                    case _:
+                        _reinterpret()
 
             # Any integer can be cast to any pointer type.
             # Any pointer type can be cast to any integer type.
@@ -884,6 +1368,7 @@ class Codegen(NodeVisitor):
 
         if self.getNodeTranslated(node):
             self.translate(node)
+            self._asm.load(node)
             self.setNodeValue(node, TemporaryValue(ty))
             return
 
@@ -894,17 +1379,17 @@ class Codegen(NodeVisitor):
 
             case "-":
                 assert ty.size() != 8
-                self._asm.emit("neg a0, a0")
+                self._asm.emit("neg", "a0", "a0")
 
             case "~":
                 if ty.size() == 8:
-                    self._asm.emit("not a1, a1")
-                self._asm.emit("not a0, a0")
+                    self._asm.emit("not", "a1", "a1")
+                self._asm.emit("not", "a0", "a0")
 
             case "!":
                 if ty.size() == 8:
-                    self._asm.emit("or a0, a0, a1")
-                self._asm.emit("seqz a0, a0")
+                    self._asm.emit("or", "a0", "a0", "a1")
+                self._asm.emit("seqz", "a0", "a0")
 
             case "++" | "--" | "p++" | "p--":
                 unreachable()
@@ -925,6 +1410,7 @@ class Codegen(NodeVisitor):
 
         if self.getNodeTranslated(node):
             self.translate(node)
+            self._asm.load(node)
             self.setNodeValue(node, TemporaryValue(ty))
             return
 
@@ -934,17 +1420,50 @@ class Codegen(NodeVisitor):
                 labelEnd = self.getNodeLabels(node)[0]
                 self._asm.load(node.left)
                 if tyL.size() == 8:
-                    self._asm.emit("or a0, a0, a1")
-                self._asm.emit(f"{mnemonic} a0, ${labelEnd}")
+                    self._asm.emit("or", "a0", "a0", "a1")
+                self._asm.emit(mnemonic, "a0", Sym(labelEnd))
                 self._asm.load(node.right)
                 if tyL.size() == 8:
-                    self._asm.emit("or a0, a0, a1")
+                    self._asm.emit("or", "a0", "a0", "a1")
                 self._asm.emitLabel(labelEnd)
-                self._asm.emit("snez a0, a0")
+                self._asm.emit("snez", "a0", "a0")
 
                 self.setNodeValue(node, TemporaryValue(ty))
                 return
 
+            case "+" | "-" if isinstance(ty, PointerType):
+                # p + i, p - i and i + p with a constant i
+                match node.op, rL._value, rR._value:
+                    case _, _, IntConstant():
+                        nodeP, i = node.left, rR._value._i
+                        if node.op == "-":
+                            i = -i
+                    case "+", IntConstant(), _:
+                        nodeP, i = node.right, rL._value._i
+                    case _:
+                        nodeP = None
+
+                if nodeP:
+                    tyP = self.getNodeType(nodeP)
+                    i *= 1 if tyP._base.isVoid() else tyP._base.size()
+                    i = getBuiltinType("int").wrap(i)
+
+                    vP = self.getNodeValue(nodeP)
+                    match vP:
+                        case StackFrameOffset() | SymConstant() | PtrConstant() | TemporaryOffset():
+                            pass
+                        case _:
+                            self._asm.load(vP)
+                            vP = TemporaryValue(tyP)
+
+                    v = self._asm.offsetAddress(vP, i, ty)
+                    if v is None:
+                        self._asm.load(vP)
+                        self._asm.emit("addi", "a0", "a0", i)
+                        v = TemporaryValue(ty)
+                    self.setNodeValue(node, v)
+                    return
+
             case "+":
                 match rL._value, rR._value:
                     case IntConstant(_i=0) | PtrConstant(_i=0), Value():
@@ -956,63 +1475,58 @@ class Codegen(NodeVisitor):
                         self.setNodeValue(node, TemporaryValue(ty))
                         return
 
-        self._asm.push(node.right)
-        self._asm.load(node.left)
-        self._asm.pop(tyR, "a2", "a3")
+        vR = rR._value
+        if (isinstance(node.right, c_ast.ID) and inRegister(vR)) or (
+            self._ctx.optimize and isinstance(vR, Constant)
+        ):
+            self._asm.load(node.left)
+            self._asm.load(vR, "a2", "a3")
+        else:
+            self._asm.push(node.right)
+            self._asm.load(node.left)
+            self._asm.pop(tyR, "a2", "a3")
 
         match node.op:
             case "+":
                 if tyL.size() == 8:
-                    self._asm.emit(
-                        [
-                            "add a0, a0, a2",
-                            "sltu a2, a0, a2",
-                            "add a1, a1, a3",
-                            "add a1, a1, a2",
-                        ]
-                    )
+                    self._asm.emit("add", "a0", "a0", "a2")
+                    self._asm.emit("sltu", "a2", "a0", "a2")
+                    self._asm.emit("add", "a1", "a1", "a3")
+                    self._asm.emit("add", "a1", "a1", "a2")
                 else:
                     if isinstance(tyL, PointerType):  # p + i
                         sz = 0 if tyL._base.isVoid() else tyL._base.size()
                         if sz > 1:
-                            self._asm.emit(f"slli a2, a2, {log2(sz)}")
+                            self._asm.emit("slli", "a2", "a2", log2(sz))
                     elif isinstance(tyR, PointerType):  # i + p
                         sz = 0 if tyR._base.isVoid() else tyR._base.size()
                         if sz > 1:
-                            self._asm.emit(f"slli a0, a0, {log2(sz)}")
-                    self._asm.emit("add a0, a0, a2")
+                            self._asm.emit("slli", "a0", "a0", log2(sz))
+                    self._asm.emit("add", "a0", "a0", "a2")
 
             case "-":
                 if tyL.size() == 8:
-                    self._asm.emit(
-                        [
-                            "sub a1, a1, a3",
-                            "sltu a3, a0, a2",
-                            "sub a1, a1, a3",
-                            "sub a0, a0, a2",
-                        ]
-                    )
+                    self._asm.emit("sub", "a1", "a1", "a3")
+                    self._asm.emit("sltu", "a3", "a0", "a2")
+                    self._asm.emit("sub", "a1", "a1", "a3")
+                    self._asm.emit("sub", "a0", "a0", "a2")
                 else:
                     if isinstance(tyL, PointerType):
                         sz = 0 if tyL._base.isVoid() else tyL._base.size()
                         if sz > 1:
-                            self._asm.emit(f"slli a2, a2, {log2(sz)}")
-                    self._asm.emit("sub a0, a0, a2")
+                            self._asm.emit("slli", "a2", "a2", log2(sz))
+                    self._asm.emit("sub", "a0", "a0", "a2")
 
             case "*":
                 if tyL.size() == 8:
-                    self._asm.emit(
-                        [
-                            "mul a1, a2, a1",
-                            "mul a3, a3, a0",
-                            "add a1, a1, a3",
-                            "mulhu a3, a2, a0",
-                            "add a1, a1, a3",
-                            "mul a0, a2, a0",
-                        ]
-                    )
+                    self._asm.emit("mul", "a1", "a2", "a1")
+                    self._asm.emit("mul", "a3", "a3", "a0")
+                    self._asm.emit("add", "a1", "a1", "a3")
+                    self._asm.emit("mulhu", "a3", "a2", "a0")
+                    self._asm.emit("add", "a1", "a1", "a3")
+                    self._asm.emit("mul", "a0", "a2", "a0")
                 else:
-                    self._asm.emit("mul a0, a0, a2")
+                    self._asm.emit("mul", "a0", "a0", "a2")
 
             case "/":
                 if tyL.size() == 8:
@@ -1020,7 +1534,7 @@ class Codegen(NodeVisitor):
                 else:
                     assert isinstance(tyL, IntType)
                     mnemonic = "divu" if tyL._unsigned else "div"
-                    self._asm.emit(f"{mnemonic} a0, a0, a2")
+                    self._asm.emit(mnemonic, "a0", "a0", "a2")
 
             case "%":
                 if tyL.size() == 8:
@@ -1028,40 +1542,37 @@ class Codegen(NodeVisitor):
                 else:
                     assert isinstance(tyL, IntType)
                     mnemonic = "remu" if tyL._unsigned else "rem"
-                    self._asm.emit(f"{mnemonic} a0, a0, a2")
+                    self._asm.emit(mnemonic, "a0", "a0", "a2")
 
             case "&" | "|" | "^":
                 mnemonic = {"&": "and", "|": "or", "^": "xor"}[node.op]
                 if tyL.size() == 8:
-                    self._asm.emit(f"{mnemonic} a1, a1, a3")
-                self._asm.emit(f"{mnemonic} a0, a0, a2")
+                    self._asm.emit(mnemonic, "a1", "a1", "a3")
+                self._asm.emit(mnemonic, "a0", "a0", "a2")
 
             case "<<":
                 if tyL.size() == 8:
                     raise CCNotImplemented(f"64-bit <<")
                 else:
-                    self._asm.emit(f"sll a0, a0, a2")
+                    self._asm.emit("sll", "a0", "a0", "a2")
             case ">>":
                 if tyL.size() == 8:
                     raise CCNotImplemented(f"64-bit >>")
                 else:
                     assert isinstance(tyL, IntType)
                     mnemonic = "srl" if tyL._unsigned else "sra"
-                    self._asm.emit(f"{mnemonic} a0, a0, a2")
+                    self._asm.emit(mnemonic, "a0", "a0", "a2")
 
             case "==" | "!=":
                 mnemonic = "seqz" if node.op == "==" else "snez"
                 if tyL.size() == 8:
-                    self._asm.emit(
-                        [
-                            "xor a1, a1, a3",
-                            "xor a0, a0, a2",
-                            "or a0, a0, a1",
-                            f"{mnemonic} a0, a0",
-                        ]
-                    )
+                    self._asm.emit("xor", "a1", "a1", "a3")
+                    self._asm.emit("xor", "a0", "a0", "a2")
+                    self._asm.emit("or", "a0", "a0", "a1")
+                    self._asm.emit(mnemonic, "a0", "a0")
                 else:
-                    self._asm.emit(["xor a0, a0, a2", f"{mnemonic} a0, a0"])
+                    self._asm.emit("xor", "a0", "a0", "a2")
+                    self._asm.emit(mnemonic, "a0", "a0")
 
             case "<" | ">=":
                 mnemonic = "sltu"
@@ -1080,10 +1591,10 @@ class Codegen(NodeVisitor):
                         """
                     )
                 else:
-                    self._asm.emit(f"{mnemonic} a0, a0, a2")
+                    self._asm.emit(mnemonic, "a0", "a0", "a2")
 
                 if node.op == ">=":
-                    self._asm.emit("xori a0, a0, 1")
+                    self._asm.emit("xori", "a0", "a0", 1)
 
             case ">" | "<=":
                 unreachable()
@@ -1112,15 +1623,28 @@ class Codegen(NodeVisitor):
 
                         # there is no struct rvalue
 
+                    case IntType() | PointerType() if isDead(
+                        self.getNodeRecord(node.lvalue)._value
+                    ):
+                        self._asm.load(node.rvalue)
+                        self.setNodeValue(node, TemporaryValue(tyL))
+
+                    case IntType() | PointerType() if inRegister(
+                        self.getNodeRecord(node.lvalue)._value
+                    ):
+                        self._asm.load(node.rvalue)
+                        self._asm.store(self.getNodeValue(node.lvalue))
+                        self.setNodeValue(node, TemporaryValue(tyL))
+
                     case IntType() | PointerType():
                         self._asm.push(node.rvalue)
                         vL = self.getNodeValue(node.lvalue)
                         self._asm.pop(tyL, "a2", "a3")
                         self._asm.store(vL, "a2", "a3")
 
-                        self._asm.emit("mv a0, a2")
+                        self._asm.emit("mv", "a0", "a2")
                         if tyL.size() == 8:
-                            self._asm.emit("mv a1, a3")
+                            self._asm.emit("mv", "a1", "a3")
                         self.setNodeValue(node, TemporaryValue(tyL))
 
                     case _:
@@ -1155,7 +1679,7 @@ class Codegen(NodeVisitor):
         self._asm.emitCond(node.cond, labelFalse)
 
         self._asm.load(node.iftrue)
-        self._asm.emit(f"j ${labelEnd}")
+        self._asm.emit("j", Sym(labelEnd))
 
         self._asm.emitLabel(labelFalse)
         self._asm.load(node.iffalse)
@@ -1172,15 +1696,25 @@ class Codegen(NodeVisitor):
 
     def visit_Goto(self, node: c_ast.Goto):
         label = self.getNodeLabels(node)[0]
-        self._asm.emit(f"j ${label}")
+        self._asm.emit("j", Sym(label))
 
     def visit_If(self, node: c_ast.If):
+        # the branch which is never taken has been dropped
+        if self._ctx.optimize:
+            match self.getNodeRecord(node.cond)._value:
+                case IntConstant(_i=0) if node.iftrue is None:
+                    self.visit(node.iffalse)
+                    return
+                case IntConstant() as v if v._i and node.iffalse is None:
+                    self.visit(node.iftrue)
+                    return
+
         labelFalse, labelEnd = self.getNodeLabels(node)
 
         self._asm.emitCond(node.cond, labelFalse)
 
         self.visit(node.iftrue)
-        self._asm.emit(f"j ${labelEnd}")
+        self._asm.emit("j", Sym(labelEnd))
 
         self._asm.emitLabel(labelFalse)
         self.visit(node.iffalse)
@@ -1188,13 +1722,16 @@ class Codegen(NodeVisitor):
         self._asm.emitLabel(labelEnd)
 
     def visit_While(self, node: c_ast.While):
+        if node.stmt is None:  # while (0)
+            return
+
         labelStart, labelEnd = self.getNodeLabels(node)
 
         self._asm.emitLabel(labelStart)
         self._asm.emitCond(node.cond, labelEnd)
 
         self.visit(node.stmt)
-        self._asm.emit(f"j ${labelStart}")
+        self._asm.emit("j", Sym(labelStart))
 
         self._asm.emitLabel(labelEnd)
 
@@ -1221,7 +1758,7 @@ class Codegen(NodeVisitor):
 
         self._asm.emitLabel(labelNext)
         self.visit(node.next)
-        self._asm.emit(f"j ${labelStart}")
+        self._asm.emit("j", Sym(labelStart))
 
         self._asm.emitLabel(labelEnd)
 
@@ -1232,11 +1769,12 @@ class Codegen(NodeVisitor):
         labelDefault = None
         for i, label in r._cases:
             if i is not None:
-                self._asm.emit([f"li a1, {i}", f"beq a0, a1, ${label}"])
+                self._asm.emit("li", "a1", i)
+                self._asm.emit("beq", "a0", "a1", Sym(label))
             else:
                 labelDefault = label
         if labelDefault is not None:
-            self._asm.emit(f"j ${labelDefault}")
+            self._asm.emit("j", Sym(labelDefault))
 
         self.visit(node.stmt)
 
@@ -1259,27 +1797,29 @@ class Codegen(NodeVisitor):
 
     def visit_Break(self, node: c_ast.Break):
         label = self.getNodeLabels(node)[0]
-        self._asm.emit(f"j ${label}")
+        self._asm.emit("j", Sym(label))
 
     def visit_Continue(self, node: c_ast.Continue):
         label = self.getNodeLabels(node)[0]
-        self._asm.emit(f"j ${label}")
+        self._asm.emit("j", Sym(label))
 
     def visit_Pragma(self, node: c_ast.Pragma):
         r = self.getNodeRecord(node)
 
-        insts: list[str] = r._pragma.get("ASM", [])
+        insts: list[str] = r._pragma["ASM"] if r._pragma else []
         for inst in insts:
-            if inst == "":
-                self._asm.emitEmptyLine()
-            elif inst.endswith(":"):
-                self._asm.emitLabel(inst[:-1])
+            try:
+                stmt = parse(inst)
+            except AssemblyError as e:
+                raise CCError(*e.args, inst) from None
+            if stmt:
+                self._asm._secText.add(stmt)
             else:
-                self._asm.emit(inst)
+                self._asm.emitEmptyLine()
 
     def visit_Typedef(self, _: c_ast.Typedef):
         match self.getParent():
-            case c_ast.FileAST():
+            case c_ast.FileAST() | None:  # None if compiled incrementally
                 pass
             case _:
                 unreachable()
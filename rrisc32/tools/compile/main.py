@@ -1,33 +1,15 @@
 import os
 import sys
 import argparse
+import contextlib
 import subprocess
 import tarfile
-import glob
-import tempfile
 import shutil
 
 from pycparser import parse_file
 
-from sema import Sema, NodeVisitorCtx
-from codegen import Codegen
-
-tmpDir: str = None
-binDir: str = None
-incDir: str = None
-libDir: str = None
-
-
-def mktemp(suffix: str, prefix: str):
-    prefix = os.path.basename(prefix)
-    os.makedirs(tmpDir, exist_ok=True)
-    return tempfile.mktemp(suffix=suffix, prefix=prefix, dir=tmpDir)
-
-
-def mkdtemp(suffix: str, prefix: str):
-    prefix = os.path.basename(prefix)
-    os.makedirs(tmpDir, exist_ok=True)
-    return tempfile.mkdtemp(suffix=suffix, prefix=prefix, dir=tmpDir)
+from sema import SMALL_DATA_LIMIT
+from toolchain import Toolchain, CompileOptions, compileAst, assembleSource
 
 
 class Action:
@@ -58,30 +40,64 @@ def once(func):
 
 
 class CompileAction(Action):
-    def __init__(self, inact: Action, outfile: str = None, cpp_args: list[str] = []) -> None:
+    def __init__(
+        self,
+        inact: Action,
+        outfile: str = None,
+        options: CompileOptions = None,
+        emitObject: bool = False,
+        toolchain: Toolchain = None,
+        asmFile: str = None,
+    ) -> None:
         self._inact = inact
         self._outfile = outfile
-        self._cpp_args = cpp_args
+        self._options = options or CompileOptions()
+        self._emitObject = emitObject
+        # if given, objects are assembled by its rrisc32-as rather than the
+        # integrated assembler
+        self._toolchain = toolchain
+        # if given, the assembly of an object emitted directly is kept in it
+        self._asmFile = asmFile
 
     @once
     def run(self):
         infile = self._inact.getOutfile()
         if not self._outfile:
             assert infile.endswith(".c")
-            self._outfile = infile[:-2] + ".s"
-
-        cpp_args = ["-nostdinc"] + self._cpp_args
-        ast = parse_file(infile, use_cpp=True, cpp_args=cpp_args)
-
-        ctx = NodeVisitorCtx()
-        sm = Sema(ctx)
-        sm.visit(ast)
-
-        cg = Codegen(ctx)
-        cg.visit(ast)
-
-        with open(self._outfile, "w") as ofs:
-            cg.save(ofs)
+            self._outfile = infile[:-2] + (".o" if self._emitObject else ".s")
+
+        ast = parse_file(infile, use_cpp=True, cpp_args=self._options.getCppArgs())
+        cg = compileAst(ast, self._options)
+
+        if not self._emitObject:
+            with open(self._outfile, "w") as ofs:
+                cg.save(ofs)
+        elif self._toolchain:
+            # the assembly is piped in, without a file in between
+            exe = self._toolchain.getProgram("rrisc32-as")
+            proc = subprocess.Popen(
+                [exe, "-o", self._outfile, "-"], stdin=subprocess.PIPE, text=True
+            )
+            # rrisc32-as may exit early on an error, which is reported below
+            with contextlib.suppress(BrokenPipeError):
+                try:
+                    cg.save(proc.stdin)
+                finally:
+                    proc.stdin.close()
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args)
+        elif self._asmFile:
+            # the output of cg can only be saved once, so the object is
+            # assembled from the saved assembly
+            with open(self._asmFile, "w") as ofs:
+                cg.save(ofs)
+            with open(self._asmFile) as ifs:
+                obj = assembleSource(ifs.read())
+            with open(self._outfile, "wb") as ofs:
+                ofs.write(obj)
+        else:
+            with open(self._outfile, "wb") as ofs:
+                cg.saveObject(ofs)
 
     def getOutfile(self):
         self.run()
@@ -89,8 +105,9 @@ class CompileAction(Action):
 
 
 class AssembleAction(Action):
-    def __init__(self, inact: Action, outfile: str = None) -> None:
+    def __init__(self, inact: Action, toolchain: Toolchain, outfile: str = None) -> None:
         self._inact = inact
+        self._toolchain = toolchain
         self._outfile = outfile
 
     @once
@@ -100,7 +117,7 @@ class AssembleAction(Action):
             assert infile.endswith(".s")
             self._outfile = infile[:-2] + ".o"
 
-        exe = os.path.join(binDir, "rrisc32-as")
+        exe = self._toolchain.getProgram("rrisc32-as")
         subprocess.run([exe, "-o", self._outfile, infile], check=True)
 
     def getOutfile(self):
@@ -115,21 +132,14 @@ def archive(infiles: list[str], outfile: str):
             tf.add(infile, name)
 
 
-def extract(infile: str) -> list[str]:
-    with tarfile.open(infile, "r|") as tf:
-        outdir = mkdtemp(".extracted", infile)
-        tf.extractall(outdir, filter="data")
-        outfiles = glob.glob(os.path.join(outdir, "*.o"))
-        return outfiles
-
-
 class ExtractAction(MOAction):
-    def __init__(self, inact: Action) -> None:
+    def __init__(self, inact: Action, toolchain: Toolchain) -> None:
         self._inact = inact
+        self._toolchain = toolchain
 
     def getOutfiles(self) -> list[str]:
         infile = self._inact.getOutfile()
-        outfiles = extract(infile)
+        outfiles = self._toolchain.extract(infile)
         return outfiles
 
 
@@ -151,15 +161,20 @@ class MIAction(Action):
 
 class LinkAction(MIAction):
     def __init__(
-        self, inacts: list[Action | MOAction], outfile: str, linker_args: list[str] = []
+        self,
+        inacts: list[Action | MOAction],
+        outfile: str,
+        toolchain: Toolchain,
+        linker_args: list[str] = [],
     ) -> None:
         super().__init__(inacts, outfile)
+        self._toolchain = toolchain
         self._linker_args = linker_args
 
     @once
     def run(self):
         infiles = self.getInfiles()
-        exe = os.path.join(binDir, "rrisc32-link")
+        exe = self._toolchain.getProgram("rrisc32-link")
         subprocess.run([exe, "-o", self._outfile] + self._linker_args + infiles, check=True)
 
     def getOutfile(self):
@@ -202,6 +217,34 @@ def main():
         help="Pass comma-separated <options> on to the linker.",
     )
     parser.add_argument("--optimize", action="store_true", help="Enable optimizations.")
+    parser.add_argument(
+        "--function-sections",
+        action="store_true",
+        help="Place each function and global object in its own section.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Analyze and generate code for one function at a time to reduce memory use.",
+    )
+    parser.add_argument(
+        "-G",
+        type=int,
+        default=SMALL_DATA_LIMIT,
+        metavar="<size>",
+        help="Put global objects of at most <size> bytes in .sdata, addressed relative to gp. "
+        f"0 disables it. The default is {SMALL_DATA_LIMIT}.",
+    )
+    parser.add_argument(
+        "--no-integrated-as",
+        action="store_true",
+        help="Run rrisc32-as on the assembly rather than emit object files directly.",
+    )
+    parser.add_argument(
+        "--save-temps",
+        action="store_true",
+        help="Keep the assembly of each compiled source in <infile>.s.",
+    )
     parser.add_argument("-o", metavar="<outfile>")
     parser.add_argument("infiles", metavar="<infile>", nargs="+")
 
@@ -217,19 +260,17 @@ def main():
         _ = os.path.dirname(_)
         sysroot = os.path.dirname(_)
 
-    global tmpDir, binDir, incDir, libDir
-    tmpDir = os.path.join(sysroot, "tmp")
-    binDir = os.path.join(sysroot, "bin")
-    incDir = os.path.join(sysroot, "include")
-    libDir = os.path.join(sysroot, "lib")
+    toolchain = Toolchain(sysroot)
 
     infiles: list[str] = args.infiles
 
-    cpp_args = []
-    for x in args.include or []:
-        cpp_args.append(f"-I{x}")
+    includeDirs = list(args.include or [])
     if not args.nostdinc:
-        cpp_args.append(f"-I{incDir}")
+        includeDirs.append(toolchain.incDir)
+
+    options = CompileOptions(
+        includeDirs, args.optimize, args.function_sections, args.incremental, args.G
+    )
 
     # --Wl=--a,--b=10,-20,--c
     linker_args = []
@@ -260,6 +301,22 @@ def main():
             continue
         raise Exception("input files should be *.c, *.s, *.o or *.a")
 
+    # a .c file is compiled to infile.o unless -o is given
+    def _compileAndAssemble(infile: str, outfile: str = None) -> Action:
+        if args.no_integrated_as and args.save_temps:
+            return AssembleAction(
+                CompileAction(InputAction(infile), infile + ".s", options), toolchain, outfile
+            )
+        outfile = outfile or infile + ".o"
+        if args.no_integrated_as:
+            return CompileAction(
+                InputAction(infile), outfile, options, emitObject=True, toolchain=toolchain
+            )
+        asmFile = infile + ".s" if args.save_temps else None
+        return CompileAction(
+            InputAction(infile), outfile, options, emitObject=True, asmFile=asmFile
+        )
+
     actions: list[Action] = []
     if args.compile:
         if args.o:
@@ -270,11 +327,11 @@ def main():
 
             infile = infiles[0]
             if infile.endswith(".c"):
-                actions.append(CompileAction(InputAction(infile), args.o, cpp_args))
+                actions.append(CompileAction(InputAction(infile), args.o, options))
         else:
             for infile in infiles:
                 if infile.endswith(".c"):
-                    actions.append(CompileAction(InputAction(infile), None, cpp_args))
+                    actions.append(CompileAction(InputAction(infile), None, options))
 
     elif args.assemble:
         if args.o:
@@ -285,21 +342,15 @@ def main():
 
             infile = infiles[0]
             if infile.endswith(".c"):
-                actions.append(
-                    AssembleAction(
-                        CompileAction(InputAction(infile), infile + ".s", cpp_args), args.o
-                    )
-                )
+                actions.append(_compileAndAssemble(infile, args.o))
             elif infile.endswith(".s"):
-                actions.append(AssembleAction(InputAction(infile), args.o))
+                actions.append(AssembleAction(InputAction(infile), toolchain, args.o))
         else:
             for infile in infiles:
                 if infile.endswith(".c"):
-                    actions.append(
-                        AssembleAction(CompileAction(InputAction(infile), infile + ".s", cpp_args))
-                    )
+                    actions.append(_compileAndAssemble(infile))
                 elif infile.endswith(".s"):
-                    actions.append(AssembleAction(InputAction(infile)))
+                    actions.append(AssembleAction(InputAction(infile), toolchain))
 
     else:
         if not args.o:
@@ -308,25 +359,19 @@ def main():
         inacts = []
         for infile in infiles:
             if infile.endswith(".c"):
-                inacts.append(
-                    AssembleAction(
-                        CompileAction(InputAction(infile), infile + ".s", cpp_args),
-                        infile + ".o",
-                    )
-                )
+                inacts.append(_compileAndAssemble(infile, infile + ".o"))
             elif infile.endswith(".s"):
-                inacts.append(AssembleAction(InputAction(infile), infile + ".o"))
+                inacts.append(AssembleAction(InputAction(infile), toolchain, infile + ".o"))
             elif infile.endswith(".o"):
                 inacts.append(InputAction(infile))
             elif infile.endswith(".a"):
-                inacts.append(ExtractAction(InputAction(infile)))
+                inacts.append(ExtractAction(InputAction(infile), toolchain))
 
         if args.archive:
             actions.append(ArchiveAction(inacts, args.o))
         else:
-            inacts.insert(0, ExtractAction(InputAction(os.path.join(libDir, "libc.a"))))
-            inacts.insert(0, InputAction(os.path.join(libDir, "crt.o")))
-            actions.append(LinkAction(inacts, args.o, linker_args))
+            inacts = [InputAction(_) for _ in toolchain.getStartFiles()] + inacts
+            actions.append(LinkAction(inacts, args.o, toolchain, linker_args))
 
     for act in actions:
         act.run()
@@ -1,8 +1,13 @@
+import functools
+import hashlib
+import itertools
+import re
 import sys
+import threading
 import traceback
 
 from abc import ABC
-from typing import Optional, Any
+from typing import Optional, Any, Callable
 
 from pycparser import c_ast
 
@@ -35,8 +40,74 @@ def log2(i: int):
     unreachable()
 
 
+# whether control may enter @node other than from its beginning
+def hasLabels(node: c_ast.Node) -> bool:
+    todo = [node]
+    while todo:
+        node = todo.pop()
+        if isinstance(node, c_ast.Label | c_ast.Case | c_ast.Default):
+            return True
+        if not isinstance(node, Node):
+            todo.extend(child for _, child in node.children())
+    return False
+
+
+# Sema and Codegen recurse as deep as expressions and statements are nested,
+# e.g. a + b + c + ... with thousands of terms. @func is called in a thread
+# whose stack and the recursion limit allow for that
+STACK_SIZE = 512 << 20
+RECURSION_LIMIT = 1 << 20
+
+# globals no larger than this are put in .sdata and addressed relative to gp by
+# default. 0 keeps all of them out of .sdata
+SMALL_DATA_LIMIT = 8
+
+
+# both settings are process-wide, so concurrent calls must not interleave the
+# saving and restoring of them
+_deepStackLock = threading.Lock()
+
+
+def callWithDeepStack(func: Callable[[], Any]) -> Any:
+    res = []
+    exc = []
+
+    def _run():
+        try:
+            res.append(func())
+        except BaseException as e:
+            exc.append(e)
+
+    with _deepStackLock:
+        limit = sys.getrecursionlimit()
+        size = threading.stack_size()
+        try:
+            threading.stack_size(STACK_SIZE)
+            sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+            thread = threading.Thread(target=_run)
+            thread.start()
+            thread.join()
+        finally:
+            threading.stack_size(size)
+            sys.setrecursionlimit(limit)
+
+    if exc:
+        raise exc[0]
+    return res[0]
+
+
+_typeIds = itertools.count(1)
+
+
 # https://en.cppreference.com/w/c/language/type
 class Type(ABC):
+    __slots__ = ("_id", "_name", "_size", "_alignment")
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls)
+        self._id = next(_typeIds)
+        return self
+
     def name(self) -> str:
         return getattr(self, "_name", "")
 
@@ -67,6 +138,8 @@ class Type(ABC):
 
 
 class VoidType(Type):
+    __slots__ = ()
+
     def __init__(self):
         self._name = "void"
 
@@ -76,6 +149,8 @@ def isVoid(ty: Type):
 
 
 class IntType(Type):
+    __slots__ = ("_unsigned",)
+
     def __init__(self, name: str, size: int, unsigned=False, alignment: int = 0):
         self._name = name
         self._size = size
@@ -101,13 +176,20 @@ class IntType(Type):
                 return i - (1 << n)
 
         ccWarn("out of range", self, i)
-        i %= 1 << n
-        if not self._unsigned:
+        return self.wrap(i)
+
+    # the value of the low bits of @i, as the target computes it
+    def wrap(self, i: int):
+        n = self._size * 8
+        i &= (1 << n) - 1
+        if not self._unsigned and i >> (n - 1):
             i -= 1 << n
         return i
 
 
 class FloatType(Type):
+    __slots__ = ()
+
     def __init__(self, name: str, size: int, alignment: int):
         self._name = name
         self._size = size
@@ -115,14 +197,18 @@ class FloatType(Type):
 
 
 class ArrayType(Type):
+    __slots__ = ("_base", "_dim")
+
     def __init__(self, base: Type, dim: int = None):
         self._base = base
         self._alignment = base.alignment()
-        self.setDim(dim)
+        self._dim = dim
+        self._layout()
 
     def setDim(self, dim: int):
         self._dim = dim
         self._layout()
+        onTypeCompleted()
 
     def _layout(self):
         if self._dim is None:
@@ -134,6 +220,8 @@ class ArrayType(Type):
 
 
 class Field:
+    __slots__ = ("_type", "_name", "_offset")
+
     def __init__(self, ty: Type, name: str) -> None:
         assert name
 
@@ -167,13 +255,17 @@ sizeof(arr[0]) // 4
 
 
 class StructType(Type):
+    __slots__ = ("_fields", "_fieldByName", "_fill")
+
     def __init__(self, fields: list[Field], name: str = ""):
         self._name = name
-        self.setFields(fields)
+        self._fields = fields
+        self._layout()
 
     def setFields(self, fields: list[Field]):
         self._fields = fields
         self._layout()
+        onTypeCompleted()
 
     def _layout(self):
         if self._fields is None:
@@ -216,6 +308,8 @@ class StructType(Type):
 
 
 class PointerType(Type):
+    __slots__ = ("_base",)
+
     def __init__(self, base: Type) -> None:
         self._base = base
         self._size = 4
@@ -232,19 +326,12 @@ class PointerType(Type):
 
 
 class FunctionType(Type):
-    def __init__(self, ret: Type, args: list[Type], ellipsis: bool) -> None:
+    __slots__ = ("_ret", "_args", "_ellipsis")
 
-        def _cook(ty: Type):
-            if isinstance(ty, ArrayType):
-                return PointerType(ty._base)
-            if isinstance(ty, StructType):
-                raise CCNotImplemented("pass/return struct")
-            if isinstance(ty, FunctionType):
-                return PointerType(ty)
-            return ty
+    def __init__(self, ret: Type, args: list[Type], ellipsis: bool) -> None:
 
-        self._ret = _cook(ret)
-        self._args = [_cook(_) for _ in args]
+        self._ret = ret
+        self._args = args
         self._ellipsis = ellipsis
 
         self._size = 0
@@ -254,8 +341,55 @@ class FunctionType(Type):
         return "(%r => %r)" % (self._args, self._ret)
 
 
+# Derived types are interned, so that structurally identical ones are the same
+# object and most compatibility checks reduce to an identity check. Incomplete
+# arrays are not interned since their dimensions may be set later. The tables
+# are cleared for each translation unit by clearTypeCaches.
+_pointerTypes: dict[int, PointerType] = {}
+_arrayTypes: dict[tuple[int, int], ArrayType] = {}
+_functionTypes: dict[tuple[int, tuple[int, ...], bool], FunctionType] = {}
+
+
+def getPointerType(base: Type) -> PointerType:
+    ty = _pointerTypes.get(base._id)
+    if ty is None:
+        ty = _pointerTypes[base._id] = PointerType(base)
+    return ty
+
+
+def getArrayType(base: Type, dim: int = None) -> ArrayType:
+    if dim is None:
+        return ArrayType(base)
+    key = (base._id, dim)
+    ty = _arrayTypes.get(key)
+    if ty is None:
+        ty = _arrayTypes[key] = ArrayType(base, dim)
+    return ty
+
+
+def getFunctionType(ret: Type, args: list[Type], ellipsis: bool) -> FunctionType:
+    def _cook(ty: Type):
+        if isinstance(ty, ArrayType):
+            return getPointerType(ty._base)
+        if isinstance(ty, StructType):
+            raise CCNotImplemented("pass/return struct")
+        if isinstance(ty, FunctionType):
+            return getPointerType(ty)
+        return ty
+
+    ret = _cook(ret)
+    args = [_cook(_) for _ in args]
+    key = (ret._id, tuple(_._id for _ in args), ellipsis)
+    ty = _functionTypes.get(key)
+    if ty is None:
+        ty = _functionTypes[key] = FunctionType(ret, args, ellipsis)
+    return ty
+
+
 # https://en.cppreference.com/w/c/language/value_category
 class Value(ABC):
+    __slots__ = ("_type",)
+
     def __init__(self, ty: Type) -> None:
         self._type = ty
 
@@ -280,6 +414,8 @@ The following expressions are lvalues:
 
 
 class LValue(Value):
+    __slots__ = ()
+
     def __init__(self, ty: Type) -> None:
         super().__init__(ty)
 
@@ -290,6 +426,8 @@ def checkLValue(v: Value):
 
 
 class RValue(Value):
+    __slots__ = ()
+
     def __init__(self, ty: Type) -> None:
         super().__init__(ty)
 
@@ -305,6 +443,18 @@ defined for pointers to functions and not for function designators themselves.
 
 
 class Function(Value):
+    __slots__ = (
+        "_name",
+        "_defined",
+        "_maxOffset",
+        "_labels",
+        "_gotos",
+        "_static",
+        "_vars",
+        "_noRegisters",
+        "_savedRegs",
+    )
+
     def __init__(self, name: str, ty: FunctionType, defined: bool = False) -> None:
         super().__init__(ty)
         self._name = name
@@ -315,17 +465,17 @@ class Function(Value):
         self._labels = set()
         self._gotos = set()
 
-    def getStaticLabel(self, name: str, *, _i=[0]):
-        _i[0] += 1
-        return f"{self._name}.{name}.{_i[0]}"
+        self._static = False
+
+        # local variables and arguments, candidates of register allocation
+        self._vars: list[LocalVariable | Argument] = []
+        # set if the function contains inline asm or calls setjmp
+        self._noRegisters = False
+        self._savedRegs: list[str] = []
 
     def getLocalLabel(self, name: str):
         return f".LF.{self._name}.{name}"
 
-    def getTempVarName(self, *, _i=[0]):
-        _i[0] += 1
-        return f"tmp.{_i[0]}"
-
     def updateMaxOffset(self, offset: int):
         if offset > self._maxOffset:
             self._maxOffset = offset
@@ -345,8 +495,31 @@ class Function(Value):
         if len(s) > 0:
             raise CCError("unknown labels", s)
 
+    # promote the most used scalar variables whose address is never taken to
+    # callee-saved registers
+    def allocateRegisters(self):
+        if self._noRegisters:
+            return
+
+        def _suitable(v: LocalVariable | Argument):
+            ty = v.getType()
+            return (
+                not v._inMemory
+                and not v._dead
+                and v._uses > 0
+                and isinstance(ty, IntType | PointerType)
+                and ty.size() <= 4
+            )
+
+        vs = sorted(filter(_suitable, self._vars), key=lambda v: v._uses, reverse=True)
+        for v, reg in zip(vs, CALLEE_SAVED_REGS):
+            v._reg = reg
+            self._savedRegs.append(reg)
+
 
 class Variable(LValue):
+    __slots__ = ("_name",)
+
     def __init__(self, name: str, ty: Type) -> None:
         super().__init__(ty)
         self._name = name
@@ -356,6 +529,8 @@ class Variable(LValue):
 
 
 class GlobalVariable(Variable):
+    __slots__ = ("_label", "_static")
+
     def __init__(self, name: str, ty: Type, _static=False) -> None:
         super().__init__(name, ty)
         self._label = name
@@ -363,33 +538,92 @@ class GlobalVariable(Variable):
 
 
 class StaticVariable(Variable):
+    __slots__ = ("_label",)
+
     def __init__(self, name: str, ty: Type, label: str) -> None:
         super().__init__(name, ty)
         self._label = label
 
 
 class ExternVariable(Variable):
+    __slots__ = ("_label",)
+
     def __init__(self, name: str, ty: Type) -> None:
         super().__init__(name, ty)
         self._label = name
 
 
 class LocalVariable(Variable):
+    __slots__ = (
+        "_offset",
+        "_inMemory",
+        "_uses",
+        "_reg",
+        "_ids",
+        "_assigned",
+        "_overwritten",
+        "_init",
+        "_dead",
+    )
+
     def __init__(self, name: str, ty: Type, offset: int) -> None:
         super().__init__(name, ty)
         self._offset = offset
 
+        # whether it must live in the stack frame (address taken or volatile)
+        self._inMemory = False
+        # number of references, weighted by loop depth
+        self._uses = 0
+        self._reg: Optional[str] = None
+
+        # referencing ID nodes, those being assigned to, and those being
+        # overwritten (i.e. the old value is not read)
+        self._ids: set[c_ast.ID] = set()
+        self._assigned: set[c_ast.ID] = set()
+        self._overwritten: set[c_ast.ID] = set()
+        # value of the initializer
+        self._init: Optional[Value] = None
+        # stores to it are never read
+        self._dead = False
+
 
 class Argument(Variable):
+    __slots__ = (
+        "_offset",
+        "_inMemory",
+        "_uses",
+        "_reg",
+        "_ids",
+        "_assigned",
+        "_overwritten",
+        "_init",
+        "_dead",
+    )
+
     def __init__(self, name: str, ty: Type, offset: int) -> None:
         super().__init__(name, ty)
         self._offset = offset
 
+        self._inMemory = False
+        self._uses = 0
+        self._reg: Optional[str] = None
+
+        self._ids: set[c_ast.ID] = set()
+        self._assigned: set[c_ast.ID] = set()
+        self._overwritten: set[c_ast.ID] = set()
+        self._init: Optional[Value] = None
+        self._dead = False
+
+
+CALLEE_SAVED_REGS = [f"s{i}" for i in range(1, 12)]
+
 
 class StrLiteral(LValue):
+    __slots__ = ("_s", "_sOrig", "_label")
+
     def __init__(self, s: str, sOrig: str, ty: Optional[Type] = None) -> None:
         ty = ty or getBuiltinType("char")
-        super().__init__(ArrayType(ty, len(s)))
+        super().__init__(getArrayType(ty, len(s)))
         self._s = s
         self._sOrig = sOrig
 
@@ -398,23 +632,31 @@ class StrLiteral(LValue):
 
 # https://en.cppreference.com/w/c/language/constant_expression
 class Constant(RValue):
+    __slots__ = ()
+
     def __init__(self, ty: Type) -> None:
         super().__init__(ty)
 
 
 class IntConstant(Constant):
+    __slots__ = ("_i",)
+
     def __init__(self, i: int, ty: IntType) -> None:
         super().__init__(ty)
         self._i = ty.convert(i)
 
 
 class PtrConstant(Constant):
+    __slots__ = ("_i",)
+
     def __init__(self, i: int, ty: PointerType) -> None:
         super().__init__(ty)
         self._i = i
 
 
 class SymConstant(Constant):
+    __slots__ = ("_name", "_offset")
+
     def __init__(self, name: str, ty: PointerType, offset: int = 0) -> None:
         super().__init__(ty)
         self._name = name
@@ -426,20 +668,38 @@ class SymConstant(Constant):
 
 class Scope(ABC):
     def __init__(self, prev: Optional["Scope"] = None) -> None:
+        # symbols defined in this scope
         self._symbolTable: dict[str, Type | Variable | Function] = {}
         self._prev: Scope = prev
 
+        # symbols visible in this scope, each name mapped to its definitions
+        # from the outermost scope to the innermost one. It is shared with the
+        # enclosing scope and updated when entering and exiting scopes, so only
+        # the innermost scope may be searched
+        self._visible: dict[str, list[Type | Variable | Function]] = prev._visible if prev else {}
+
     def addSymbol(self, name: str, value: Type | Variable | Function):
         if name in self._symbolTable:
             raise CCError("redefined", name)
         self._symbolTable[name] = value
 
+        stack = self._visible.get(name)
+        if stack is None:
+            self._visible[name] = [value]
+        else:
+            stack.append(value)
+
+    # the symbols defined in this scope are no longer visible
+    def exit(self):
+        for name in self._symbolTable:
+            stack = self._visible[name]
+            stack.pop()
+            if not stack:
+                del self._visible[name]
+
     def findSymbol(self, name: str) -> Type | Variable | Function:
-        if name in self._symbolTable:
-            return self._symbolTable[name]
-        if self._prev:
-            return self._prev.findSymbol(name)
-        return None
+        stack = self._visible.get(name)
+        return stack[-1] if stack else None
 
     def getSymbol(self, name: str):
         res = self.findSymbol(name)
@@ -476,6 +736,9 @@ class GlobalScope(Scope):
     def __init__(self, prev: Scope) -> None:
         super().__init__(prev)
 
+        # builtinScope is shared by all translation units
+        self._visible = {name: stack.copy() for name, stack in prev._visible.items()}
+
 
 class LocalScope(Scope):
     def __init__(self, prev: Scope) -> None:
@@ -534,9 +797,37 @@ def getBuiltinType(name: str) -> Type:
 voidTy = getBuiltinType("void")
 
 
-def getIntConstant(i: int, ty: str = ""):
-    ty = ty or "int"
-    return IntConstant(i, getBuiltinType(ty))
+# small integer constants are shared, as they are never modified
+SMALL_INT_MIN = -256
+SMALL_INT_MAX = 1023
+
+_intConstants: dict[tuple[int, int], IntConstant] = {}
+
+
+def getIntConstant(i: int, ty: str | IntType = ""):
+    if isinstance(ty, str):
+        ty = getBuiltinType(ty or "int")
+    if not SMALL_INT_MIN <= i <= SMALL_INT_MAX:
+        return IntConstant(i, ty)
+    key = (ty._id, i)
+    v = _intConstants.get(key)
+    if v is None:
+        v = _intConstants[key] = IntConstant(i, ty)
+    return v
+
+
+# constants are shared within a translation unit only, like derived types
+def clearIntConstants():
+    _intConstants.clear()
+
+
+# results of isCompatible, keyed by type ids
+_compatible: dict[tuple[int, int], bool] = {}
+
+
+# a type being completed may turn some cached results from False to True
+def onTypeCompleted():
+    _compatible.clear()
 
 
 # https://en.cppreference.com/w/c/language/type#Compatible_types
@@ -544,6 +835,23 @@ def isCompatible(t1: Type, t2: Type):
     if t1 is t2:
         return True
 
+    key = (t1._id, t2._id)
+    res = _compatible.get(key)
+    if res is None:
+        res = _compatible[key] = _isCompatible(t1, t2)
+    return res
+
+
+# the types of a finished translation unit are not referred to again, so
+# interning them and their compatibility results would only leak memory
+def clearTypeCaches():
+    _pointerTypes.clear()
+    _arrayTypes.clear()
+    _functionTypes.clear()
+    _compatible.clear()
+
+
+def _isCompatible(t1: Type, t2: Type):
     if not t1.isComplete() or not t2.isComplete():
         return False
 
@@ -626,14 +934,102 @@ def getArithmeticCommonType(t1: IntType, t2: IntType):
     return t2
 
 
+# https://en.cppreference.com/w/c/language/constant_expression
+# Operators on integer constants are evaluated as on the target: results wrap
+# around to the width of their type, / and % truncate toward zero, and >> of a
+# negative value is arithmetic. Both operands have been converted to a common
+# type, except for shifts. None is returned if the result is undefined
+def evalIntBinaryOp(op: str, vL: IntConstant, vR: IntConstant) -> Optional[IntConstant]:
+    iL = vL._i
+    iR = vR._i
+    ty: IntType = vL.getType()
+    match op:
+        case "+":
+            i = iL + iR
+        case "-":
+            i = iL - iR
+        case "*":
+            i = iL * iR
+        case "/" | "%":
+            if iR == 0:
+                ccWarn("division by zero")
+                return None
+            q = abs(iL) // abs(iR)
+            if (iL < 0) != (iR < 0):
+                q = -q
+            i = q if op == "/" else iL - q * iR
+        case "&":
+            return getIntConstant(iL & iR, ty)
+        case "|":
+            return getIntConstant(iL | iR, ty)
+        case "^":
+            return getIntConstant(iL ^ iR, ty)
+        case "<<" | ">>":
+            if not 0 <= iR < ty.size() * 8:
+                ccWarn("shift count out of range", iR)
+                return None
+            i = iL << iR if op == "<<" else iL >> iR
+            return getIntConstant(ty.wrap(i), ty)
+        case "==":
+            return getIntConstant(1 if iL == iR else 0)
+        case "!=":
+            return getIntConstant(1 if iL != iR else 0)
+        case "<":
+            return getIntConstant(1 if iL < iR else 0)
+        case ">=":
+            return getIntConstant(1 if iL >= iR else 0)
+        case "&&":
+            return getIntConstant(1 if iL and iR else 0)
+        case "||":
+            return getIntConstant(1 if iL or iR else 0)
+        case _:
+            unreachable()
+
+    res = ty.wrap(i)
+    if res != i and not ty._unsigned:
+        ccWarn("integer overflow in expression", ty)
+    return getIntConstant(res, ty)
+
+
+def evalIntUnaryOp(op: str, v: IntConstant) -> IntConstant:
+    ty: IntType = v.getType()
+    match op:
+        case "+":
+            return v
+        case "-":
+            i = -v._i
+        case "~":
+            return getIntConstant(ty.wrap(~v._i), ty)
+        case "!":
+            return getIntConstant(1 if v._i == 0 else 0)
+        case _:
+            unreachable()
+
+    res = ty.wrap(i)
+    if res != i and not ty._unsigned:
+        ccWarn("integer overflow in expression", ty)
+    return getIntConstant(res, ty)
+
+
+# p + i, with the address wrapped around like the integer constants are
+def evalPtrOffset(v: PtrConstant, i: int, ty: PointerType) -> PtrConstant:
+    sz = 1 if ty._base.isVoid() else ty._base.size()
+    return PtrConstant(getBuiltinType("int").wrap(v._i + i * sz), ty)
+
+
+# a pointer constant as an address, which is unsigned
+def ptrToInt(v: PtrConstant) -> IntConstant:
+    return getIntConstant(getBuiltinType("unsigned long").wrap(v._i), "unsigned long")
+
+
 def promoteArgType(ty: Type):
     match ty:
         case IntType():
             return promoteIntType(ty)
         case ArrayType():
-            return PointerType(ty._base)
+            return getPointerType(ty._base)
         case FunctionType():
-            return PointerType(ty)
+            return getPointerType(ty)
     return ty
 
 
@@ -650,41 +1046,91 @@ class Node(c_ast.Node):
                     unreachable()
 
 
+# https://en.cppreference.com/w/c/language/integer_constant
+@functools.lru_cache(maxsize=4096)
+def parseIntLiteral(s: str) -> int:
+    s = s.lower()
+    while s.endswith("u") or s.endswith("l"):
+        s = s[:-1]
+    if s.startswith("0x"):
+        return int(s[2:], base=16)
+    if s.startswith("0") and len(s) > 1:
+        return int(s[1:], base=8)
+    return int(s, base=10)
+
+
+# the first type in which the value of a literal fits, e.g. 0xffffffff is
+# unsigned int and 2147483648 is long long. @ty is given by its suffix
+@functools.lru_cache(maxsize=16)
+def getIntLiteralTypes(ty: str, decimal: bool) -> list[IntType]:
+    names = {
+        "int": ["int", "long", "long long"],
+        "long int": ["long", "long long"],
+        "long long int": ["long long"],
+        "unsigned int": ["unsigned int", "unsigned long", "unsigned long long"],
+        "unsigned long int": ["unsigned long", "unsigned long long"],
+        "unsigned long long int": ["unsigned long long"],
+    }[ty]
+    if not decimal:
+        names = [_ for name in names for _ in [name, "unsigned " + name.removeprefix("unsigned ")]]
+    tys = []
+    for name in names:
+        if getBuiltinType(name) not in tys:
+            tys.append(getBuiltinType(name))
+    return tys
+
+
+def parseIntConstant(node: c_ast.Constant) -> IntConstant:
+    i = parseIntLiteral(node.value)
+    tys = getIntLiteralTypes(node.type, not node.value.startswith("0"))
+    for ty in tys:
+        if ty.wrap(i) == i:
+            return getIntConstant(i, ty)
+    ccWarn("integer constant is too large", node.value)
+    return getIntConstant(i, tys[-1])
+
+
+# https://en.cppreference.com/w/c/language/escape
+_ESCAPE = re.compile(r"\\(?:([0-7]{1,3})|x([0-9A-Fa-f]+)|(.?))", re.S)
+_ESCAPES = {
+    "'": "'",
+    '"': '"',
+    "?": "?",
+    "\\": "\\",
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+_INVALID_CHAR = re.compile(r"[^\x00-\xff]")
+
+
+def _unescape(m: re.Match) -> str:
+    o, x, c = m.groups()
+    if c is not None:
+        if c not in _ESCAPES:
+            raise CCError("invalid escape sequence", repr(m[0]))
+        return _ESCAPES[c]
+
+    i = int(o, base=8) if o else int(x, base=16)
+    if i > 255:
+        raise CCError("escape sequence out of range", repr(m[0]))
+    return chr(i)
+
+
+# the same literals tend to appear many times, e.g. in macros
+@functools.lru_cache(maxsize=4096)
 def unescapeStr(s: str) -> str:
-    arr = []
-
-    for c in s:
-        x = ord(c)
-        if x > 255:
-            raise CCError("invalid character", c)
-
-    i = 0
-    while i < len(s):
-        c = s[i]
-        if c == "\\":
-            i += 1
-            match s[i : i + 1]:
-                case "n":
-                    arr.append("\n")
-                case "t":
-                    arr.append("\t")
-                case "0":
-                    arr.append("\0")
-                case '"':
-                    arr.append('"')
-                case "\\":
-                    arr.append("\\")
-                case "x":
-                    i += 2
-                    arr.append(chr(int(s[i - 1 : i + 1], base=16)))
-                case _:
-                    raise CCError("invalid escape sequence", repr(s[i - 1 : i + 1]))
-        else:
-            arr.append(c)
-
-        i += 1
+    m = _INVALID_CHAR.search(s)
+    if m:
+        raise CCError("invalid character", m[0])
 
-    return "".join(arr)
+    if "\\" not in s:
+        return s
+    return _ESCAPE.sub(_unescape, s)
 
 
 class NodeRecord:
@@ -696,31 +1142,99 @@ class NodeRecord:
         self._visited = False
         self._labels: list[str] = None
         self._cases: list[tuple[Optional[int], str]] = None
-        self._pragma: dict[str, Any] = {}
+        self._pragma: dict[str, Any] = None
 
 
 class NodeVisitorCtx:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        optimize: bool = False,
+        functionSections: bool = False,
+        incremental: bool = False,
+        smallDataLimit: int = SMALL_DATA_LIMIT,
+    ) -> None:
+        # a context is created for each translation unit
+        clearTypeCaches()
+        clearIntConstants()
+
+        # keyed by identity, as pycparser's nodes have no room for a record or
+        # an id. The order of insertion is relied upon by releaseRecords
         self.records: dict[c_ast.Node, NodeRecord] = {}
         self.gScope = GlobalScope(builtinScope)
+        self.optimize = optimize
+        self.functionSections = functionSections
+        # each declaration or function definition at file scope is compiled
+        # before the next one is analyzed
+        self.incremental = incremental
+        self.smallDataLimit = smallDataLimit
 
         self._strPool: dict[str, StrLiteral] = {}
 
-    def addStr(self, sLit: StrLiteral):
+        # counters which make labels and names unique within the translation
+        # unit, so that its output does not depend on what was compiled before
+        # in the same process
+        self._localLabelIds = itertools.count(1)
+        self._staticLabelIds = itertools.count(1)
+        self._initLabelIds = itertools.count(1)
+        self._tempVarIds = itertools.count(1)
+
+        # functions, global/static variables and pooled strings referenced by
+        # each function (None for references outside of functions)
+        self._refs: dict[Optional[Function], set[Value]] = {}
+
+    def addStr(self, sLit: StrLiteral) -> StrLiteral:
         s: str = sLit._s
         if s not in self._strPool:
-            sLit._label = self.getStrLabel()
+            sLit._label = self.getStrLabel(s)
             self._strPool[s] = sLit
         else:
             sLit._label = self._strPool[s]._label
+        return self._strPool[s]
+
+    def addRef(self, func: Optional[Function], v: Value):
+        self._refs.setdefault(func, set()).add(v)
+
+    # the number of records, to be passed to releaseRecords
+    def markRecords(self) -> int:
+        return len(self.records)
+
+    # drop all records created since @mark was taken, e.g. those of a compiled
+    # function, including records of nodes replaced during translation
+    def releaseRecords(self, mark: int):
+        records = self.records
+        for _ in range(len(records) - mark):
+            records.popitem()
+
+    # everything reachable from references outside of functions and the roots
+    # added by Sema, i.e. non-static functions and global variables
+    def getReachable(self) -> set[Value]:
+        reachable = set()
+        todo = [None]
+        while todo:
+            for v in self._refs.get(todo.pop(), []):
+                if v not in reachable:
+                    reachable.add(v)
+                    todo.append(v)
+        return reachable
+
+    # derived from the contents so that the same string gets the same label in
+    # every translation unit
+    def getStrLabel(self, s: str):
+        return ".LS." + hashlib.blake2b(s.encode("latin-1"), digest_size=8).hexdigest()
+
+    def getLocalLabel(self, name: str):
+        return f".LL_{next(self._localLabelIds)}.{name}"
 
-    def getStrLabel(self, *, _i=[0]):
-        _i[0] += 1
-        return f".LS_{_i[0]}"
+    # the label of a static local variable of @func
+    def getStaticLabel(self, func: Function, name: str):
+        return f"{func._name}.{name}.{next(self._staticLabelIds)}"
 
-    def getLocalLabel(self, name: str, *, _i=[0]):
-        _i[0] += 1
-        return f".LL_{_i[0]}.{name}"
+    # the label of the template of a local aggregate of @func
+    def getInitLabel(self, func: Function, name: str):
+        return f".LI.{func._name}.{name}.{next(self._initLabelIds)}"
+
+    def getTempVarName(self):
+        return f"tmp.{next(self._tempVarIds)}"
 
 
 class NodeVisitor(c_ast.NodeVisitor):
@@ -730,6 +1244,7 @@ class NodeVisitor(c_ast.NodeVisitor):
         self._scope: Scope = ctx.gScope
         self._func: Function = None
         self._path: list[c_ast.Node] = []
+        self._visitors: dict[type, Callable[[c_ast.Node], None]] = {}
 
     def getParent(self, i=1):
         n = len(self._path)
@@ -742,14 +1257,23 @@ class NodeVisitor(c_ast.NodeVisitor):
             return
         assert not isinstance(node, Node)
 
+        visitor = self._visitors.get(node.__class__)
+        if visitor is None:
+            name = "visit_" + node.__class__.__name__
+            visitor = self._visitors[node.__class__] = getattr(self, name, self.generic_visit)
+
         self._path.append(node)
-        super().visit(node)
+        visitor(node)
         self._path.pop()
 
     def visit_FileAST(self, node: c_ast.FileAST):
+        for ext in node.ext:
+            self.visitExt(ext)
+
+    # a declaration or function definition at file scope
+    def visitExt(self, ext: c_ast.Node):
         try:
-            for ext in node.ext:
-                self.visit(ext)
+            self.visit(ext)
         except CCError as ex:
 
             def formatNode(node: c_ast.Node):
@@ -758,8 +1282,9 @@ class NodeVisitor(c_ast.NodeVisitor):
                     getattr(node, "coord", ""),
                 )
 
-            print("%s : %s" % (formatNode(self._path[-1]), ex))
-            for i, _ in enumerate(reversed(self._path[1:-1])):
+            path = [_ for _ in self._path if not isinstance(_, c_ast.FileAST)]
+            print("%s : %s" % (formatNode(path[-1]), ex))
+            for i, _ in enumerate(reversed(path[:-1])):
                 print("%s%s" % ("  " * (i + 1), formatNode(_)))
             raise
 
@@ -767,9 +1292,10 @@ class NodeVisitor(c_ast.NodeVisitor):
         if isinstance(node, Node):
             return node
 
-        if node not in self._records:
-            self._records[node] = NodeRecord()
-        return self._records[node]
+        r = self._records.get(node)
+        if r is None:
+            r = self._records[node] = NodeRecord()
+        return r
 
     def setNodeValue(self, node: c_ast.Node, v: Value):
         r = self.getNodeRecord(node)
@@ -779,7 +1305,9 @@ class NodeVisitor(c_ast.NodeVisitor):
         if isinstance(node, Node):
             return node._value
 
-        r = self.getNodeRecord(node)
+        r = self._records.get(node)
+        if r is None:
+            r = self._records[node] = NodeRecord()
         if r._value is None:
             self.visit(node)
         assert r._value
@@ -836,25 +1364,45 @@ class Sema(NodeVisitor):
     def __init__(self, ctx: NodeVisitorCtx) -> None:
         super().__init__(ctx)
 
+        self._loopDepth = 0
+        # compound statements of the current function and their loop depths,
+        # whose common subexpressions are eliminated once it is analyzed
+        self._compounds: list[tuple[c_ast.Compound, int]] = []
+        # > 0 while visiting code which is never executed
+        self._unreachable = 0
+
+        # enclosing loops, switches and both, the innermost last
+        self._loops: list[c_ast.While | c_ast.DoWhile | c_ast.For] = []
+        self._switches: list[c_ast.Switch] = []
+        self._breakables: list[c_ast.Node] = []
+
     def enterScope(self):
         self._scope = LocalScope(self._scope)
 
     def exitScope(self):
+        self._scope.exit()
         self._scope = self._scope._prev
 
+    def enterLoop(self, node: c_ast.While | c_ast.DoWhile | c_ast.For):
+        self._loops.append(node)
+        self._breakables.append(node)
+
+    def exitLoop(self):
+        self._loops.pop()
+        self._breakables.pop()
+
+    def enterSwitch(self, node: c_ast.Switch):
+        self._switches.append(node)
+        self._breakables.append(node)
+
+    def exitSwitch(self):
+        self._switches.pop()
+        self._breakables.pop()
+
     # https://en.cppreference.com/w/c/language/conversion
     def tryConvert(self, t1: Type, node: c_ast.Node) -> c_ast.Node:
         v2, t2 = self.getNodeValueType(node)
 
-        if isinstance(t1, PointerType) and t1._base is None:
-            match t2:
-                case ArrayType() | PointerType():
-                    t1._base = t2._base
-                case FunctionType():
-                    t1._base = t2
-                case _:
-                    t1._base = getBuiltinType("void")
-
         if isCompatible(t1, t2):
             v2._type = t1
             return node
@@ -883,8 +1431,8 @@ class Sema(NodeVisitor):
                 case GlobalVariable() | StaticVariable():
                     return Node(SymConstant(v2._label, t1))
                 case StrLiteral():
-                    self._ctx.addStr(v2)
-                    return Node(SymConstant(v2._label, PointerType(t1._base)))
+                    self.addRef(self._ctx.addStr(v2))
+                    return Node(SymConstant(v2._label, getPointerType(t1._base)))
                 case _:
                     return res
 
@@ -901,7 +1449,7 @@ class Sema(NodeVisitor):
         # integer conversion
         if isinstance(t1, IntType) and isinstance(t2, IntType):
             if isinstance(v2, IntConstant):
-                return Node(IntConstant(v2._i, t1))
+                return Node(getIntConstant(v2._i, t1))
             return res
 
         # pointer conversion
@@ -935,6 +1483,31 @@ class Sema(NodeVisitor):
 
         return None
 
+    # convert a list of integer literals, which may be negated, in one go without visiting each of
+    # them, or return None if there is anything else. Lookup tables are initialized this way
+    def tryConvertIntLiterals(self, t1: IntType, nodes: list[c_ast.Node]) -> Optional[list[Node]]:
+        literals: list[tuple[c_ast.Constant, bool]] = []
+        for node in nodes:
+            negative = isinstance(node, c_ast.UnaryOp) and node.op == "-"
+            if negative:
+                node = node.expr
+            if not (isinstance(node, c_ast.Constant) and "int" in node.type):
+                return None
+            try:
+                parseIntLiteral(node.value)
+            except ValueError:
+                return None
+            literals.append((node, negative))
+
+        res = []
+        for node, negative in literals:
+            v = parseIntConstant(node)
+            # no integer promotion is needed as literals are at least as large as int
+            if negative:
+                v = evalIntUnaryOp("-", v)
+            res.append(Node(getIntConstant(v._i, t1)))
+        return res
+
     def convert(self, t1: Type, node: c_ast.Node):
         nodeNew = self.tryConvert(t1, node)
         if nodeNew:
@@ -951,7 +1524,16 @@ class Sema(NodeVisitor):
         if skipIfInt and isinstance(ty, IntType):
             return v, ty
 
-        nodeNew = self.tryConvert(pointerTy or PointerType(None), node)
+        if pointerTy is None:
+            match ty:
+                case ArrayType() | PointerType():
+                    pointerTy = getPointerType(ty._base)
+                case FunctionType():
+                    pointerTy = getPointerType(ty)
+                case _:
+                    pointerTy = getPointerType(getBuiltinType("void"))
+
+        nodeNew = self.tryConvert(pointerTy, node)
         if nodeNew:
             setattr(o, attr, nodeNew)
             v, ty = self.getNodeValueType(nodeNew)
@@ -962,6 +1544,12 @@ class Sema(NodeVisitor):
     def visit_Cast(self, node: c_ast.Cast):
         t1 = self.getNodeType(node.to_type)
 
+        # unlike implicit conversions, casts truncate integer constants silently
+        v2 = self.getNodeValue(node.expr)
+        if isinstance(t1, IntType) and isinstance(v2, IntConstant):
+            self.setNodeValue(node, getIntConstant(t1.wrap(v2._i), t1))
+            return
+
         nodeNew = self.tryConvert(t1, node.expr)
         if nodeNew:
             if isinstance(nodeNew, Node):
@@ -977,14 +1565,14 @@ class Sema(NodeVisitor):
             # Any integer can be cast to any pointer type.
             case PointerType(), IntType():
                 if isinstance(v2, IntConstant):
-                    self.setNodeValue(node, PtrConstant(v2._i, t1))
+                    self.setNodeValue(node, PtrConstant(getBuiltinType("int").wrap(v2._i), t1))
                 else:
                     self.setNodeTypeR(node, t1)
 
             # Any pointer type can be cast to any integer type.
             case IntType(), PointerType():
                 if isinstance(v2, PtrConstant):
-                    self.setNodeValue(node, IntConstant(v2._i, t1))
+                    self.setNodeValue(node, getIntConstant(t1.wrap(v2._i), t1))
                 else:
                     self.setNodeTypeR(node, t1)
 
@@ -1006,7 +1594,8 @@ class Sema(NodeVisitor):
         self.setNodeType(node, self.getNodeType(node.type))
 
     def visit_IdentifierType(self, node: c_ast.IdentifierType):
-        name = " ".join(node.names)
+        names = node.names
+        name = names[0] if len(names) == 1 else " ".join(names)
         self.setNodeType(node, self._scope.getType(name))
 
     def visit_ArrayDecl(self, node: c_ast.ArrayDecl):
@@ -1015,10 +1604,10 @@ class Sema(NodeVisitor):
             dim = self.getNodeIntConstant(node.dim)._i
             assert dim >= 0
 
-        self.setNodeType(node, ArrayType(self.getNodeType(node.type), dim))
+        self.setNodeType(node, getArrayType(self.getNodeType(node.type), dim))
 
     def visit_PtrDecl(self, node: c_ast.PtrDecl):
-        self.setNodeType(node, PointerType(self.getNodeType(node.type)))
+        self.setNodeType(node, getPointerType(self.getNodeType(node.type)))
 
     def visit_Typedef(self, node: c_ast.Typedef):
         self._scope.addSymbol(node.name, self.getNodeType(node.type))
@@ -1141,6 +1730,12 @@ class Sema(NodeVisitor):
                 if n > ty._dim:
                     raise CCError("too many elements in array initializer")
 
+                if isinstance(ty._base, IntType):
+                    exprs = self.tryConvertIntLiterals(ty._base, init.exprs)
+                    if exprs:
+                        init.exprs = exprs
+                        return init
+
                 for i in range(n):
                     init.exprs[i] = _check(ty._base, init.exprs[i])
                 return init
@@ -1183,8 +1778,11 @@ class Sema(NodeVisitor):
 
             if _global:
                 _addSymbol(GlobalVariable(node.name, ty, _static))
+                if not _static:
+                    self._ctx.addRef(None, self.getNodeValue(node))
             else:
-                _addSymbol(StaticVariable(node.name, ty, self._func.getStaticLabel(node.name)))
+                label = self._ctx.getStaticLabel(self._func, node.name)
+                _addSymbol(StaticVariable(node.name, ty, label))
 
         else:  # local variables
             if node.init:
@@ -1194,7 +1792,14 @@ class Sema(NodeVisitor):
             scope: LocalScope = self._scope
             scope._offset += sz
 
-            _addSymbol(LocalVariable(node.name, ty, -scope._offset))
+            v = LocalVariable(node.name, ty, -scope._offset)
+            v._inMemory = "volatile" in node.quals
+            if node.init and isinstance(ty, IntType | PointerType):
+                v._init = self.getNodeValue(node.init)
+            # temporary variables are referenced through their declarations
+            if not node.name.startswith("tmp."):
+                self._func._vars.append(v)
+            _addSymbol(v)
 
             self._func.updateMaxOffset(scope._offset)
 
@@ -1220,17 +1825,7 @@ class Sema(NodeVisitor):
                 return
 
             if "int" in node.type:
-                # https://en.cppreference.com/w/c/language/integer_constant
-                ty = getBuiltinType(node.type)
-
-                s = s.lower()
-                while s.endswith("u") or s.endswith("l"):
-                    s = s[:-1]
-                if s.startswith("0x"):
-                    i = int(s[2:], base=16)
-                else:
-                    i = int(s, base=10)
-                self.setNodeValue(node, IntConstant(i, ty))
+                self.setNodeValue(node, parseIntConstant(node))
                 return
 
             raise CCError("unrecognized constant", node.type)
@@ -1244,8 +1839,47 @@ class Sema(NodeVisitor):
         if isinstance(_, Type):
             self.setNodeType(node, _)
         else:
+            if isinstance(_, LocalVariable | Argument):
+                _._uses += 8 ** min(self._loopDepth, 3)
+                _._ids.add(node)
+            elif isinstance(_, Function | GlobalVariable | StaticVariable):
+                self.addRef(_)
             self.setNodeValue(node, _)
 
+    # replace uses of scalar variables which are never assigned after
+    # initialization with their constant or copied initial values, and mark
+    # variables whose stores are never read
+    def propagateVariables(self):
+        def _scalar(v: LocalVariable | Argument):
+            return not v._inMemory and isinstance(v.getType(), IntType | PointerType)
+
+        def _fixed(v: Value):
+            return isinstance(v, LocalVariable | Argument) and _scalar(v) and not v._assigned
+
+        values: dict[Variable, Value] = {}
+        for v in self._func._vars:
+            if not _fixed(v):
+                continue
+
+            init = values.get(v._init, v._init)
+            if not (
+                isinstance(init, IntConstant | PtrConstant | SymConstant) or _fixed(init)
+            ) or not isCompatible(v.getType(), init.getType()):
+                continue
+
+            for _ in v._ids:
+                self.setNodeValue(_, init)
+            if isinstance(init, Variable):
+                init._uses += v._uses
+                init._ids |= v._ids
+            v._uses = 0
+            v._ids = set()
+            values[v] = init
+
+        for v in self._func._vars:
+            if _scalar(v) and not (v._ids - v._overwritten):
+                v._dead = True
+
     def visit_FuncDef(self, node: c_ast.FuncDef):
         if node.param_decls is not None:
             raise CCNotImplemented("old-style (K&R) function definition")
@@ -1254,6 +1888,9 @@ class Sema(NodeVisitor):
         self.visit(decl)
 
         self._func = self._scope.getFunction(decl.name)
+        self._func._static = "static" in decl.storage
+        if not self._func._static or not self._ctx.optimize:
+            self._ctx.addRef(None, self._func)
         self.setNodeValue(node, self._func)
 
         funcType: FunctionType = self._func.getType()
@@ -1267,13 +1904,30 @@ class Sema(NodeVisitor):
             offset = align(offset, 4)
             if isinstance(funcDecl.args[i], c_ast.Decl):
                 argName = funcDecl.args[i].name
-                self._scope.addSymbol(argName, Argument(argName, argTy, offset))
+                arg = Argument(argName, argTy, offset)
+                arg._inMemory = "volatile" in funcDecl.args[i].quals
+                self._func._vars.append(arg)
+                self._scope.addSymbol(argName, arg)
             offset += argTy.size()
 
         self.visit(node.body)
 
+        # only now is it known which variables are assigned or have their
+        # address taken anywhere in the function. Temporary variables get
+        # slots of their own below all other local variables
+        if self._ctx.optimize:
+            self.enterScope()
+            self._scope._offset = self._func._maxOffset
+            for compound, loopDepth in self._compounds:
+                self.eliminateCommonSubexpressions(compound.block_items, loopDepth)
+            self.exitScope()
+        self._compounds = []
+
         self.exitScope()
         self._func.checkLabels()
+        if self._ctx.optimize:
+            self.propagateVariables()
+            self._func.allocateRegisters()
         self._func = None
 
     # https://en.cppreference.com/w/c/language/function_declaration
@@ -1306,7 +1960,7 @@ class Sema(NodeVisitor):
 
         self.setNodeType(
             node,
-            FunctionType(ret, args, ellipsis),
+            getFunctionType(ret, args, ellipsis),
         )
 
     def visit_Typename(self, node: c_ast.Typename):
@@ -1340,12 +1994,203 @@ class Sema(NodeVisitor):
         if shouldEnter:
             self.enterScope()
 
-        for _ in node.block_items:
-            self.visit(_)
+        node.block_items = self.visitStatements(node.block_items)
+
+        if self._ctx.optimize:
+            self._compounds.append((node, self._loopDepth))
 
         if shouldEnter:
             self.exitScope()
 
+    # with --optimize, statements following return, goto, break or continue
+    # until one which may be jumped into are dropped. Declarations are kept
+    # since they may be referenced after a label
+    def visitStatements(self, items: list[c_ast.Node]) -> list[c_ast.Node]:
+        res = []
+        reachable = True
+        for item in items:
+            if not reachable and hasLabels(item):
+                reachable = True
+            if reachable or isinstance(item, c_ast.Decl) or not self._ctx.optimize:
+                self.visit(item)
+                res.append(item)
+            else:
+                self.visitUnreachable(item)
+            if isinstance(item, c_ast.Return | c_ast.Goto | c_ast.Break | c_ast.Continue):
+                reachable = False
+        return res
+
+    # @node is never executed. It is checked without recording references and
+    # dropped unless it may be jumped into
+    def visitUnreachable(self, node: Optional[c_ast.Node]) -> Optional[c_ast.Node]:
+        if node is None or hasLabels(node):
+            self.visit(node)
+            return node
+
+        self._unreachable += 1
+        self.visit(node)
+        self._unreachable -= 1
+        return None
+
+    def addRef(self, v: Value):
+        if not self._unreachable:
+            self._ctx.addRef(self._func, v)
+
+    # local value numbering: an address or arithmetic expression repeated in
+    # a run of straight-line statements is evaluated once into a temporary
+    # variable, whose declaration then takes the place of every occurrence
+    def eliminateCommonSubexpressions(self, items: list[c_ast.Node], loopDepth: int):
+        runs = [[]]
+        for item in items:
+            match item:
+                case (
+                    c_ast.Decl()
+                    | c_ast.Assignment()
+                    | c_ast.FuncCall()
+                    | c_ast.UnaryOp()
+                    | c_ast.BinaryOp()
+                    | c_ast.Cast()
+                    | c_ast.ExprList()
+                ):
+                    runs[-1].append(item)
+                case c_ast.Return():
+                    runs[-1].append(item)
+                    runs.append([])
+                case _:
+                    runs.append([])
+
+        for run in runs:
+            self._eliminateCommonSubexpressions(run, loopDepth)
+
+    def _eliminateCommonSubexpressions(self, run: list[c_ast.Node], loopDepth: int):
+        def _evaluated(node: c_ast.Node) -> c_ast.Node:
+            while not isinstance(node, Node) and self.getNodeTranslated(node):
+                node = self.getNodeTranslated(node)
+            return node
+
+        # (parent, field, child, whether child is evaluated conditionally)
+        edges: list[tuple[c_ast.Node, str, c_ast.Node, bool]] = []
+        ids: set[c_ast.ID] = set()
+        seen = set()
+
+        def _walk(node: c_ast.Node, cond: bool):
+            node = _evaluated(node)
+            if isinstance(node, Node) or node in seen:
+                return
+            seen.add(node)
+            if isinstance(self.getNodeRecord(node)._value, Constant):
+                return
+
+            match node:
+                case c_ast.ID():
+                    ids.add(node)
+                    return
+                case c_ast.Decl():
+                    children = [("init", node.init)] if node.init else []
+                case c_ast.Return():
+                    children = [("expr", node.expr)] if node.expr else []
+                case _:
+                    children = node.children()
+
+            for name, child in children:
+                match node:
+                    case c_ast.BinaryOp(op="&&" | "||") if name == "right":
+                        c = True
+                    case c_ast.TernaryOp() if name != "cond":
+                        c = True
+                    case _:
+                        c = cond
+                edges.append((node, name, child, c))
+                _walk(child, c)
+
+        for item in run:
+            _walk(item, False)
+
+        def _typeKey(ty: Type):
+            match ty:
+                case PointerType():
+                    return ("*", _typeKey(ty._base))
+                case IntType() | VoidType():
+                    return ty.name()
+            return ty
+
+        keys = {}
+
+        def _key(node: c_ast.Node):
+            node = _evaluated(node)
+            if node in keys:
+                return keys[node]
+
+            k = None
+            v = self.getNodeValue(node)
+            match v:
+                case IntConstant() | PtrConstant():
+                    k = ("c", v._i, _typeKey(v.getType()))
+                case SymConstant():
+                    k = ("s", v._name, _typeKey(v.getType()))
+                case LocalVariable() | Argument() if isinstance(node, c_ast.ID):
+                    if not v._inMemory and not (v._assigned & ids):
+                        k = ("v", v)
+                case _ if not isinstance(node, Node):
+                    match node:
+                        case c_ast.BinaryOp(op="+" | "-" | "*" | "<<" | ">>" | "&" | "|" | "^"):
+                            kL, kR = _key(node.left), _key(node.right)
+                            if kL and kR:
+                                k = (node.op, _typeKey(v.getType()), kL, kR)
+                        case c_ast.Cast():
+                            kE = _key(node.expr)
+                            if kE:
+                                k = ("cast", _typeKey(v.getType()), kE)
+                        case c_ast.UnaryOp(op="&"):
+                            e = _evaluated(node.expr)
+                            if isinstance(e, c_ast.UnaryOp) and e.op == "*":
+                                k = _key(e.expr)
+            keys[node] = k
+            return k
+
+        # an operation with an integer constant is cheap enough (p + 4 is even
+        # folded into the displacement of a load/store)
+        def _candidate(node: c_ast.Node):
+            if not isinstance(node, c_ast.BinaryOp) or self.getNodeTranslated(node):
+                return None
+            k = _key(node)
+            if k is None or k[0] != node.op or "c" in [k[2][0], k[3][0]]:
+                return None
+            return k
+
+        counts: dict[Any, int] = {}
+        for _, _, child, cond in edges:
+            if not cond and (k := _candidate(child)):
+                counts[k] = counts.get(k, 0) + 1
+
+        groups: dict[Any, list[tuple[c_ast.Node, str, c_ast.Node]]] = {}
+        skipped = set()
+        for parent, name, child, cond in edges:
+            if parent in skipped:
+                skipped.add(_evaluated(child))
+                continue
+            if not cond and (k := _candidate(child)) and counts[k] > 1:
+                groups.setdefault(k, []).append((parent, name, child))
+                skipped.add(_evaluated(child))
+
+        for occurrences in groups.values():
+            if len(occurrences) < 2:
+                continue
+
+            decl = self.makeValueStable(occurrences[0][2])
+            self.visit(decl)
+            v: LocalVariable = self.getNodeValue(decl)
+            v._uses = len(occurrences) * 8 ** min(loopDepth, 3)
+            v._ids.add(decl)
+            self._func._vars.append(v)
+
+            for parent, name, _ in occurrences:
+                m = re.fullmatch(r"(\w+)\[(\d+)\]", name)
+                if m:
+                    getattr(parent, m[1])[int(m[2])] = decl
+                else:
+                    setattr(parent, name, decl)
+
     def visit_ArrayRef(self, node: c_ast.ArrayRef):
         _, arrTy = self.tryConvertToPointer(node, "name")
         subTy = self.getNodeType(node.subscript)
@@ -1387,10 +2232,10 @@ class Sema(NodeVisitor):
             c_ast.UnaryOp(
                 "*",
                 c_ast.Cast(
-                    Node(Value(PointerType(field._type))),
+                    Node(Value(getPointerType(field._type))),
                     c_ast.BinaryOp(
                         "+",
-                        c_ast.Cast(Node(Value(PointerType(getBuiltinType("void")))), addr),
+                        c_ast.Cast(Node(Value(getPointerType(getBuiltinType("void")))), addr),
                         Node(getIntConstant(field._offset)),
                     ),
                 ),
@@ -1415,7 +2260,7 @@ class Sema(NodeVisitor):
     def makeValueStable(self, node: c_ast.Node):
         ty = self.getNodeType(node)
         return c_ast.Decl(
-            self._func.getTempVarName(),
+            self._ctx.getTempVarName(),
             [],
             [],
             [],
@@ -1427,6 +2272,15 @@ class Sema(NodeVisitor):
 
     # https://en.cppreference.com/w/c/language/operator_assignment
     def visit_Assignment(self, node: c_ast.Assignment):
+        if isinstance(node.lvalue, c_ast.ID):
+            match self.getNodeValue(node.lvalue):
+                case LocalVariable() | Argument() as v:
+                    v._assigned.add(node.lvalue)
+                    if node.op == "=":
+                        v._overwritten.add(node.lvalue)
+        self.checkAssignment(node)
+
+    def checkAssignment(self, node: c_ast.Assignment):
         vL, tyL = self.getNodeValueType(node.lvalue)
         checkLValue(vL)
 
@@ -1466,7 +2320,7 @@ class Sema(NodeVisitor):
                                 node.op[:-1], c_ast.UnaryOp("*", p), node.rvalue
                             )
                         node.op = "="
-                        self.visit_Assignment(node)
+                        self.checkAssignment(node)
 
                     case _:
                         raise CCError(f"unknown assignment operator {node.op}")
@@ -1489,15 +2343,18 @@ class Sema(NodeVisitor):
                 if isinstance(ty, FunctionType):
                     match v:
                         case Function():
-                            self.setNodeValue(node, SymConstant(v._name, PointerType(ty)))
+                            self.setNodeValue(node, SymConstant(v._name, getPointerType(ty)))
                         case _:
-                            self.setNodeTypeR(node, PointerType(ty))
+                            self.setNodeTypeR(node, getPointerType(ty))
                 else:
                     match v:
                         case GlobalVariable() | StaticVariable():
-                            self.setNodeValue(node, SymConstant(v._label, PointerType(ty)))
+                            self.setNodeValue(node, SymConstant(v._label, getPointerType(ty)))
+                        case LocalVariable() | Argument():
+                            v._inMemory = True
+                            self.setNodeTypeR(node, getPointerType(ty))
                         case LValue():
-                            self.setNodeTypeR(node, PointerType(ty))
+                            self.setNodeTypeR(node, getPointerType(ty))
                         case _:
                             raise CCError(f"can not take address of rvalue")
 
@@ -1523,17 +2380,7 @@ class Sema(NodeVisitor):
 
                 v = self.getNodeValue(node.expr)
                 if isinstance(v, IntConstant):
-                    i = v._i
-                    match node.op:
-                        case "+":
-                            pass
-                        case "-":
-                            i = -i
-                        case "~":
-                            i = ~i
-                        case _:
-                            unreachable()
-                    self.setNodeValue(node, IntConstant(i, ty))
+                    self.setNodeValue(node, evalIntUnaryOp(node.op, v))
                 else:
                     if ty.size() == 8:
                         # translate -x into ~x + 1
@@ -1554,9 +2401,7 @@ class Sema(NodeVisitor):
                     case IntType() | PointerType():
                         match v:
                             case IntConstant() | PtrConstant():
-                                self.setNodeValue(
-                                    node, getIntConstant(0 if v._i == 0 else 1, "int")
-                                )
+                                self.setNodeValue(node, getIntConstant(1 if v._i == 0 else 0))
                             case _:
                                 self.setNodeTypeR(node, getBuiltinType("int"))
                     case _:
@@ -1575,7 +2420,22 @@ class Sema(NodeVisitor):
                         raise CCError("not an integer or a pointer to object")
 
                 c = node.op[-1]
-                if node.op.startswith("p"):
+                if node.op.startswith("p") and self.isValueStable(node.expr):
+                    # translate x++ into x += 1, x - 1
+                    self.setNodeTranslated(
+                        node,
+                        c_ast.ExprList(
+                            [
+                                c_ast.Assignment(f"{c}=", node.expr, Node(getIntConstant(1))),
+                                c_ast.BinaryOp(
+                                    "-" if c == "+" else "+",
+                                    node.expr,
+                                    Node(getIntConstant(1)),
+                                ),
+                            ]
+                        ),
+                    )
+                elif node.op.startswith("p"):
                     # translate x++ into p = &x; *p += 1, *p - 1
                     p = self.makeValueStable(c_ast.UnaryOp("&", node.expr))
                     self.setNodeTranslated(
@@ -1602,6 +2462,18 @@ class Sema(NodeVisitor):
             case _:
                 raise CCError("unknown unary operator", node.op)
 
+    # fold @node if both operands, after conversion, are integer constants
+    def foldIntBinaryOp(self, node: c_ast.BinaryOp, ty: Type):
+        vL = self.getNodeValue(node.left)
+        vR = self.getNodeValue(node.right)
+        match vL, vR:
+            case IntConstant(), IntConstant():
+                v = evalIntBinaryOp(node.op, vL, vR)
+                if v is not None:
+                    self.setNodeValue(node, v)
+                    return
+        self.setNodeTypeR(node, ty)
+
     def visit_BinaryOp(self, node: c_ast.BinaryOp):
         match node.op:
             case "+":
@@ -1612,24 +2484,19 @@ class Sema(NodeVisitor):
                         ty = getArithmeticCommonType(tyL, tyR)
                         node.left = self.convert(ty, node.left)
                         node.right = self.convert(ty, node.right)
-
-                        match vL, vR:
-                            case IntConstant(), IntConstant():
-                                self.setNodeValue(node, IntConstant(vL._i + vR._i, ty))
-                            case _:
-                                self.setNodeTypeR(node, ty)
+                        self.foldIntBinaryOp(node, ty)
 
                     case IntType(), PointerType():
                         match vL, vR:
                             case IntConstant(), PtrConstant():
-                                self.setNodeValue(node, IntConstant(vL._i + vR._i, tyR))
+                                self.setNodeValue(node, evalPtrOffset(vR, vL._i, tyR))
                             case _:
                                 self.setNodeTypeR(node, tyR)
 
                     case PointerType(), IntType():
                         match vL, vR:
                             case PtrConstant(), IntConstant():
-                                self.setNodeValue(node, IntConstant(vL._i + vR._i, tyL))
+                                self.setNodeValue(node, evalPtrOffset(vL, vR._i, tyL))
                             case _:
                                 self.setNodeTypeR(node, tyL)
 
@@ -1644,15 +2511,14 @@ class Sema(NodeVisitor):
                         ty = getArithmeticCommonType(tyL, tyR)
                         node.left = self.convert(ty, node.left)
                         node.right = self.convert(ty, node.right)
+                        self.foldIntBinaryOp(node, ty)
 
+                    case PointerType(), IntType() if tyL.toObject():
                         match vL, vR:
-                            case IntConstant(), IntConstant():
-                                self.setNodeValue(node, IntConstant(vL._i - vR._i, ty))
+                            case PtrConstant(), IntConstant():
+                                self.setNodeValue(node, evalPtrOffset(vL, -vR._i, tyL))
                             case _:
-                                self.setNodeTypeR(node, ty)
-
-                    case PointerType(), IntType() if tyL.toObject():
-                        self.setNodeTypeR(node, tyL)
+                                self.setNodeTypeR(node, tyL)
                     case (
                         PointerType(),
                         PointerType(),
@@ -1662,64 +2528,28 @@ class Sema(NodeVisitor):
                         raise CCError(f"can not - {tyL} and {tyR}")
 
             case "*" | "/" | "%" | "&" | "|" | "^":
-                vL, tyL = self.getNodeValueType(node.left)
-                vR, tyR = self.getNodeValueType(node.right)
+                tyL = self.getNodeType(node.left)
+                tyR = self.getNodeType(node.right)
                 match tyL, tyR:
                     case IntType(), IntType():
                         ty = getArithmeticCommonType(tyL, tyR)
                         node.left = self.convert(ty, node.left)
                         node.right = self.convert(ty, node.right)
-
-                        match vL, vR:
-                            case IntConstant(), IntConstant():
-                                iL = vL._i
-                                iR = vR._i
-                                match node.op:
-                                    case "*":
-                                        i = iL * iR
-                                    case "/":
-                                        i = iL // iR
-                                    case "%":
-                                        i = iL % iR
-                                    case "&":
-                                        i = iL & iR
-                                    case "|":
-                                        i = iL | iR
-                                    case "^":
-                                        i = iL ^ iR
-                                    case _:
-                                        unreachable()
-                                self.setNodeValue(node, IntConstant(i, ty))
-                            case _:
-                                self.setNodeTypeR(node, ty)
+                        self.foldIntBinaryOp(node, ty)
 
                     case _:
                         raise CCError(f"can not {node.op} {tyL} and {tyR}")
 
             case "<<" | ">>":
-                vL, tyL = self.getNodeValueType(node.left)
-                vR, tyR = self.getNodeValueType(node.right)
+                tyL = self.getNodeType(node.left)
+                tyR = self.getNodeType(node.right)
                 match tyL, tyR:
                     case IntType(), IntType():
                         tyL = promoteIntType(tyL)
                         node.left = self.convert(tyL, node.left)
                         tyR = promoteIntType(tyR)
                         node.right = self.convert(tyR, node.right)
-
-                        match vL, vR:
-                            case IntConstant(), IntConstant():
-                                iL = vL._i
-                                iR = vR._i
-                                match node.op:
-                                    case "<<":
-                                        i = iL << iR
-                                    case ">>":
-                                        i = iL >> iR
-                                    case _:
-                                        unreachable()
-                                self.setNodeValue(node, IntConstant(i, tyL))
-                            case _:
-                                self.setNodeTypeR(node, tyL)
+                        self.foldIntBinaryOp(node, tyL)
                     case _:
                         raise CCError(f"can not {node.op} {tyL} and {tyR}")
 
@@ -1729,20 +2559,20 @@ class Sema(NodeVisitor):
                 match tyL, tyR:
                     case (IntType() | PointerType()), (IntType() | PointerType()):
                         match vL, vR:
+                            # 0 && x, 1 || x
+                            case (IntConstant() | PtrConstant()), _ if (
+                                vL._i == 0 and node.op == "&&"
+                            ):
+                                self.setNodeValue(node, getIntConstant(0))
+                            case (IntConstant() | PtrConstant()), _ if (
+                                vL._i != 0 and node.op == "||"
+                            ):
+                                self.setNodeValue(node, getIntConstant(1))
                             case (
                                 (IntConstant() | PtrConstant()),
                                 (IntConstant() | PtrConstant()),
                             ):
-                                iL = 0 if vL._i == 0 else 1
-                                iR = 0 if vR._i == 0 else 1
-                                match node.op:
-                                    case "&&":
-                                        i = iL & iR
-                                    case "||":
-                                        i = iL | iR
-                                    case _:
-                                        unreachable()
-                                self.setNodeValue(node, getIntConstant(i, "int"))
+                                self.setNodeValue(node, getIntConstant(0 if vR._i == 0 else 1))
                             case _:
                                 label = "and.end" if node.op == "&&" else "or.end"
                                 self.setNodeLabels(node, [label])
@@ -1751,7 +2581,7 @@ class Sema(NodeVisitor):
                     case _:
                         raise CCError(f"can not {node.op} {tyL} and {tyR}")
 
-            case "==" | "!=":
+            case "==" | "!=" | "<" | ">=":
                 vL, tyL = self.tryConvertToPointer(node, "left")
                 vR, tyR = self.tryConvertToPointer(node, "right")
                 match tyL, tyR:
@@ -1759,32 +2589,17 @@ class Sema(NodeVisitor):
                         ty = getArithmeticCommonType(tyL, tyR)
                         node.left = self.convert(ty, node.left)
                         node.right = self.convert(ty, node.right)
-
-                        match vL, vR:
-                            case IntConstant(), IntConstant():
-                                iL = vL._i
-                                iR = vR._i
-                                match node.op:
-                                    case "==":
-                                        i = 1 if iL == iR else 0
-                                    case "!=":
-                                        i = 1 if iL != iR else 0
-                                    case _:
-                                        unreachable()
-                                self.setNodeValue(node, IntConstant(i, "int"))
-                            case _:
-                                self.setNodeTypeR(node, getBuiltinType("int"))
+                        self.foldIntBinaryOp(node, getBuiltinType("int"))
                         return
 
-                    case IntType(), PointerType():
+                    case IntType(), PointerType() if node.op in ("==", "!="):
                         vL, tyL = self.tryConvertToPointer(node, "left", False, tyR)
 
-                    case PointerType(), IntType():
+                    case PointerType(), IntType() if node.op in ("==", "!="):
                         vR, tyR = self.tryConvertToPointer(node, "right", False, tyL)
 
                 match tyL, tyR:
-
-                    case PointerType(), PointerType():
+                    case PointerType(), PointerType() if node.op in ("==", "!="):
                         if not (
                             isCompatible(tyL, tyR)
                             or (tyL.toObject() and tyR._base is voidTy)
@@ -1792,51 +2607,19 @@ class Sema(NodeVisitor):
                         ):
                             ccWarn("comparison of distinct pointer types", tyL, tyR)
 
-                        match vL, vR:
-                            case PtrConstant(), PtrConstant():
-                                iL = vL._i
-                                iR = vR._i
-                                match node.op:
-                                    case "==":
-                                        i = 1 if iL == iR else 0
-                                    case "!=":
-                                        i = 1 if iL != iR else 0
-                                    case _:
-                                        unreachable()
-                                self.setNodeValue(node, IntConstant(i, "int"))
-                            case _:
-                                self.setNodeTypeR(node, getBuiltinType("int"))
+                    case PointerType(), PointerType() if tyL.toObject() and tyR.toObject():
+                        pass
 
                     case _:
                         raise CCError(f"can not {node.op} {tyL} and {tyR}")
 
-            case "<" | ">=":
-                vL, tyL = self.tryConvertToPointer(node, "left")
-                vR, tyR = self.tryConvertToPointer(node, "right")
-
-                def _f():
-                    match vL, vR:
-                        case (IntConstant() | PtrConstant()), (IntConstant() | PtrConstant()):
-                            iL = vL._i
-                            iR = vR._i
-                            match node.op:
-                                case "<":
-                                    i = 1 if iL < iR else 0
-                                case ">=":
-                                    i = 1 if iL >= iR else 0
-                                case _:
-                                    unreachable()
-                            self.setNodeValue(node, getIntConstant(i, "int"))
-                        case _:
-                            self.setNodeTypeR(node, getBuiltinType("int"))
-
-                match tyL, tyR:
-                    case IntType(), IntType():
-                        _f()
-                    case PointerType(), PointerType() if tyL.toObject() and tyR.toObject():
-                        _f()
+                match vL, vR:
+                    case PtrConstant(), PtrConstant():
+                        self.setNodeValue(
+                            node, evalIntBinaryOp(node.op, ptrToInt(vL), ptrToInt(vR))
+                        )
                     case _:
-                        raise CCError(f"can not {node.op} {tyL} and {tyR}")
+                        self.setNodeTypeR(node, getBuiltinType("int"))
 
             case ">" | "<=":
                 # translate 'a > b' to 'b < a'
@@ -1877,12 +2660,14 @@ class Sema(NodeVisitor):
                 node.iftrue = self.convert(ty, node.iftrue)
                 node.iffalse = self.convert(ty, node.iffalse)
 
-                match vC, vT, vF:
-                    case (IntConstant() | PtrConstant()), IntConstant(), IntConstant():
-                        i = vT._i if vC._i else vF._i
-                        self.setNodeValue(node, IntConstant(i, ty))
-                    case _:
-                        self.setNodeTypeR(node, ty)
+                # only the chosen operand needs to be a constant
+                match vC:
+                    case IntConstant() | PtrConstant():
+                        v = self.getNodeValue(node.iftrue if vC._i else node.iffalse)
+                        if isinstance(v, IntConstant):
+                            self.setNodeValue(node, v)
+                            return
+                self.setNodeTypeR(node, ty)
                 return
 
             case IntType(), PointerType():
@@ -1892,12 +2677,13 @@ class Sema(NodeVisitor):
                 vF, tyF = self.tryConvertToPointer(node, "iffalse", False, tyT)
 
         def _f(ty):
-            match vC, vT, vF:
-                case (IntConstant() | PtrConstant()), PtrConstant(), PtrConstant():
-                    i = vT._i if vC._i else vF._i
-                    self.setNodeValue(node, PtrConstant(i, ty))
-                case _:
-                    self.setNodeTypeR(node, ty)
+            match vC:
+                case IntConstant() | PtrConstant():
+                    v = vT if vC._i else vF
+                    if isinstance(v, PtrConstant):
+                        self.setNodeValue(node, PtrConstant(v._i, ty))
+                        return
+            self.setNodeTypeR(node, ty)
 
         match tyT, tyF:
             case PointerType(), PointerType() if isCompatible(tyT, tyF):
@@ -1920,6 +2706,10 @@ class Sema(NodeVisitor):
         raise CCNotImplemented("alignas")
 
     def visit_FuncCall(self, node: c_ast.FuncCall):
+        if isinstance(node.name, c_ast.ID) and node.name.name == "setjmp":
+            # variables changed after setjmp returns must be reloaded from memory
+            self._func._noRegisters = True
+
         _, ty = self.tryConvertToPointer(node, "name")
         match ty:
             case PointerType(_base=FunctionType()):
@@ -1964,37 +2754,59 @@ class Sema(NodeVisitor):
         ty = self.getNodeType(node.cond)
         match ty:
             case IntType() | PointerType():
-                self.visit(node.iftrue)
-                self.visit(node.iffalse)
+                v = self.getNodeValue(node.cond)
+                if not (self._ctx.optimize and isinstance(v, IntConstant)):
+                    self.visit(node.iftrue)
+                    self.visit(node.iffalse)
+                elif v._i:
+                    self.visit(node.iftrue)
+                    node.iffalse = self.visitUnreachable(node.iffalse)
+                else:
+                    node.iftrue = self.visitUnreachable(node.iftrue)
+                    self.visit(node.iffalse)
             case _:
                 raise CCError("not an integer or a pointer")
 
     def visit_While(self, node: c_ast.While):
         self.setNodeLabels(node, ["while.start", "while.end"])
+        self.enterLoop(node)
+        self._loopDepth += 1
         ty = self.getNodeType(node.cond)
         match ty:
             case IntType() | PointerType():
-                self.visit(node.stmt)
+                v = self.getNodeValue(node.cond)
+                if self._ctx.optimize and isinstance(v, IntConstant) and v._i == 0:
+                    node.stmt = self.visitUnreachable(node.stmt)
+                else:
+                    self.visit(node.stmt)
             case _:
                 raise CCError("not an integer or a pointer")
+        self._loopDepth -= 1
+        self.exitLoop()
 
     def visit_DoWhile(self, node: c_ast.DoWhile):
         self.setNodeLabels(node, ["do.start", "do.next", "do.end"])
 
+        self.enterLoop(node)
+        self._loopDepth += 1
         ty = self.getNodeType(node.cond)
         match ty:
             case IntType() | PointerType():
                 self.visit(node.stmt)
             case _:
                 raise CCError("not an integer or a pointer")
+        self._loopDepth -= 1
+        self.exitLoop()
 
     def visit_For(self, node: c_ast.For):
         self.setNodeLabels(node, ["for.start", "for.next", "for.end"])
 
         self.enterScope()
+        self.enterLoop(node)
 
         self.visit(node.init)
 
+        self._loopDepth += 1
         if node.cond:
             ty = self.getNodeType(node.cond)
             match ty:
@@ -2005,7 +2817,9 @@ class Sema(NodeVisitor):
 
         self.visit(node.next)
         self.visit(node.stmt)
+        self._loopDepth -= 1
 
+        self.exitLoop()
         self.exitScope()
 
     # https://en.cppreference.com/w/c/language/switch
@@ -2015,34 +2829,23 @@ class Sema(NodeVisitor):
         r = self.getNodeRecord(node)
         r._cases = []
 
+        self.enterSwitch(node)
         ty = self.getNodeType(node.cond)
         match ty:
             case IntType():
                 self.visit(node.stmt)
             case _:
                 raise CCError("not an integer")
+        self.exitSwitch()
 
     def getLoop(self):
-        for node in reversed(self._path[:-1]):
-            match node:
-                case c_ast.While() | c_ast.DoWhile() | c_ast.For():
-                    return node
-        return None
+        return self._loops[-1] if self._loops else None
 
     def getSwitch(self):
-        for node in reversed(self._path[:-1]):
-            if isinstance(node, c_ast.Switch):
-                return node
-        return None
+        return self._switches[-1] if self._switches else None
 
     def getLoopOrSwitch(self):
-        for node in reversed(self._path[:-1]):
-            match node:
-                case c_ast.While() | c_ast.DoWhile() | c_ast.For():
-                    return node
-                case c_ast.Switch():
-                    return node
-        return None
+        return self._breakables[-1] if self._breakables else None
 
     def addCase(self, switchStmt: Node, _case: tuple[Optional[int], str]):
         switchR = self.getNodeRecord(switchStmt)
@@ -2065,8 +2868,7 @@ class Sema(NodeVisitor):
                 self.setNodeLabels(node, ["switch.case"])
                 self.addCase(switchStmt, (v._i, self.getNodeLabels(node)[0]))
 
-                for stmt in node.stmts:
-                    self.visit(stmt)
+                node.stmts = self.visitStatements(node.stmts)
             case _:
                 raise CCError("not an integer constant")
 
@@ -2078,8 +2880,7 @@ class Sema(NodeVisitor):
         self.setNodeLabels(node, ["switch.default"])
         self.addCase(switchStmt, (None, self.getNodeLabels(node)[0]))
 
-        for stmt in node.stmts:
-            self.visit(stmt)
+        node.stmts = self.visitStatements(node.stmts)
 
     def visit_Break(self, node: c_ast.Break):
         loopOrSwitchStmt = self.getLoopOrSwitch()
@@ -2132,4 +2933,6 @@ class Sema(NodeVisitor):
                 insts.append(s.strip())
             if len(insts) > 0:
                 r = self.getNodeRecord(node)
-                r._pragma["ASM"] = insts
+                r._pragma = {"ASM": insts}
+                if self._func:
+                    self._func._noRegisters = True
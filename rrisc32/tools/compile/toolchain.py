@@ -0,0 +1,188 @@
+# The toolchain as a library, for programs which compile many small sources and
+# would otherwise spend most of their time starting the driver. Sources,
+# assembly and objects are passed in memory. Only preprocessing and linking run
+# external programs
+
+import io
+import os
+import glob
+import subprocess
+import tarfile
+import tempfile
+
+from pycparser import c_ast, c_parser
+
+from sema import Sema, NodeVisitorCtx, callWithDeepStack, SMALL_DATA_LIMIT
+from codegen import Codegen
+from assembly import Assembler
+
+
+# where the programs, headers and libraries of a toolchain are installed
+class Toolchain:
+    def __init__(self, sysroot: str) -> None:
+        self.sysroot = sysroot
+        self.tmpDir = os.path.join(sysroot, "tmp")
+        self.binDir = os.path.join(sysroot, "bin")
+        self.incDir = os.path.join(sysroot, "include")
+        self.libDir = os.path.join(sysroot, "lib")
+
+        self._startFiles: list[str] = None
+
+    def getProgram(self, name: str) -> str:
+        return os.path.join(self.binDir, name)
+
+    def mkdtemp(self, suffix: str, prefix: str) -> str:
+        prefix = os.path.basename(prefix)
+        os.makedirs(self.tmpDir, exist_ok=True)
+        return tempfile.mkdtemp(suffix=suffix, prefix=prefix, dir=self.tmpDir)
+
+    # the members of an archive, extracted into a temporary directory
+    def extract(self, infile: str) -> list[str]:
+        with tarfile.open(infile, "r|") as tf:
+            outdir = self.mkdtemp(".extracted", infile)
+            tf.extractall(outdir, filter="data")
+            return glob.glob(os.path.join(outdir, "*.o"))
+
+    # crt.o and the objects of libc.a, which every executable is linked with.
+    # They are extracted once per toolchain
+    def getStartFiles(self) -> list[str]:
+        if self._startFiles is None:
+            self._startFiles = [os.path.join(self.libDir, "crt.o")] + self.extract(
+                os.path.join(self.libDir, "libc.a")
+            )
+        return self._startFiles
+
+
+class CompileOptions:
+    def __init__(
+        self,
+        includeDirs: list[str] = None,
+        optimize: bool = False,
+        functionSections: bool = False,
+        incremental: bool = False,
+        smallDataLimit: int = SMALL_DATA_LIMIT,
+    ) -> None:
+        self.includeDirs = includeDirs or []
+        self.optimize = optimize
+        self.functionSections = functionSections
+        self.incremental = incremental
+        self.smallDataLimit = smallDataLimit
+
+    def getCppArgs(self) -> list[str]:
+        return ["-nostdinc"] + [f"-I{_}" for _ in self.includeDirs]
+
+
+# building the tables of a parser takes longer than parsing a small source, so
+# one parser is shared by all compilations
+_parser: c_parser.CParser = None
+
+
+def parseSource(text: str, options: CompileOptions, filename: str = "<stdin>") -> c_ast.FileAST:
+    global _parser
+
+    # cpp reads the source from stdin. The line directive makes __FILE__ and the
+    # coordinates of nodes refer to @filename, and -iquote lets it include
+    # headers next to it, as when the driver compiles the file itself
+    args = options.getCppArgs()
+    if os.path.dirname(filename):
+        args.append(f"-iquote{os.path.dirname(filename)}")
+    escaped = filename.replace("\\", "\\\\").replace('"', '\\"')
+    text = subprocess.run(
+        ["cpp"] + args + ["-"],
+        input=f'#line 1 "{escaped}"\n' + text,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    if _parser is None:
+        _parser = c_parser.CParser()
+    return _parser.parse(text, filename)
+
+
+def compileAst(ast: c_ast.FileAST, options: CompileOptions) -> Codegen:
+    ctx = NodeVisitorCtx(
+        options.optimize, options.functionSections, options.incremental, options.smallDataLimit
+    )
+    sm = Sema(ctx)
+
+    def _compile() -> Codegen:
+        if not options.incremental:
+            sm.visit(ast)
+            cg = Codegen(ctx)
+            cg.visit(ast)
+            return cg
+        cg = Codegen(ctx)
+        for i, ext in enumerate(ast.ext):
+            mark = ctx.markRecords()
+            sm.visitExt(ext)
+            cg.addStrs()
+            cg.visitExt(ext)
+            # only what is declared at file scope is needed afterwards
+            if isinstance(ext, c_ast.FuncDef):
+                ctx.releaseRecords(mark)
+                ast.ext[i] = None
+        return cg
+
+    return callWithDeepStack(_compile)
+
+
+# the assembly of a C source. @filename is what __FILE__ expands to
+def compileSource(text: str, options: CompileOptions = None, filename: str = "<stdin>") -> str:
+    options = options or CompileOptions()
+    cg = compileAst(parseSource(text, options, filename), options)
+    o = io.StringIO()
+    cg.save(o)
+    return o.getvalue()
+
+
+# the object of a C source, assembled by the integrated assembler
+def compileObject(text: str, options: CompileOptions = None, filename: str = "<stdin>") -> bytes:
+    options = options or CompileOptions()
+    cg = compileAst(parseSource(text, options, filename), options)
+    o = io.BytesIO()
+    cg.saveObject(o)
+    return o.getvalue()
+
+
+def assembleSource(text: str) -> bytes:
+    assembler = Assembler()
+    for line in text.splitlines():
+        assembler.addLine(line)
+    o = io.BytesIO()
+    assembler.save(o)
+    return o.getvalue()
+
+
+# an archive of objects keyed by their names
+def archiveObjects(objects: dict[str, bytes]) -> bytes:
+    o = io.BytesIO()
+    with tarfile.open(fileobj=o, mode="w|") as tf:
+        for name, data in objects.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return o.getvalue()
+
+
+# an executable linked from objects keyed by their names, crt.o and libc.a
+def linkObjects(
+    toolchain: Toolchain, objects: dict[str, bytes], linkerArgs: list[str] = None
+) -> bytes:
+    with tempfile.TemporaryDirectory() as tmpDir:
+        infiles = []
+        for name, data in objects.items():
+            infile = os.path.join(tmpDir, os.path.basename(name))
+            with open(infile, "wb") as ofs:
+                ofs.write(data)
+            infiles.append(infile)
+
+        outfile = os.path.join(tmpDir, "a.out")
+        subprocess.run(
+            [toolchain.getProgram("rrisc32-link"), "-o", outfile]
+            + (linkerArgs or [])
+            + toolchain.getStartFiles()
+            + infiles,
+            check=True,
+        )
+        with open(outfile, "rb") as ifs:
+            return ifs.read()
@@ -0,0 +1,56 @@
+import os
+import sys
+import gc
+import argparse
+import tracemalloc
+
+from pycparser import parse_file
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sema import Sema, NodeVisitorCtx, Field, Type, Value
+from codegen import Codegen
+
+
+# the size of an object plus that of its __dict__, if any
+def sizeOf(o: object) -> int:
+    n = sys.getsizeof(o)
+    if hasattr(o, "__dict__"):
+        n += sys.getsizeof(o.__dict__)
+    return n
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser("Measure memory taken by values and types")
+    argparser.add_argument("filename", help="name of file to compile")
+    argparser.add_argument("-I", dest="incDirs", action="append", default=[])
+    argparser.add_argument("--optimize", action="store_true")
+    args = argparser.parse_args()
+
+    cpp_args = ["-nostdinc"] + [f"-I{_}" for _ in args.incDirs]
+    ast = parse_file(args.filename, use_cpp=True, cpp_args=cpp_args)
+
+    tracemalloc.start()
+
+    ctx = NodeVisitorCtx(args.optimize, False, False)
+    Sema(ctx).visit(ast)
+    Codegen(ctx).visit(ast)
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats: dict[str, list[int]] = {}
+    for o in gc.get_objects():
+        if isinstance(o, Field | Type | Value):
+            stat = stats.setdefault(type(o).__name__, [0, 0])
+            stat[0] += 1
+            stat[1] += sizeOf(o)
+
+    print("%-20s %10s %10s %8s" % ("class", "count", "bytes", "average"))
+    for name, (count, size) in sorted(stats.items(), key=lambda _: -_[1][1]):
+        print("%-20s %10d %10d %8.1f" % (name, count, size, size / count))
+
+    count = sum(_[0] for _ in stats.values())
+    size = sum(_[1] for _ in stats.values())
+    print("%-20s %10d %10d %8.1f" % ("total", count, size, size / count))
+    print("peak traced memory: %d bytes" % peak)
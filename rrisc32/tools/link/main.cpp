@@ -9,6 +9,8 @@ int main(int argc, char *argv[]) {
   CLI::App app;
   app.add_option("-o", o.outFile, "Output file")->required()->type_name("FILE");
   app.add_option("<input_file>", o.inFiles)->required()->type_name("");
+  app.add_flag("--gc-sections", o.gcSections,
+               "Discard sections unreachable from start");
   ADD_DEBUG_OPT(app);
   CLI11_PARSE(app, argc, argv);
 